@@ -10,7 +10,7 @@ kwargs = {'author': 'Katherine Dykes',
  'author_email': 'systems.engineering@nrel.gov',
  'description': 'NREL WISDEM turbine cost models',
  'include_package_data': True,
- 'install_requires': ['openmdao'],
+ 'install_requires': ['openmdao', 'numpy>=1.20'],
  'keywords': ['openmdao'],
  'license' : 'Apache License, Version 2.0',
  'version' : '0.1.1',
@@ -18,6 +18,7 @@ kwargs = {'author': 'Katherine Dykes',
  'package_data': {'Turbine_CostsSE': []},
  'package_dir': {'': 'src'},
  'packages': ['turbine_costsse','test'],
+ 'python_requires': '>=3.7',
  'zip_safe': False}
 
 
@@ -0,0 +1,122 @@
+import inspect
+import os
+import shutil
+import tempfile
+import unittest
+
+import numpy as np
+
+from turbine_costsse.equations_2015 import csm_model, default_coeffs, rotor_torque
+from turbine_costsse.coefficients_2015 import (CoefficientRegistry, CoefficientSet, NREL_2015, evaluate_sets,
+                                               load_coefficient_set, set_coefficients)
+
+
+class TestRegistry(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp)
+
+    def test_save_load(self):
+        s = CoefficientSet('supplier_a', '1.2', {'blade_mass_cost_coeff': 15.5, 'hub_profitMultiplier': 0.1},
+                           description='quote')
+        path = os.path.join(self.tmp, 'a.json')
+        s.save(path)
+        loaded = load_coefficient_set(path)
+        self.assertEqual(loaded.key, 'supplier_a@1.2')
+        self.assertEqual(loaded.description, 'quote')
+        self.assertEqual(dict(loaded), dict(s))
+        self.assertEqual(list(loaded.overrides()), ['blade_mass_cost_coeff', 'hub_profitMultiplier'])
+        self.assertEqual(len(loaded), len(default_coeffs()))
+
+    def test_versions(self):
+        for version, value in (('1.9', 15.), ('1.10', 16.), ('1.2', 14.)):
+            CoefficientSet('b', version, {'blade_mass_cost_coeff': value}).save(
+                os.path.join(self.tmp, 'b_%s.json' % version))
+        registry = CoefficientRegistry([NREL_2015])
+        self.assertEqual(len(registry.load(self.tmp)), 3)
+        self.assertEqual(registry.versions('b'), ['1.2', '1.9', '1.10'])
+        self.assertEqual(registry.get('b')['blade_mass_cost_coeff'], 16.)
+        self.assertEqual(registry.get('b@1.9')['blade_mass_cost_coeff'], 15.)
+        self.assertTrue('b@1.2' in registry)
+        self.assertFalse('b@2.0' in registry)
+
+        with self.assertRaises(KeyError):
+            registry.get('c')
+        with self.assertRaises(ValueError):
+            registry.register(CoefficientSet('b', '1.9', {'blade_mass_cost_coeff': 1.}))
+        registry.register(CoefficientSet('b', '1.9', {'blade_mass_cost_coeff': 1.}), replace=True)
+        with self.assertRaises(KeyError):
+            CoefficientSet('c', '1.0', {'blade_mass_cost': 1.})
+        with self.assertRaises(ValueError):
+            CoefficientSet('c', 'latest')
+
+
+class TestEvaluateSets(unittest.TestCase):
+
+    def test_outer_product(self):
+        sets = [NREL_2015,
+                CoefficientSet('a', '1.0', {'blade_mass_cost_coeff': 15.5, 'turbine_profitMultiplier': 0.1}),
+                CoefficientSet('b', '1.0', {'tower_mass_exp': 2.1, 'blade_user_exp': 2.4, 'crane_cost': 2e4})]
+        D = np.array([80., 126., 150., 180.])
+        P = np.array([2000., 5000., 6000., 8000.])
+        Q = rotor_torque(P, D)
+        options = dict(turbine_class=np.array([1, 0, 2, 0]), crane=np.array([True, False, True, False]))
+
+        out = evaluate_sets(D, P, 90., Q, sets, **options)
+        self.assertEqual(out['turbine_cost'].shape, (4, 3))
+        for j, s in enumerate(sets):
+            ref = csm_model(D, P, 90., Q, coeffs=s, **options)
+            for k, v in ref.items():
+                np.testing.assert_allclose(out[k][:, j], v, rtol=1e-14, err_msg=k)
+
+        out = evaluate_sets(126., 5000., 90., 4.3e6, ['nrel_2015'], outputs=['turbine_cost'])
+        self.assertEqual(out['turbine_cost'].shape, (1,))
+
+
+class TestSingleSource(unittest.TestCase):
+
+    def test_component_defaults(self):
+        from openmdao.api import Component
+        from turbine_costsse import turbine_costsse_2015, nrel_csm_tcc_2015
+
+        defaults = default_coeffs()
+        n = 0
+        for module in (turbine_costsse_2015, nrel_csm_tcc_2015):
+            for name, cls in inspect.getmembers(module, inspect.isclass):
+                if not issubclass(cls, Component) or cls.__module__ != module.__name__:
+                    continue
+                comp = cls(*{'CostEscalation2015': (1,), 'CostScenarios2015': (1,),
+                             'Outputs2Screen': (False,)}.get(name, ()))
+                for k, meta in comp._init_params_dict.items():
+                    if k in defaults:
+                        self.assertTrue(np.all(meta['val'] == defaults[k]), msg='%s.%s' % (name, k))
+                        n += 1
+        self.assertGreater(n, 60)
+
+    def test_openmdao_sets(self):
+        from openmdao.api import Problem
+        from turbine_costsse.nrel_csm_tcc_2015 import nrel_csm_2015
+        from turbine_costsse.turbine_costsse_2015 import Turbine_CostsSE_2015
+
+        s = CoefficientSet('a', '1.0', {'blade_mass_coeff': 0.6, 'tower_mass_cost_coeff': 3.1,
+                                        'nacelle_profitMultiplier': 0.05})
+        prob = Problem(Turbine_CostsSE_2015(coeffs=s))
+        prob.setup(check=False)
+        self.assertEqual(prob['tower_mass_cost_coeff'], 3.1)
+        self.assertEqual(prob['nacelle_profitMultiplier'], 0.05)
+
+        prob = Problem(nrel_csm_2015())
+        prob.setup(check=False)
+        self.assertGreater(set_coefficients(prob, s), 60)
+        prob['rotor_diameter'], prob['machine_rating'], prob['hub_height'] = 126., 5000., 90.
+        prob['rotor_torque'] = rotor_torque(5000., 126.)
+        prob.run()
+        ref = csm_model(126., 5000., 90., rotor_torque(5000., 126.), coeffs=s)
+        self.assertAlmostEqual(prob['turbine_cost'], ref['turbine_cost'], delta=1e-6)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,55 @@
+import unittest
+
+import numpy as np
+
+from turbine_costsse.configurations_2015 import best_configurations, configurations
+from turbine_costsse.sweep_2015 import evaluate_samples
+
+
+class TestConfigurations(unittest.TestCase):
+
+    def setUp(self):
+        rng = np.random.RandomState(0)
+        n = 200
+        self.samples = {'rotor_diameter': rng.uniform(60., 200., n), 'machine_rating': rng.uniform(1000., 10000., n),
+                        'hub_height': rng.uniform(60., 150., n), 'blade_mass_cost_coeff': rng.uniform(10., 18., n)}
+
+    def test_product(self):
+        configs = configurations()
+        self.assertEqual(len(configs['crane']), 48)
+        self.assertEqual(len(set(zip(*configs.values()))), 48)
+        configs = configurations({'blade_number': (2, 3), 'crane': (False, True)})
+        np.testing.assert_array_equal(configs['blade_number'], [2, 2, 3, 3])
+        np.testing.assert_array_equal(configs['crane'], [False, True, False, True])
+        self.assertRaises(KeyError, configurations, {'rotor_diameter': (100., 120.)})
+
+    def check(self, options, objective, **model_kwargs):
+        # one evaluate_samples run per configuration
+        configs = configurations(options)
+        outputs = ['turbine_mass', objective]
+        runs = [evaluate_samples(self.samples, outputs=outputs,
+                                 **dict(model_kwargs, **dict((k, v[i]) for k, v in configs.items())))
+                for i in range(len(configs['crane']))]
+        expected = np.argmin([out[objective] for out in runs], axis=0)
+        designs = np.arange(len(expected))
+
+        for structured in (False, True):
+            best, index = best_configurations(self.samples, options, objective=objective, outputs=outputs,
+                                              structured=structured, chunk_size=500, **model_kwargs)
+            np.testing.assert_array_equal(index, expected)
+            for k in outputs:
+                np.testing.assert_allclose(best[k], np.array([out[k] for out in runs])[index, designs], rtol=1e-12)
+            for k, v in configs.items():
+                np.testing.assert_array_equal(best[k], v[index])
+        return best
+
+    def test_matches_loop_over_configurations(self):
+        self.check(None, 'turbine_cost')
+        self.check({'crane': (False, True), 'turbine_class': (1, 3)}, 'turbine_cost_kW', bearing_number=1)
+
+        self.assertRaises(ValueError, best_configurations, self.samples, crane=True)
+        self.assertRaises(KeyError, best_configurations, self.samples, objective='cost')
+
+
+if __name__ == "__main__":
+    unittest.main()
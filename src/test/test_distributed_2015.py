@@ -0,0 +1,114 @@
+import os
+import shutil
+import subprocess
+import sys
+import unittest
+
+import numpy as np
+
+from turbine_costsse import distributed_2015
+from turbine_costsse.distributed_2015 import (SerialComm, StreamingStats, distributed_monte_carlo,
+                                              distributed_sweep, local_run, rank_chunks, reduce_runs)
+from turbine_costsse.sweep_2015 import _evaluate, monte_carlo, sweep
+
+
+class TestDistributed(unittest.TestCase):
+
+    D = np.linspace(60., 200., 15)
+    P = np.linspace(1000., 10000., 10)
+    H = np.linspace(60., 150., 4)
+
+    def test_decomposition(self):
+        for size in (1, 2, 3, 8):
+            chunks = [c for rank in range(size) for c in rank_chunks(1000, 64, rank, size)]
+            self.assertEqual(sorted(i for i, sl in chunks), list(range(16)))
+            self.assertEqual(sum(sl.stop - sl.start for i, sl in chunks), 1000)
+        self.assertEqual(rank_chunks(1000, 64, 1, 3)[:2], [(1, slice(64, 128)), (4, slice(256, 320))])
+
+    def test_statistics(self):
+        rng = np.random.RandomState(0)
+        x = rng.normal(5., 2., 1000)
+        x[::50] = np.nan
+        stats = StreamingStats(['x'])
+        for chunk in np.array_split(x, 7):
+            stats.update({'x': chunk})
+        s = stats.summary()['x']
+        self.assertEqual(s['count'], 980)
+        self.assertAlmostEqual(s['mean'], np.nanmean(x), places=12)
+        self.assertAlmostEqual(s['std'], np.nanstd(x), places=12)
+        self.assertEqual((s['min'], s['max']), (np.nanmin(x), np.nanmax(x)))
+
+    def test_simulated_ranks(self):
+        # the reduction of any number of ranks gives the serial results and identical statistics
+        ref = sweep(self.D, self.P, self.H, outputs=['turbine_cost', 'tower_mass']).copy()
+        shape = ref['turbine_cost'].shape
+        inputs = [a.ravel() for a in np.meshgrid(self.D, self.P, self.H, indexing='ij')]
+
+        def evaluate_chunk(sl, buffers):
+            _evaluate(dict(zip(('rotor_diameter', 'machine_rating', 'hub_height'), [a[sl] for a in inputs])),
+                      buffers, slice(None), np.float64, 80., 0.90, {})
+
+        outputs = ['turbine_cost', 'tower_mass']
+        first = None
+        for size in (1, 2, 5):
+            payloads = [local_run(600, evaluate_chunk, outputs, rank, size, chunk_size=37) for rank in range(size)]
+            result, stats = reduce_runs(payloads, 600, outputs)
+            np.testing.assert_array_equal(result['turbine_cost'], ref['turbine_cost'].ravel())
+            first = first or stats.summary()
+            self.assertEqual(stats.summary(), first)
+        self.assertAlmostEqual(first['turbine_cost']['mean'], ref['turbine_cost'].mean(), delta=1e-6)
+
+        result, stats = distributed_sweep(self.D, self.P, self.H, outputs=outputs, comm=SerialComm(), chunk_size=37)
+        self.assertEqual(result['turbine_cost'].shape, shape)
+        np.testing.assert_array_equal(result['tower_mass'], ref['tower_mass'])
+
+    def test_monte_carlo(self):
+        distributions = {'rotor_diameter': lambda rng, size: rng.uniform(100., 160., size)}
+        fixed = {'machine_rating': 5000., 'hub_height': 90.}
+        samples, ref = monte_carlo(500, distributions, fixed, outputs=['turbine_cost'], seed=3, block_size=64)
+        s, results, stats = distributed_monte_carlo(500, distributions, fixed, outputs=['turbine_cost'], seed=3,
+                                                    comm=SerialComm(), chunk_size=50, block_size=64)
+        np.testing.assert_array_equal(s['rotor_diameter'], samples['rotor_diameter'])
+        np.testing.assert_array_equal(results['turbine_cost'], ref['turbine_cost'])
+        self.assertEqual(stats.count['turbine_cost'], 500)
+        self.assertEqual(stats.max['rotor_diameter'], samples['rotor_diameter'].max())
+
+    def mpirun(self, n_ranks, script):
+        env = dict(os.environ, OMPI_ALLOW_RUN_AS_ROOT='1', OMPI_ALLOW_RUN_AS_ROOT_CONFIRM='1',
+                   OMPI_MCA_rmaps_base_oversubscribe='1',
+                   PYTHONPATH=os.pathsep.join([os.path.dirname(os.path.dirname(distributed_2015.__file__))] +
+                                              [os.environ.get('PYTHONPATH', '')]))
+        out = subprocess.check_output(['mpirun', '-n', str(n_ranks), sys.executable, '-c', script], env=env)
+        return [float(v) for v in out.decode().split()]
+
+    @unittest.skipIf(distributed_2015.MPI is None or shutil.which('mpirun') is None, 'needs mpi4py and mpirun')
+    def test_mpirun(self):
+        script = ('import numpy as np\n'
+                  'from turbine_costsse.distributed_2015 import distributed_sweep\n'
+                  'D, P, H = np.linspace(60., 200., 15), np.linspace(1000., 10000., 10), np.linspace(60., 150., 4)\n'
+                  'result, stats = distributed_sweep(D, P, H, outputs=["turbine_cost"], chunk_size=37)\n'
+                  'if result is not None: print(repr(result["turbine_cost"].sum()), repr(stats.m2["turbine_cost"]))\n')
+        total, m2 = self.mpirun(3, script)
+
+        result, stats = distributed_sweep(self.D, self.P, self.H, outputs=['turbine_cost'], comm=SerialComm(),
+                                          chunk_size=37)
+        self.assertEqual(total, result['turbine_cost'].sum())
+        self.assertEqual(m2, stats.m2['turbine_cost'])
+
+    @unittest.skipIf(distributed_2015.MPI is None or shutil.which('mpirun') is None, 'needs mpi4py and mpirun')
+    def test_mpirun_monte_carlo(self):
+        # 1, 2 and 8 ranks draw and evaluate the same blocks
+        script = ('from turbine_costsse.distributed_2015 import distributed_monte_carlo\n'
+                  'd = {"rotor_diameter": lambda rng, size: rng.uniform(100., 160., size),\n'
+                  '     "tower_mass_cost_coeff": lambda rng, size: rng.normal(2.9, 0.2, size)}\n'
+                  's, r, stats = distributed_monte_carlo(3000, d, {"machine_rating": 5000., "hub_height": 90.},\n'
+                  '                                      outputs=["turbine_cost"], seed=11, block_size=200)\n'
+                  'if r is not None: print(repr(r["turbine_cost"].sum()), repr(s["rotor_diameter"][-1]),\n'
+                  '                        repr(stats.mean["turbine_cost"]), repr(stats.m2["turbine_cost"]))\n')
+        runs = [self.mpirun(n, script) for n in (1, 2, 8)]
+        self.assertEqual(runs[1], runs[0])
+        self.assertEqual(runs[2], runs[0])
+
+
+if __name__ == "__main__":
+    unittest.main()
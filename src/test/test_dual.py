@@ -0,0 +1,160 @@
+import inspect
+import unittest
+
+import numpy as np
+from openmdao.api import Component
+
+from turbine_costsse import equations_2015 as eq
+from turbine_costsse import turbine_costsse_2015, nrel_csm_tcc_2015
+from turbine_costsse.dual import Dual, jvp, jacobian, hessian, csm_hessian, component_jacobian
+from turbine_costsse.utilities import complex_step_jacobian
+
+
+class TestDual(unittest.TestCase):
+
+    def test_operations(self):
+        x = Dual(np.array([1., 2., 4.]), np.array([[1., 0.], [1., 0.], [1., 0.]]))
+        y = Dual(np.array(3.), np.array([0., 1.]))
+
+        z = np.exp(x/y) + np.sqrt(x)*y - 2.**x + np.log(x)**2
+        dx = np.exp(x.value/3.)/3. + 3.*0.5/np.sqrt(x.value) - np.log(2.)*2.**x.value + 2.*np.log(x.value)/x.value
+        dy = -np.exp(x.value/3.)*x.value/9. + np.sqrt(x.value)
+        np.testing.assert_allclose(z.tangent[:, 0], dx, rtol=1e-14)
+        np.testing.assert_allclose(z.tangent[:, 1], dy, rtol=1e-14)
+
+        w = np.where(x.value > 1.5, x*y, -x)
+        np.testing.assert_array_equal(w.tangent, [[-1., 0.], [3., 2.], [3., 4.]])
+        np.testing.assert_array_equal(np.maximum(x, 2.5).tangent[:, 0], [0., 0., 1.])
+        np.testing.assert_array_equal(np.sum(x*x).tangent, [14., 0.])
+        np.testing.assert_array_equal(x[1:].value, [2., 4.])
+        np.testing.assert_array_equal(np.expand_dims(x, -1).tangent.shape, (3, 1, 2))
+        self.assertTrue(x[2] > y)
+
+    def test_user_equation(self):
+        # a modified blade mass equation with an exponential correction
+        def blade_mass(rotor_diameter, coeff):
+            return coeff * (rotor_diameter/2.)**2.5 * np.exp(-rotor_diameter/500.)
+
+        D = np.linspace(80., 200., 7)
+        out, J = jacobian(blade_mass, {'rotor_diameter': D, 'coeff': 0.5})
+        self.assertEqual(J.shape, (7, 2))
+        dD = out * (2.5/D - 1./500.)
+        np.testing.assert_allclose(J[:, 0], dD, rtol=1e-14)
+        np.testing.assert_allclose(J[:, 1], out/0.5, rtol=1e-14)
+
+
+class TestEquations(unittest.TestCase):
+
+    def test_csm_model(self):
+        D = np.array([80., 126., 180.])
+        P = np.array([2000., 5000., 8000.])
+        inputs = {'rotor_diameter': D, 'machine_rating': P, 'hub_height': 90., 'rotor_torque': eq.rotor_torque(P, D)}
+        kwargs = dict(crane=True, coeffs={'turbine_profitMultiplier': 0.1, 'nacelle_assemblyCostMultiplier': 0.05})
+
+        out, J = jacobian(eq.csm_model, inputs, wrt=eq.JACOBIAN_INPUTS, **kwargs)
+        ref_out, ref_J = eq.csm_model_jacobian(D, P, 90., inputs['rotor_torque'], **kwargs)
+        self.assertEqual(list(J), list(ref_J))
+        for k in ref_J:
+            np.testing.assert_allclose(out[k], ref_out[k], rtol=1e-15)
+            np.testing.assert_allclose(J[k], ref_J[k], rtol=1e-12, atol=1e-12, err_msg=k)
+
+    def test_many_directions(self):
+        # 20 directions over the inputs and a coefficient in one evaluation
+        rng = np.random.RandomState(0)
+        directions = rng.randn(5, 20)
+        inputs = {'rotor_diameter': 126., 'machine_rating': 5000., 'hub_height': 90., 'rotor_torque': 4.3e6}
+        names = list(inputs) + ['tower_mass_cost_coeff']
+
+        def model(rotor_diameter, machine_rating, hub_height, rotor_torque, tower_mass_cost_coeff):
+            return eq.csm_model(rotor_diameter, machine_rating, hub_height, rotor_torque,
+                                coeffs={'tower_mass_cost_coeff': tower_mass_cost_coeff})
+
+        primals = dict(inputs, tower_mass_cost_coeff=2.9)
+        out, d = jvp(model, primals, dict((k, directions[j]) for j, k in enumerate(names)))
+        out, J = jacobian(model, primals, wrt=names)
+        np.testing.assert_allclose(d['turbine_cost'], J['turbine_cost'].dot(directions), rtol=1e-12)
+
+    def test_hessian(self):
+        # against central differences of the analytic Jacobian
+        D = np.array([80., 126., 180., 100.])
+        P = np.array([2000., 5000., 8000., 3000.])
+        H = np.array([80., 90., 120., 100.])
+        Q = eq.rotor_torque(P, D)
+        crane = True
+        outputs = ('turbine_cost_kW', 'turbine_cost', 'tower_mass')
+
+        value, grad, hess = csm_hessian(D, P, H, outputs=outputs, fixed_rotor_torque=Q, crane=crane)
+        self.assertEqual(hess['turbine_cost_kW'].shape, (4, 3, 3))
+
+        x = [D, P, H]
+        ref_out, ref_J = eq.csm_model_jacobian(D, P, H, Q, crane=crane)
+        for i in range(3):
+            step = 1e-4 * x[i]
+            plus = [v + step*(j == i) for j, v in enumerate(x)]
+            minus = [v - step*(j == i) for j, v in enumerate(x)]
+            _, Jp = eq.csm_model_jacobian(*(plus + [Q]), crane=crane)
+            _, Jm = eq.csm_model_jacobian(*(minus + [Q]), crane=crane)
+            for k in outputs:
+                fd = (Jp[k][:, :3] - Jm[k][:, :3]) / (2*step[:, None])
+                np.testing.assert_allclose(hess[k][..., i], fd, rtol=1e-6, atol=1e-12, err_msg=k)
+
+        for k in outputs:
+            np.testing.assert_allclose(value[k], ref_out[k], rtol=1e-14)
+            np.testing.assert_allclose(grad[k], ref_J[k][:, :3], rtol=1e-14)
+            np.testing.assert_allclose(hess[k], np.swapaxes(hess[k], -1, -2), rtol=1e-12, atol=1e-12)
+
+    def test_hessian_optimizer_objective(self):
+        # the rotor torque follows the rating and diameter as in optimize_turbine_cost
+        from turbine_costsse.optimization_2015 import _Model
+
+        D = np.array([80., 126., 180.])
+        P = np.array([2000., 5000., 8000.])
+        H = np.array([80., 90., 120.])
+        value, grad, hess = csm_hessian(D, P, H, max_tip_speed=85., max_efficiency=0.92, crane=True)
+        model = _Model(85., 0.92, True, {'crane': True})
+        for d in range(3):
+            x = np.array([D[d], P[d], H[d]])
+            np.testing.assert_allclose(value['turbine_cost_kW'][d], model.outputs(x)['turbine_cost_kW'], rtol=1e-14)
+            np.testing.assert_allclose(grad['turbine_cost_kW'][d], model.jacobian(x)['turbine_cost_kW'], rtol=1e-12)
+            for i in range(3):
+                step = 1e-4 * x[i] * np.eye(3)[i]
+                plus, minus = model.jacobian(x + step)['turbine_cost_kW'], model.jacobian(x - step)['turbine_cost_kW']
+                fd = (plus - minus) / (2*step[i])
+                np.testing.assert_allclose(hess['turbine_cost_kW'][d, :, i], fd, rtol=1e-6, atol=1e-12)
+
+    def test_hessian_user_equation(self):
+        f = lambda x, y: x**3 * np.log(y) + np.exp(x*y)
+        x, y = np.array([0.5, 1.5]), 2.
+        value, grad, hess = hessian(f, {'x': x, 'y': y})
+        exy = np.exp(x*y)
+        ref = [[6*x*np.log(y) + y*y*exy, 3*x*x/y + exy + x*y*exy],
+               [3*x*x/y + exy + x*y*exy, -x**3/y**2 + x*x*exy]]
+        np.testing.assert_allclose(hess, np.moveaxis(np.array(ref), -1, 0), rtol=1e-14)
+
+
+class TestComponents(unittest.TestCase):
+
+    values = {'blade_mass': 17650.67, 'hub_mass': 31644.5, 'pitch_system_mass': 17004.0, 'lss_mass': 31257.3,
+              'main_bearing_mass': 4865.7, 'gearbox_mass': 30237.6, 'bedplate_mass': 93090.6,
+              'tower_mass': 434559.0, 'platforms_mass': 8220., 'machine_rating': 5000.0, 'rotor_diameter': 126.0,
+              'hub_height': 90.0, 'rotor_torque': 4.37e6, 'hub_cost': 1.2e5, 'rotor_cost': 1.3e6,
+              'nacelle_cost': 2.5e6, 'tower_cost': 1.3e6, 'tower_parts_cost': 1.3e6, 'blade_cost': 2.5e5,
+              'hub_profitMultiplier': 0.1, 'turbine_transportMultiplier': 0.03}
+    args = {'CostEscalation2015': (3,), 'CostScenarios2015': (2,), 'Outputs2Screen': (False,)}
+
+    def test_against_complex_step(self):
+        for module in (turbine_costsse_2015, nrel_csm_tcc_2015):
+            for name, cls in inspect.getmembers(module, inspect.isclass):
+                if not issubclass(cls, Component) or cls.__module__ != module.__name__:
+                    continue
+                comp = cls(*self.args.get(name, ()))
+                params = dict((k, v) for k, v in self.values.items() if k in comp._init_params_dict)
+                _, J = component_jacobian(comp, params)
+                _, J_cs = complex_step_jacobian(comp, params)
+                self.assertEqual(set(J), set(J_cs), msg=name)
+                for key in J_cs:
+                    np.testing.assert_allclose(J[key], J_cs[key], rtol=1e-12, atol=1e-12, err_msg=str((name, key)))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,184 @@
+import subprocess
+import sys
+import unittest
+
+import numpy as np
+
+from turbine_costsse import equations_2015 as eq
+
+
+def nrel5mw_torque(machine_rating, rotor_diameter):
+    ratedHubPower = machine_rating*1000. / 0.90
+    rotorSpeed = (80.0/(0.5*rotor_diameter)) * (60.0 / (2*np.pi))
+    return ratedHubPower/(rotorSpeed*(np.pi/30))
+
+
+class TestImport(unittest.TestCase):
+
+    def test_no_openmdao(self):
+        code = ("import sys, turbine_costsse, turbine_costsse.equations_2015; "
+                "print('openmdao' in sys.modules)")
+        out = subprocess.check_output([sys.executable, '-c', code])
+        self.assertEqual(out.strip(), b'False')
+
+    def test_lazy_wrappers(self):
+        import turbine_costsse
+        from turbine_costsse.turbine_costsse_2015 import Turbine_CostsSE_2015
+        self.assertIs(turbine_costsse.Turbine_CostsSE_2015, Turbine_CostsSE_2015)
+        with self.assertRaises(AttributeError):
+            turbine_costsse.not_a_model
+
+
+class TestAgainstOpenMDAO(unittest.TestCase):
+
+    def test_cost_model(self):
+        from openmdao.api import Problem
+        from turbine_costsse.turbine_costsse_2015 import Turbine_CostsSE_2015
+
+        masses = {'blade_mass': 17650.67, 'hub_mass': 31644.5, 'pitch_system_mass': 17004.0,
+                  'spinner_mass': 1810.5, 'lss_mass': 31257.3, 'main_bearing_mass': 9731.41 / 2,
+                  'gearbox_mass': 30237.60, 'hss_mass': 1492.45, 'generator_mass': 16699.85,
+                  'bedplate_mass': 93090.6, 'yaw_mass': 11878.24, 'tower_mass': 434559.0,
+                  'vs_electronics_mass': 1000., 'hvac_mass': 1000., 'cover_mass': 1000.,
+                  'platforms_mass': 1000., 'transformer_mass': 1000.}
+        coeffs = {'nacelle_profitMultiplier': 0.1, 'turbine_transportMultiplier': 0.05}
+
+        prob = Problem(Turbine_CostsSE_2015())
+        prob.setup(check=False)
+        for k, v in masses.items():
+            prob[k] = v
+        for k, v in coeffs.items():
+            prob[k] = v
+        prob['machine_rating'] = 5000.0
+        prob['blade_number'] = 3
+        prob['crane'] = True
+        prob['main_bearing_number'] = 2
+        prob.run()
+
+        out = eq.cost_model(masses, 5000.0, blade_number=3, main_bearing_number=2, crane=True, coeffs=coeffs)
+        for k, v in out.items():
+            self.assertAlmostEqual(v, prob[k], delta=1e-9*max(1., abs(v)), msg=k)
+
+    def test_csm_model(self):
+        from openmdao.api import Problem
+        from turbine_costsse.nrel_csm_tcc_2015 import nrel_csm_2015
+
+        prob = Problem(nrel_csm_2015(drivetrain=True))
+        prob.setup(check=False)
+        prob['rotor_diameter'] = 126.0
+        prob['turbine_class'] = 1
+        prob['blade_has_carbon'] = False
+        prob['blade_number'] = 3
+        prob['machine_rating'] = 5000.0
+        prob['hub_height'] = 90.0
+        prob['bearing_number'] = 2
+        prob['crane'] = True
+        prob['max_tip_speed'] = 80.0
+        prob['max_efficiency'] = 0.90
+        prob.run()
+
+        out = eq.csm_model(126.0, 5000.0, 90.0, nrel5mw_torque(5000.0, 126.0), crane=True)
+        self.assertEqual(prob['rotor_torque'], nrel5mw_torque(5000.0, 126.0))
+        for k, v in out.items():
+            self.assertAlmostEqual(v, prob[k], delta=1e-9*max(1., abs(v)), msg=k)
+
+        # by default the torque is an input
+        prob = Problem(nrel_csm_2015())
+        prob.setup(check=False)
+        prob['rotor_diameter'] = 126.0
+        prob['machine_rating'] = 5000.0
+        prob['hub_height'] = 90.0
+        prob['rotor_torque'] = 4e6
+        prob.run()
+        self.assertAlmostEqual(prob['gearbox_mass'], eq.csm_model(126.0, 5000.0, 90.0, 4e6)['gearbox_mass'],
+                               delta=1e-9)
+
+    def test_switches(self):
+        from openmdao.api import Problem
+        from turbine_costsse.nrel_csm_tcc_2015 import nrel_csm_2015
+
+        # the blade and bearing counts and the crane flag are float params, changed between runs without setup
+        prob = Problem(nrel_csm_2015(drivetrain=True))
+        prob.setup(check=False)
+        prob['rotor_diameter'] = 126.0
+        prob['machine_rating'] = 5000.0
+        prob['hub_height'] = 90.0
+        prob['max_tip_speed'] = 80.0
+        prob['max_efficiency'] = 0.90
+        for blade_number, bearing_number, crane in [(3, 2, True), (2, 1, False), (3, 2, False), (2, 2, True)]:
+            prob['blade_number'] = blade_number
+            prob['bearing_number'] = prob['main_bearing_number'] = bearing_number
+            prob['crane'] = crane
+            prob.run()
+
+            out = eq.csm_model(126.0, 5000.0, 90.0, nrel5mw_torque(5000.0, 126.0), blade_number=blade_number,
+                               bearing_number=bearing_number, crane=crane)
+            for k in ('rotor_cost', 'other_mass', 'other_cost', 'nacelle_cost', 'turbine_cost', 'turbine_mass'):
+                self.assertAlmostEqual(out[k], prob[k], delta=1e-9*max(1., abs(out[k])), msg=k)
+
+
+class TestVectorized(unittest.TestCase):
+
+    def test_batch_matches_scalar(self):
+        D = np.array([80., 126., 150.])
+        P = np.array([2000., 5000., 8000.])
+        H = np.array([70., 90., 110.])
+        Q = nrel5mw_torque(P, D)
+
+        batch = eq.csm_model(D, P, H, Q, turbine_class=2, blade_has_carbon=True)
+        for i in range(len(D)):
+            single = eq.csm_model(D[i], P[i], H[i], Q[i], turbine_class=2, blade_has_carbon=True)
+            for k, v in single.items():
+                self.assertAlmostEqual(batch[k][i], v, delta=1e-9*max(1., abs(v)), msg=k)
+
+    def test_mixed_options(self):
+        # one batch mixing turbine classes, carbon blades, cranes and external costs
+        n = 8
+        D = np.linspace(80., 160., n)
+        P = np.linspace(2000., 8000., n)
+        H = np.full(n, 90.)
+        Q = nrel5mw_torque(P, D)
+        options = dict(turbine_class=np.array([0, 1, 1, 2, 3, 0, 2, 1]),
+                       blade_has_carbon=np.array([False, True, False, True, False, True, False, True]),
+                       crane=np.array([True, False, True, False, True, False, True, False]),
+                       blade_cost_external=np.array([0., 0., 3e5, 0., 0., 2e5, 0., 0.]),
+                       tower_cost_external=np.array([0., 1e6, 0., 0., 0., 0., 0., 1.2e6]))
+
+        batch, J = eq.csm_model_jacobian(D, P, H, Q, **options)
+        for i in range(n):
+            single, J_single = eq.csm_model_jacobian(D[i], P[i], H[i], Q[i],
+                                                     **dict((k, v[i].item()) for k, v in options.items()))
+            for k, v in single.items():
+                self.assertEqual(batch[k][i], v, msg=k)
+                np.testing.assert_array_equal(J[k][i], J_single[k], err_msg=k)
+
+        self.assertEqual(eq.blade_mass_exp(0, True, 2.3), 2.3)
+        np.testing.assert_array_equal(eq.blade_mass_exp([0, 1, 1, 2, 3], [False, False, True, False, True], 2.3),
+                                      [2.3, 2.54, 2.47, 2.50, 2.44])
+
+    def test_drivetrain_loads(self):
+        P = np.array([2000., 5000., 8000.])
+        D = np.array([80., 126., 150.])
+        tip = np.array([70., 80., 90.])
+        eff = np.array([0.92, 0.90, 0.95])
+        loads = eq.drivetrain_loads(P, D, tip, eff)
+        np.testing.assert_array_equal(loads['rotor_torque'], eq.rotor_torque(P, D, tip, eff))
+        np.testing.assert_allclose(loads['rotor_speed'] * np.pi / 30. * D / 2., tip, rtol=1e-15)
+        self.assertEqual(eq.drivetrain_loads(5000., D)['rotor_torque'][1], nrel5mw_torque(5000., 126.))
+
+        # analytic partials against complex step
+        J = eq.drivetrain_partials(P, D, tip, eff)
+        args = dict(machine_rating=P, rotor_diameter=D, max_tip_speed=tip, max_efficiency=eff)
+        for name in args:
+            step = dict(args, **{name: args[name] + 1e-30j})
+            out = eq.drivetrain_loads(**step)
+            for k in out:
+                np.testing.assert_allclose(J.get((k, name), 0.), out[k].imag / 1e-30, rtol=1e-14, err_msg=str((k, name)))
+
+    def test_unknown_coeff(self):
+        with self.assertRaises(KeyError):
+            eq.csm_model(126., 5000., 90., 4e6, coeffs={'blade_mass_coef': 1.})
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,97 @@
+import unittest
+
+import numpy as np
+
+from turbine_costsse.equations_2015 import csm_model, rotor_torque
+from turbine_costsse.escalation_2015 import annual_index, escalate_costs
+
+
+class TestEscalateCosts(unittest.TestCase):
+
+    def setUp(self):
+        self.D = np.array([100., 126., 150., 180.])
+        self.P = np.array([3000., 5000., 6000., 8000.])
+        self.coeffs = {'turbine_profitMultiplier': 0.1, 'nacelle_assemblyCostMultiplier': 0.05}
+        self.costs = csm_model(self.D, self.P, 90., rotor_torque(self.P, self.D), crane=True, coeffs=self.coeffs)
+        self.years = np.arange(2015, 2041)
+
+    def test_base_year_reproduces_model(self):
+        out = escalate_costs(self.costs, {'default': annual_index(self.years, 0.03)}, machine_rating=self.P,
+                             coeffs=self.coeffs)
+        self.assertEqual(out['turbine_cost'].shape, (4, len(self.years)))
+        for k in ('hub_system_cost', 'rotor_cost', 'nacelle_cost', 'tower_cost', 'turbine_cost', 'turbine_cost_kW'):
+            np.testing.assert_allclose(out[k][:, 0], self.costs[k], rtol=1e-14)
+
+        # a single rate scales every cost alike
+        np.testing.assert_allclose(out['turbine_cost'], self.costs['turbine_cost'][:, None] * 1.03**(self.years - 2015),
+                                   rtol=1e-14)
+
+    def test_subsystem_indices(self):
+        tower = annual_index(self.years, 0.05)
+        blade = annual_index(self.years, -0.01)
+        out = escalate_costs(self.costs, {'tower': tower, 'blade_cost': blade}, coeffs=self.coeffs)
+
+        np.testing.assert_allclose(out['tower_cost'], self.costs['tower_cost'][:, None] * tower, rtol=1e-14)
+        np.testing.assert_allclose(out['nacelle_cost'], np.repeat(self.costs['nacelle_cost'][:, None], 26, axis=1),
+                                   rtol=1e-14)
+        rotor = 3*self.costs['blade_cost'][:, None]*blade + self.costs['hub_system_cost'][:, None]
+        np.testing.assert_allclose(out['rotor_cost'], rotor, rtol=1e-14)
+        turbine = 1.1*(rotor + out['nacelle_cost'] + out['tower_cost'])
+        np.testing.assert_allclose(out['turbine_cost'], turbine, rtol=1e-14)
+
+        # designs x years for every design, matching a loop over single designs
+        for i in range(4):
+            single = escalate_costs(dict((k, v[i]) for k, v in self.costs.items()),
+                                    {'tower': tower, 'blade_cost': blade}, coeffs=self.coeffs)
+            np.testing.assert_allclose(single['turbine_cost'], out['turbine_cost'][i], rtol=1e-14)
+
+    def test_per_design_counts(self):
+        # as many designs as years, so unexpanded counts would broadcast against the years without an error
+        years = np.arange(2015, 2019)
+        index = annual_index(years, 0.04)
+        blade_number = np.array([2, 3, 3, 2])
+        bearing_number = np.array([1, 2, 1, 2])
+        profit = np.array([0.1, 0.12, 0.08, 0.1])
+        coeffs = dict(self.coeffs, turbine_profitMultiplier=profit)
+        costs = csm_model(self.D, self.P, 90., rotor_torque(self.P, self.D), blade_number=blade_number,
+                          bearing_number=bearing_number, crane=True, coeffs=coeffs)
+        out = escalate_costs(costs, {'default': index}, blade_number, bearing_number, machine_rating=self.P,
+                             coeffs=coeffs)
+        for k in ('rotor_cost', 'nacelle_cost', 'turbine_cost', 'turbine_cost_kW'):
+            np.testing.assert_allclose(out[k], costs[k][:, None] * index, rtol=1e-14, err_msg=k)
+
+    def test_bad_indices(self):
+        with self.assertRaises(KeyError):
+            escalate_costs(self.costs, {'towr': np.ones(3)})
+        with self.assertRaises(ValueError):
+            escalate_costs(self.costs, {'tower': np.ones(3), 'rotor': np.ones(4)})
+
+
+class TestCostEscalation2015(unittest.TestCase):
+
+    def test_component(self):
+        from openmdao.api import Problem, Group
+        from turbine_costsse.turbine_costsse_2015 import CostEscalation2015
+
+        years = np.arange(2015, 2031)
+        costs = csm_model(126., 5000., 90., rotor_torque(5000., 126.), crane=True)
+        prob = Problem(Group())
+        prob.root.add('escalation', CostEscalation2015(len(years)), promotes=['*'])
+        prob.setup(check=False)
+        for k, v in costs.items():
+            if k in prob.root.escalation.params:
+                prob[k] = v
+        prob['machine_rating'] = 5000.
+        prob['tower_profitMultiplier'] = 0.2
+        prob['nacelle_price_index'] = annual_index(years, 0.02)
+        prob.run()
+
+        ref = escalate_costs(costs, {'nacelle': annual_index(years, 0.02)}, machine_rating=5000.,
+                             coeffs={'tower_profitMultiplier': 0.2})
+        np.testing.assert_allclose(prob['turbine_cost_escalated'], ref['turbine_cost'], rtol=1e-14)
+        np.testing.assert_allclose(prob['turbine_cost_kW_escalated'], ref['turbine_cost_kW'], rtol=1e-14)
+        self.assertAlmostEqual(prob['tower_cost_escalated'][0], 1.2*costs['tower_cost'], delta=1e-6)
+
+
+if __name__ == "__main__":
+    unittest.main()
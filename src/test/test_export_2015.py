@@ -0,0 +1,78 @@
+import os
+import shutil
+import tempfile
+import unittest
+
+import numpy as np
+
+from turbine_costsse import export_2015
+from turbine_costsse.export_2015 import to_columns, to_record_batch, write_table, read_table
+from turbine_costsse.sweep_2015 import sweep, iter_sweep
+
+
+class TestExport(unittest.TestCase):
+
+    D = np.linspace(60., 200., 15)
+    P = np.linspace(1000., 10000., 10)
+    H = np.linspace(60., 150., 4)
+
+    def setUp(self):
+        self.tmpdir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.tmpdir)
+
+    def test_iter_sweep(self):
+        ref = sweep(self.D, self.P, self.H, outputs=['turbine_cost', 'nacelle_mass'])
+        chunks = list(iter_sweep(self.D, self.P, self.H, outputs=['turbine_cost', 'nacelle_mass'], chunk_size=128))
+        self.assertEqual([len(c['turbine_cost']) for c in chunks], [128, 128, 128, 128, 88])
+        self.assertEqual(list(chunks[0]), ['rotor_diameter', 'machine_rating', 'hub_height', 'turbine_cost', 'nacelle_mass'])
+        np.testing.assert_array_equal(np.concatenate([c['turbine_cost'] for c in chunks]), ref['turbine_cost'].ravel())
+        np.testing.assert_array_equal(np.concatenate([c['hub_height'] for c in chunks]),
+                                      np.broadcast_to(self.H, ref['turbine_cost'].shape).ravel())
+
+    def test_columns(self):
+        rec = sweep(self.D, self.P, self.H, structured=True)
+        cols = to_columns(rec, columns=['tower_cost', 'blade_mass'])
+        self.assertEqual(list(cols), ['tower_cost', 'blade_mass'])
+        self.assertTrue(cols['tower_cost'].flags['C_CONTIGUOUS'])
+        np.testing.assert_array_equal(cols['blade_mass'], rec['blade_mass'].ravel())
+        with self.assertRaises(KeyError):
+            to_columns(rec, columns=['blade_cost_kW'])
+
+    def test_npy_round_trip(self):
+        path = os.path.join(self.tmpdir, 'parts')
+        chunks = iter_sweep(self.D, self.P, self.H, dtype=np.float32, chunk_size=100)
+        self.assertEqual(write_table(path, chunks, format='npy'), 600)
+        self.assertEqual(len(os.listdir(path)), 6)
+        table = read_table(path, columns=['rotor_diameter', 'turbine_cost'])
+        ref = sweep(self.D, self.P, self.H, dtype=np.float32)
+        self.assertEqual(table['turbine_cost'].dtype, np.float32)
+        np.testing.assert_array_equal(table['turbine_cost'], ref['turbine_cost'].ravel())
+
+        # a rewrite with fewer chunks leaves no parts of the first write
+        chunks = iter_sweep(self.D[:5], self.P, self.H, dtype=np.float32, chunk_size=100)
+        self.assertEqual(write_table(path, chunks, format='npy'), 200)
+        self.assertEqual(len(os.listdir(path)), 2)
+        np.testing.assert_array_equal(read_table(path)['turbine_cost'], ref['turbine_cost'][:5].ravel())
+
+    @unittest.skipIf(export_2015.pa is None, 'pyarrow is not installed')
+    def test_record_batch_shares_memory(self):
+        cols = {'turbine_cost': np.linspace(1., 2., 50), 'turbine_mass': np.linspace(3., 4., 50)}
+        batch = to_record_batch(cols)
+        self.assertEqual(batch.num_rows, 50)
+        self.assertEqual(batch.column(0).buffers()[1].address, cols['turbine_cost'].ctypes.data)
+
+    @unittest.skipIf(export_2015.pa is None, 'pyarrow is not installed')
+    def test_parquet_round_trip(self):
+        path = os.path.join(self.tmpdir, 'sweep.parquet')
+        self.assertEqual(write_table(path, iter_sweep(self.D, self.P, self.H, chunk_size=256)), 600)
+        self.assertEqual(export_2015.pq.ParquetFile(path).num_row_groups, 3)
+        table = read_table(path)
+        ref = sweep(self.D, self.P, self.H)
+        for k in ref:
+            np.testing.assert_array_equal(table[k], ref[k].ravel())
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,118 @@
+import unittest
+
+import numpy as np
+
+from turbine_costsse.equations_2015 import cost_model, default_coeffs
+from turbine_costsse.fleet_2015 import FleetAggregate, MASS_INPUTS, fleet_costs
+
+
+turbine = {'blade_mass': 17650.67, 'hub_mass': 31644.5, 'pitch_system_mass': 17004.0, 'spinner_mass': 1810.5,
+           'lss_mass': 31257.3, 'main_bearing_mass': 9731.41 / 2, 'gearbox_mass': 30237.60,
+           'hss_mass': 1492.45, 'generator_mass': 16699.85, 'bedplate_mass': 93090.6, 'yaw_mass': 11878.24,
+           'tower_mass': 434559.0, 'vs_electronics_mass': 1000., 'hvac_mass': 1000., 'cover_mass': 1000.,
+           'platforms_mass': 1000., 'transformer_mass': 1000., 'machine_rating': 5000.0, 'crane': True}
+
+
+class TestFleetCosts(unittest.TestCase):
+
+    def setUp(self):
+        self.records = [dict(turbine, project='A', site=i % 3) for i in range(150)]
+        self.records += [dict(turbine, tower_mass=5e5, project='B', site=0) for i in range(20)]
+        self.records += [dict(turbine, project='B', site=0, turbine_profitMultiplier=0.1) for i in range(5)]
+        self.single = cost_model(turbine, 5000., crane=True)
+
+    def test_deduplication(self):
+        fleet = fleet_costs(self.records, group_by=('project',))
+        self.assertEqual(fleet.n_designs, 3)
+        self.assertEqual(list(fleet.design_index[[0, 149, 150, 170]]), [0, 0, 1, 2])
+        self.assertAlmostEqual(fleet.design_outputs['turbine_cost'][0], self.single['turbine_cost'], delta=1e-6)
+
+        self.assertEqual(list(fleet.groups), [('A',), ('B',)])
+        a = fleet.groups[('A',)]
+        self.assertEqual(a['n_turbines'], 150)
+        for k in ('rotor_cost', 'nacelle_cost', 'tower_cost', 'turbine_cost'):
+            self.assertAlmostEqual(a[k], 150*self.single[k], delta=1e-6*a[k])
+        self.assertEqual(fleet.groups[('B',)]['n_turbines'], 25)
+
+    def test_groups_add_up(self):
+        fleet = fleet_costs(self.records, group_by=('project', 'site'), use_openmdao=False)
+        self.assertEqual(len(fleet.groups), 4)
+        totals = fleet.totals()
+        self.assertEqual(totals['n_turbines'], len(self.records))
+        self.assertAlmostEqual(sum(g['turbine_cost'] for g in fleet.groups.values()), totals['turbine_cost'],
+                               delta=1e-6*totals['turbine_cost'])
+        per_turbine = fleet.turbine_outputs()['turbine_cost']
+        self.assertEqual(per_turbine.shape, (len(self.records),))
+        self.assertAlmostEqual(per_turbine.sum(), totals['turbine_cost'], delta=1e-6*totals['turbine_cost'])
+
+    def test_openmdao_and_equations_agree(self):
+        om = fleet_costs(self.records, outputs=('turbine_cost', 'nacelle_mass', 'other_cost'))
+        eq = fleet_costs(self.records, outputs=('turbine_cost', 'nacelle_mass', 'other_cost'), use_openmdao=False)
+        for k in om.outputs:
+            np.testing.assert_allclose(om.design_outputs[k], eq.design_outputs[k], rtol=1e-12)
+        self.assertEqual(list(om.groups), [()])
+
+    def test_switches(self):
+        # counts and the crane flag are floats as in the components, and equal values share a design
+        fleet = fleet_costs([dict(turbine, blade_number=2), dict(turbine, blade_number=2.0, crane=1.)],
+                            use_openmdao=False)
+        self.assertEqual(fleet.n_designs, 1)
+        self.assertAlmostEqual(fleet.design_outputs['rotor_cost'][0],
+                               cost_model(turbine, 5000., blade_number=2, crane=True)['rotor_cost'], delta=1e-6)
+        for bad in ({'blade_number': 2.7}, {'main_bearing_number': 0}, {'crane': 'False'}, {'crane': 0.5}):
+            self.assertRaises(ValueError, fleet_costs, [dict(turbine, **bad)], use_openmdao=False)
+
+
+class TestFleetAggregate(unittest.TestCase):
+
+    def setUp(self):
+        rng = np.random.RandomState(1)
+        n = 200
+        self.masses = dict((k, turbine[k] * rng.uniform(0.8, 1.2, n)) for k in MASS_INPUTS if k in turbine)
+        self.rating = rng.uniform(3000., 6000., n)
+        self.counts = rng.randint(1, 10, n)
+        self.groups = rng.randint(0, 4, n)
+        self.crane = rng.rand(n) > 0.5
+        self.aggregate = FleetAggregate(self.masses, self.rating, counts=self.counts, group_index=self.groups,
+                                        crane=self.crane, tower_cost_external=1e5, chunk_size=64)
+
+    def rerun(self, coeffs):
+        out = cost_model(self.masses, self.rating, crane=self.crane, tower_cost_external=1e5, coeffs=coeffs)
+        return dict((k, np.bincount(self.groups, weights=self.counts * out[k]))
+                    for k in ('rotor_cost', 'nacelle_cost', 'tower_cost', 'turbine_cost'))
+
+    def test_updates_match_rerun(self):
+        changes = [{'gearbox_mass_cost_coeff': 14.0}, {'crane_cost': 15000., 'nacelle_profitMultiplier': 0.1},
+                   {'gearbox_mass_cost_coeff': 11.0, 'turbine_transportMultiplier': 0.05}]
+        coeffs = {}
+        for change in changes:
+            self.aggregate.update(**change)
+            coeffs.update(change)
+            totals, expected = self.aggregate.totals(), self.rerun(coeffs)
+            for k, v in expected.items():
+                np.testing.assert_allclose(totals[k], v, rtol=1e-12)
+        np.testing.assert_allclose(totals['turbine_cost_kW'],
+                                   expected['turbine_cost'] / np.bincount(self.groups, self.counts * self.rating))
+        np.testing.assert_array_equal(totals['n_turbines'], np.bincount(self.groups, self.counts))
+        self.assertRaises(KeyError, self.aggregate.update, gearbox_mass=1.)
+
+    def test_equal_coefficients(self):
+        # coefficients equal to the stored ones, such as a copy of the defaults, are not expanded about
+        totals = self.aggregate.totals()
+        self.aggregate._basis = np.full_like(self.aggregate._basis, np.nan)
+        out = self.aggregate._rollup(**default_coeffs(dict(self.aggregate.coeffs)))
+        for k in ('rotor_cost', 'nacelle_cost', 'tower_cost', 'turbine_cost'):
+            np.testing.assert_array_equal(out[k], totals[k])
+
+    def test_sensitivities(self):
+        names = ['gearbox_mass_cost_coeff', 'nacelle_overheadCostMultiplier', 'turbine_profitMultiplier']
+        derivs = self.aggregate.sensitivities(names)
+        h = 1e-6
+        for j, k in enumerate(names):
+            step = self.rerun({k: self.aggregate.coeffs[k] + h})['turbine_cost']
+            fd = (step - self.rerun({})['turbine_cost']) / h
+            np.testing.assert_allclose(derivs['turbine_cost'][:, j], fd, rtol=1e-5)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,76 @@
+import unittest
+
+import numpy as np
+
+from turbine_costsse import equations_2015 as eq
+from turbine_costsse.optimization_2015 import optimize_turbine_cost
+
+
+class TestJacobian(unittest.TestCase):
+
+    def test_against_central_differences(self):
+        x0 = np.array([126., 5000., 90., 4.3e6])
+        kwargs = dict(crane=True, turbine_class=2,
+                      coeffs={'turbine_profitMultiplier': 0.1, 'hub_assemblyCostMultiplier': 0.2})
+        out, jac = eq.csm_model_jacobian(*x0, **kwargs)
+        self.assertEqual(list(out), list(jac))
+
+        for j in range(len(eq.JACOBIAN_INPUTS)):
+            h = np.zeros(4)
+            h[j] = 1e-6 * x0[j]
+            op = eq.csm_model(*(x0 + h), **kwargs)
+            om = eq.csm_model(*(x0 - h), **kwargs)
+            for k in out:
+                fd = (op[k] - om[k]) / (2*h[j])
+                self.assertAlmostEqual(jac[k][j], fd, delta=1e-6*max(1., abs(fd)), msg=(k, j))
+
+    def test_external_costs_have_no_mass_derivative(self):
+        out, jac = eq.csm_model_jacobian(126., 5000., 90., 4.3e6, blade_cost_external=2e5, tower_cost_external=5e5)
+        np.testing.assert_array_equal(jac['blade_cost'], 0.)
+        np.testing.assert_array_equal(jac['tower_parts_cost'], 0.)
+
+
+class TestOptimizeTurbineCost(unittest.TestCase):
+
+    x0 = {'rotor_diameter': 126.0, 'machine_rating': 5000.0, 'hub_height': 90.0}
+
+    def test_active_constraint(self):
+        # cost grows with hub height, so a lower limit on the tower mass is active at the optimum
+        res = optimize_turbine_cost(self.x0, objective='turbine_cost', design_vars=('hub_height',),
+                                    constraints=[('tower_mass', 250e3, None)])
+        self.assertTrue(res.success)
+        H = (250e3 / eq.MASS_COEFFS_2015['tower_mass_coeff'])**(1. / eq.MASS_COEFFS_2015['tower_mass_exp'])
+        self.assertAlmostEqual(res.design['hub_height'], H, delta=1e-5*H)
+        self.assertEqual(res.design['rotor_diameter'], 126.0)
+        self.assertAlmostEqual(res.outputs['tower_mass'], 250e3, delta=1.)
+
+    def test_exact_and_fd_agree(self):
+        bounds = {'rotor_diameter': (100., 160.), 'machine_rating': (3000., 8000.), 'hub_height': (80., 120.)}
+        constraints = [('nacelle_mass', None, 150e3)]
+        exact = optimize_turbine_cost(self.x0, bounds=bounds, constraints=constraints, crane=True)
+        fd = optimize_turbine_cost(self.x0, bounds=bounds, constraints=constraints, crane=True, exact_gradient=False)
+
+        self.assertTrue(exact.success)
+        for k in exact.design:
+            self.assertAlmostEqual(exact.design[k], fd.design[k], delta=1e-4*exact.design[k])
+        self.assertLess(exact.nfev, fd.nfev)
+        self.assertEqual(fd.njev, 0)
+        self.assertGreater(exact.wall_time, 0.)
+
+    def test_callable_objective(self):
+        # weighted sum of cost and mass
+        def objective(outputs, jacobian):
+            return (outputs['turbine_cost'] + 2.*outputs['turbine_mass'],
+                    jacobian['turbine_cost'] + 2.*jacobian['turbine_mass'])
+
+        res = optimize_turbine_cost(self.x0, objective=objective, design_vars=('rotor_diameter',))
+        self.assertTrue(res.success)
+        self.assertAlmostEqual(res.design['rotor_diameter'], 60.)
+
+    def test_bad_design_var(self):
+        with self.assertRaises(ValueError):
+            optimize_turbine_cost(self.x0, design_vars=('tower_height',))
+
+
+if __name__ == "__main__":
+    unittest.main()
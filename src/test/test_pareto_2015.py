@@ -0,0 +1,76 @@
+import time
+import unittest
+
+import numpy as np
+
+from turbine_costsse.pareto_2015 import ParetoFront, pareto_front, pareto_mask, stream_pareto
+from turbine_costsse.sweep_2015 import iter_sweep, sweep
+
+
+def brute_force(objectives):
+    # first of equal rows kept, rows with NaN never on the front
+    n = len(objectives)
+    mask = np.zeros(n, dtype=bool)
+    for i in range(n):
+        if np.isnan(objectives[i]).any():
+            continue
+        le = (objectives <= objectives[i]).all(axis=1)
+        lt = (objectives < objectives[i]).any(axis=1)
+        equal_before = (objectives == objectives[i]).all(axis=1) & (np.arange(n) < i)
+        mask[i] = not (le & lt).any() and not equal_before.any()
+    return mask
+
+
+class TestPareto(unittest.TestCase):
+
+    def test_mask_against_brute_force(self):
+        rng = np.random.RandomState(0)
+        for m in (2, 3):
+            # integer values give ties and duplicates
+            objectives = rng.randint(0, 12, (400, m)).astype(float)
+            objectives[::37, 1] = np.nan
+            np.testing.assert_array_equal(pareto_mask(objectives), brute_force(objectives))
+            objectives = rng.rand(400, m)
+            objectives[:, -1] = 1. - objectives[:, 0]
+            np.testing.assert_array_equal(pareto_mask(objectives), brute_force(objectives))
+        self.assertRaises(ValueError, pareto_mask, rng.rand(10, 4))
+
+    def test_scaling_all_non_dominated(self):
+        # every design is on the front, the worst case of the three-objective filter
+        n = 200000
+        x = np.arange(n, dtype=float)
+        for z in (x, np.random.RandomState(1).permutation(n).astype(float)):
+            objectives = np.stack([x, -x, z], axis=1)
+            start = time.time()
+            self.assertTrue(pareto_mask(objectives).all())
+            self.assertLess(time.time() - start, 5.)
+
+        # streamed in chunks, the front so far is merged with every chunk
+        start = time.time()
+        chunks = ({'turbine_cost': x[i:i + 25000], 'turbine_mass': -x[i:i + 25000],
+                   'turbine_cost_kW': x[i:i + 25000]} for i in range(0, n, 25000))
+        front = stream_pareto(chunks, ('turbine_cost', 'turbine_mass', 'turbine_cost_kW'))
+        self.assertEqual(len(front), n)
+        self.assertLess(time.time() - start, 10.)
+
+    def test_stream_matches_full_sweep(self):
+        D = np.linspace(60., 200., 30)
+        P = np.linspace(1000., 10000., 20)
+        H = np.linspace(60., 150., 5)
+        objectives = ('turbine_cost', 'turbine_mass', 'turbine_cost_kW')
+        full, index = pareto_front(sweep(D, P, H, outputs=objectives), objectives)
+
+        for structured in (False, True):
+            front = stream_pareto(iter_sweep(D, P, H, outputs=objectives, structured=structured, chunk_size=256),
+                                  objectives)
+            self.assertIsInstance(front, ParetoFront)
+            self.assertEqual(front.n_designs, 3000)
+            np.testing.assert_array_equal(front.index, index)
+            np.testing.assert_array_equal(front.front['turbine_cost'], full['turbine_cost'])
+            np.testing.assert_array_equal(front.front['rotor_diameter'], np.repeat(D, 100)[index])
+
+        self.assertRaises(KeyError, pareto_front, full, ('turbine_cost', 'tower_mass'))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,62 @@
+import unittest
+
+import numpy as np
+
+from turbine_costsse.equations_2015 import COST_COEFFS_2015, cost_model, mass_model, rotor_torque
+from turbine_costsse.pricing_2015 import PRICED_COEFFS, PRICED_OUTPUTS, pricing_matrix
+
+
+class TestPricingMatrix(unittest.TestCase):
+
+    def setUp(self):
+        D = np.array([80., 126., 150., 180., 126.])
+        self.P = np.array([2000., 5000., 6000., 8000., 5000.])
+        self.masses = mass_model(D, self.P, 90., rotor_torque(self.P, D))
+        self.masses['platforms_mass'] = self.masses['other_mass']
+        self.options = dict(crane=np.array([True, False, True, False, True]), main_bearing_number=1,
+                            blade_cost_external=np.array([0., 0., 3e5, 0., 0.]),
+                            tower_cost_external=np.array([0., 0., 0., 0., 1.1e6]))
+        self.multipliers = {'turbine_profitMultiplier': 0.1, 'nacelle_assemblyCostMultiplier': 0.05}
+        self.B = pricing_matrix(self.masses, self.P, multipliers=self.multipliers, **self.options)
+
+    def reference(self, coeffs):
+        return cost_model(self.masses, self.P, coeffs=dict(self.multipliers, **coeffs), **self.options)
+
+    def test_reprice(self):
+        self.assertEqual(self.B.n_designs, 5)
+        self.assertEqual(self.B.basis['turbine_cost'].shape, (5, len(PRICED_COEFFS)))
+
+        rng = np.random.RandomState(0)
+        for trial in range(3):
+            c = dict((k, v * rng.uniform(0.5, 1.5)) for k, v in COST_COEFFS_2015.items())
+            out = self.B(c)
+            ref = self.reference(c)
+            for k in PRICED_OUTPUTS:
+                np.testing.assert_allclose(out[k], ref[k], rtol=1e-13, err_msg=k)
+
+        # default coefficients, and a vector in PRICED_COEFFS order
+        np.testing.assert_allclose(self.B()['turbine_cost'], self.reference({})['turbine_cost'], rtol=1e-13)
+        np.testing.assert_array_equal(self.B(self.B.vector())['turbine_cost'], self.B()['turbine_cost'])
+
+    def test_many_vectors(self):
+        blade = np.array([12., 14.6, 16.])
+        out = self.B({'blade_mass_cost_coeff': blade, 'crane_cost': 1.5e4}, outputs=['rotor_cost', 'turbine_cost'])
+        self.assertEqual(out['turbine_cost'].shape, (5, 3))
+        for j in range(3):
+            ref = self.reference({'blade_mass_cost_coeff': blade[j], 'crane_cost': 1.5e4})
+            np.testing.assert_allclose(out['turbine_cost'][:, j], ref['turbine_cost'], rtol=1e-13)
+
+        # the external blade cost does not scale with the blade coefficient
+        np.testing.assert_array_equal(out['rotor_cost'][2, 0] - out['rotor_cost'][2, 2], 0.)
+
+    def test_errors(self):
+        with self.assertRaises(KeyError):
+            self.B({'blade_mass_cost': 1.})
+        with self.assertRaises(KeyError):
+            pricing_matrix(self.masses, self.P, multipliers={'turbine_profit': 0.1})
+        with self.assertRaises(ValueError):
+            self.B(np.ones(3))
+
+
+if __name__ == "__main__":
+    unittest.main()
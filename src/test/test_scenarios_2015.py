@@ -0,0 +1,72 @@
+import unittest
+
+import numpy as np
+
+from turbine_costsse.equations_2015 import csm_model, rotor_torque
+from turbine_costsse.scenarios_2015 import apply_scenarios, csm_scenarios, parts_costs, scenario_matrix
+
+
+class TestScenarios(unittest.TestCase):
+
+    def setUp(self):
+        self.D = np.array([100., 126., 150., 180.])
+        self.P = np.array([3000., 5000., 6000., 8000.])
+        self.Q = rotor_torque(self.P, self.D)
+        self.scenarios = [{'turbine_profitMultiplier': 0.1},
+                          {'nacelle_assemblyCostMultiplier': 0.05, 'tower_transportMultiplier': 0.1},
+                          {'hub_overheadCostMultiplier': 0.2, 'turbine_transportMultiplier': 0.03},
+                          {}]
+
+    def test_matches_reruns(self):
+        out = csm_scenarios(self.D, self.P, 90., self.Q, self.scenarios, crane=True, bearing_number=1)
+        self.assertEqual(out['turbine_cost'].shape, (4, 4))
+        for j, s in enumerate(self.scenarios):
+            ref = csm_model(self.D, self.P, 90., self.Q, crane=True, bearing_number=1, coeffs=s)
+            for k in ('hub_system_cost', 'rotor_cost', 'nacelle_cost', 'tower_cost', 'turbine_cost',
+                      'turbine_cost_kW'):
+                np.testing.assert_allclose(out[k][:, j], ref[k], rtol=1e-15, err_msg=k)
+
+    def test_matrix(self):
+        m = scenario_matrix(self.scenarios)
+        self.assertEqual(len(m), 16)
+        np.testing.assert_array_equal(m['turbine_transportMultiplier'], [0., 0., 0.03, 0.])
+        m = scenario_matrix({'turbine_profitMultiplier': [0.1, 0.2, 0.3], 'hub_profitMultiplier': 0.05})
+        np.testing.assert_array_equal(m['hub_profitMultiplier'], [0.05]*3)
+
+        with self.assertRaises(KeyError):
+            scenario_matrix([{'turbine_profit': 0.1}])
+        with self.assertRaises(ValueError):
+            scenario_matrix({'turbine_profitMultiplier': [0.1, 0.2], 'hub_profitMultiplier': [0., 0., 0.]})
+
+    def test_parts_once(self):
+        # parts costs of a single design and of a (designs x scenarios) grid of parts
+        costs = csm_model(126., 5000., 90., rotor_torque(5000., 126.))
+        out = apply_scenarios(parts_costs(costs), {'turbine_profitMultiplier': [0., 0.1]})
+        self.assertEqual(out['turbine_cost'].shape, (2,))
+        self.assertAlmostEqual(out['turbine_cost'][1], 1.1*costs['turbine_cost'], delta=1e-6)
+
+
+class TestCostScenarios2015(unittest.TestCase):
+
+    def test_component(self):
+        from openmdao.api import Problem, Group
+        from turbine_costsse.turbine_costsse_2015 import CostScenarios2015
+
+        costs = csm_model(126., 5000., 90., rotor_torque(5000., 126.), crane=True)
+        prob = Problem(Group())
+        prob.root.add('scenarios', CostScenarios2015(3), promotes=['*'])
+        prob.setup(check=False)
+        for k, v in costs.items():
+            if k in prob.root.scenarios.params:
+                prob[k] = v
+        prob['machine_rating'] = 5000.
+        prob['tower_profitMultiplier'] = np.array([0., 0.1, 0.2])
+        prob.run()
+
+        np.testing.assert_allclose(prob['tower_cost_scenarios'], costs['tower_cost'] * np.array([1., 1.1, 1.2]),
+                                   rtol=1e-15)
+        self.assertAlmostEqual(prob['turbine_cost_kW_scenarios'][0], costs['turbine_cost_kW'], delta=1e-9)
+
+
+if __name__ == "__main__":
+    unittest.main()
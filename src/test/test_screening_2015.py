@@ -0,0 +1,53 @@
+import unittest
+
+import numpy as np
+
+from turbine_costsse.equations_2015 import csm_model, mass_model, rotor_torque
+from turbine_costsse.screening_2015 import feasible_mask, screen_samples
+
+
+class TestScreening(unittest.TestCase):
+
+    def setUp(self):
+        rng = np.random.RandomState(0)
+        n = 1000
+        self.samples = {'rotor_diameter': rng.uniform(60., 200., n), 'machine_rating': rng.uniform(1000., 10000., n),
+                        'hub_height': rng.uniform(60., 150., n), 'crane': rng.rand(n) > 0.5,
+                        'turbine_class': rng.randint(1, 4, n), 'blade_mass_cost_coeff': rng.uniform(13., 16., n)}
+        self.limits = {'blade_mass': 40e3, 'nacelle_mass': (50e3, 250e3), 'tower_mass': (None, 400e3)}
+
+    def test_feasible_designs_match_csm_model(self):
+        s = self.samples
+        outputs = ['blade_mass', 'nacelle_mass', 'turbine_cost', 'other_cost']
+        results, report = screen_samples(s, self.limits, outputs=outputs, chunk_size=300)
+
+        D, P, H = s['rotor_diameter'], s['machine_rating'], s['hub_height']
+        ref = csm_model(D, P, H, rotor_torque(P, D), crane=s['crane'], turbine_class=s['turbine_class'],
+                        coeffs={'blade_mass_cost_coeff': s['blade_mass_cost_coeff']})
+        m = mass_model(D, P, H, rotor_torque(P, D), crane=s['crane'], turbine_class=s['turbine_class'])
+        expected = (m['blade_mass'] <= 40e3) & (m['nacelle_mass'] >= 50e3) & (m['nacelle_mass'] <= 250e3) & \
+                   (m['tower_mass'] <= 400e3)
+        np.testing.assert_array_equal(report.feasible, expected)
+        self.assertTrue(0 < report.n_pruned < 1000)
+        self.assertEqual(report.violations['blade_mass'], np.count_nonzero(ref['blade_mass'] > 40e3))
+        self.assertGreaterEqual(report.time_saved, 0.)
+
+        for k in outputs:
+            np.testing.assert_allclose(results[k][expected], ref[k][expected], rtol=1e-14)
+        self.assertTrue(np.isnan(results['turbine_cost'][~expected]).all())
+        self.assertTrue(np.isnan(results['nacelle_mass'][~expected]).all())
+        np.testing.assert_allclose(results['blade_mass'], ref['blade_mass'], rtol=1e-14)
+
+        records, _ = screen_samples(s, self.limits, outputs=outputs, structured=True)
+        np.testing.assert_array_equal(records['turbine_cost'], results['turbine_cost'])
+
+    def test_limits(self):
+        masses = {'blade_mass': np.array([10., 20., np.nan]), 'tower_mass': np.array([1., 5., 1.])}
+        feasible, violations = feasible_mask(masses, {'blade_mass': 15., 'tower_mass': (2., None)})
+        np.testing.assert_array_equal(feasible, [False, False, False])
+        self.assertEqual(violations, {'blade_mass': 2, 'tower_mass': 2})
+        self.assertRaises(KeyError, feasible_mask, masses, {'hub_mass': 1.})
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,86 @@
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import unittest
+
+import numpy as np
+
+from turbine_costsse.equations_2015 import csm_model, rotor_torque
+from turbine_costsse.surrogate_2015 import build_surrogate, load_surrogate, latin_hypercube
+
+
+class TestLatinHypercube(unittest.TestCase):
+
+    def test_one_sample_per_stratum(self):
+        x = latin_hypercube(50, {'a': (0., 1.), 'b': (10., 20.)}, seed=3)
+        np.testing.assert_array_equal(np.sort(np.floor(x['a']*50)), np.arange(50))
+        np.testing.assert_array_equal(np.sort(np.floor((x['b'] - 10.)/10.*50)), np.arange(50))
+
+
+class TestSurrogate(unittest.TestCase):
+
+    def setUp(self):
+        self.tmpdir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.tmpdir)
+
+    def check_error_estimate(self, s):
+        # the error on fresh points of the design space stays close to the estimate from the test samples
+        x = latin_hypercube(300, s.bounds, seed=42)
+        Q = rotor_torque(x['machine_rating'], x['rotor_diameter'])
+        exact = csm_model(x['rotor_diameter'], x['machine_rating'], x['hub_height'], Q, crane=True)
+        approx = s(x['rotor_diameter'], x['machine_rating'], x['hub_height'])
+        for k in s.outputs:
+            rel = np.abs(approx[k] / exact[k] - 1.)
+            self.assertLess(rel.max(), 2.*s.errors[k]['max_rel_error'] + 1e-12, msg=k)
+
+    def test_polynomial(self):
+        s = build_surrogate(crane=True)
+        self.assertLess(s.errors['turbine_cost']['max_rel_error'], 5e-3)
+        self.check_error_estimate(s)
+
+    def test_rbf(self):
+        s = build_surrogate('rbf', n_samples=300, crane=True)
+        self.assertLess(s.errors['turbine_cost']['max_rel_error'], 5e-2)
+        self.check_error_estimate(s)
+
+    def test_save_load(self):
+        s = build_surrogate(outputs=('turbine_cost', 'other_cost'), n_test=100, crane=True,
+                            coeffs={'crane_cost': 2e4})
+        filename = os.path.join(self.tmpdir, 'csm.npz')
+        s.save(filename)
+
+        t = load_surrogate(filename)
+        self.assertEqual(t.outputs, s.outputs)
+        self.assertEqual(t.errors, s.errors)
+        self.assertEqual(t.settings['coeffs'], {'crane_cost': 2e4})
+        D = np.linspace(70., 190., 7)
+        for k in s.outputs:
+            np.testing.assert_array_equal(t(D, 5000., 100.)[k], s(D, 5000., 100.)[k])
+
+        # loading and evaluating does not import OpenMDAO
+        code = ("import sys; from turbine_costsse.surrogate_2015 import load_surrogate; "
+                "load_surrogate(%r)(126., 5000., 90.); print('openmdao' in sys.modules)" % filename)
+        self.assertEqual(subprocess.check_output([sys.executable, '-c', code]).strip(), b'False')
+
+        # NumPy settings are stored as plain numbers and lists
+        s = build_surrogate(outputs=('turbine_cost',), bounds={'rotor_diameter': np.array([60., 200.], np.float32)},
+                            n_samples=50, degree=2, n_test=10, seed=np.int64(2), max_tip_speed=np.float32(85.),
+                            coeffs={'tower_mass_cost_coeff': np.float32(3.)})
+        s.save(filename)
+        t = load_surrogate(filename)
+        self.assertEqual(t.bounds['rotor_diameter'], (60., 200.))
+        self.assertEqual(t.settings['seed'], 2)
+        self.assertEqual(t.settings['max_tip_speed'], 85.)
+        self.assertEqual(t.settings['coeffs'], {'tower_mass_cost_coeff': 3.})
+
+    def test_unknown_kind(self):
+        with self.assertRaises(ValueError):
+            build_surrogate('kriging', n_samples=20, n_test=0)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,124 @@
+import unittest
+
+import numpy as np
+
+from turbine_costsse.equations_2015 import csm_model, rotor_torque
+from turbine_costsse.sweep_2015 import (sweep, evaluate_samples, monte_carlo, as_records, draw_block, sample_streams,
+                                        _model_args)
+
+
+class TestSweep(unittest.TestCase):
+
+    D = np.linspace(60., 200., 29)
+    P = np.linspace(1000., 10000., 19)
+    H = np.linspace(60., 150., 10)
+
+    def test_grid(self):
+        out = sweep(self.D, self.P, self.H, crane=True, chunk_size=1000)
+        self.assertEqual(out['turbine_cost'].shape, (29, 19, 10))
+        ref = csm_model(self.D[4], self.P[7], self.H[2], rotor_torque(self.P[7], self.D[4]), crane=True)
+        for k in ref:
+            self.assertAlmostEqual(out[k][4, 7, 2], ref[k], delta=1e-12*max(1., abs(ref[k])))
+
+    def test_float32(self):
+        ref = sweep(self.D, self.P, self.H, outputs=['turbine_cost', 'turbine_mass'])
+        out = sweep(self.D, self.P, self.H, outputs=['turbine_cost', 'turbine_mass'], dtype=np.float32, chunk_size=777)
+        for k in ref:
+            self.assertEqual(out[k].dtype, np.float32)
+            self.assertEqual(out[k].nbytes, ref[k].nbytes // 2)
+            # documented error bound
+            self.assertLess(np.abs(out[k] / ref[k] - 1.).max(), 1e-6)
+
+
+    def test_structured(self):
+        ref = sweep(self.D, self.P, self.H, crane=True)
+        rec = sweep(self.D, self.P, self.H, crane=True, dtype=np.float32, structured=True, chunk_size=1000)
+        self.assertEqual(rec.shape, (29, 19, 10))
+        self.assertEqual(rec.dtype.names, tuple(ref))
+        self.assertEqual(rec.dtype.itemsize, 4*len(ref))
+        np.testing.assert_allclose(rec['turbine_cost'], ref['turbine_cost'], rtol=1e-6)
+        np.testing.assert_array_equal(as_records(ref)['nacelle_cost'], ref['nacelle_cost'])
+
+
+class TestSamples(unittest.TestCase):
+
+    def test_coefficient_samples(self):
+        samples = {'rotor_diameter': [100., 126., 150.], 'machine_rating': 5000., 'hub_height': 90.,
+                   'tower_mass_cost_coeff': [2.5, 2.9, 3.3]}
+        out = evaluate_samples(samples, chunk_size=2)
+        for i in range(3):
+            D, c = samples['rotor_diameter'][i], samples['tower_mass_cost_coeff'][i]
+            ref = csm_model(D, 5000., 90., rotor_torque(5000., D), coeffs={'tower_mass_cost_coeff': c})
+            self.assertAlmostEqual(out['turbine_cost'][i], ref['turbine_cost'], delta=1e-6)
+
+    def test_option_samples(self):
+        samples = {'rotor_diameter': [100., 126., 150., 126.], 'machine_rating': 5000., 'hub_height': 90.,
+                   'turbine_class': [1, 2, 3, 0], 'crane': [True, False, True, False],
+                   'blade_cost_external': [0., 2e5, 0., 0.]}
+        out = evaluate_samples(samples)
+        for i in range(4):
+            D = samples['rotor_diameter'][i]
+            ref = csm_model(D, 5000., 90., rotor_torque(5000., D), turbine_class=samples['turbine_class'][i],
+                            crane=samples['crane'][i], blade_cost_external=samples['blade_cost_external'][i])
+            self.assertAlmostEqual(out['turbine_cost'][i], ref['turbine_cost'], delta=1e-6)
+
+    def test_float32_options(self):
+        # sampled discrete options keep the chunk computation in float32
+        samples = {'rotor_diameter': [100., 126., 150., 126.], 'machine_rating': 5000., 'hub_height': 90.,
+                   'turbine_class': [1, 2, 3, 1], 'blade_has_carbon': [False, True, False, True],
+                   'crane': [True, False, True, False]}
+        n = 4
+        inputs = dict((k, np.broadcast_to(np.asarray(v, dtype=np.float32), (n,))) for k, v in samples.items())
+        args, kwargs = _model_args(inputs, np.float32, 80., 0.90, {})
+        for k, v in csm_model(*args, **kwargs).items():
+            self.assertEqual(v.dtype, np.float32, msg=k)
+
+        ref = evaluate_samples(samples)
+        out = evaluate_samples(samples, dtype=np.float32)
+        self.assertLess(np.abs(out['turbine_cost'] / ref['turbine_cost'] - 1.).max(), 1e-6)
+
+    def test_sampled_drivetrain(self):
+        samples = {'rotor_diameter': np.array([100., 126., 150.]), 'machine_rating': 5000., 'hub_height': 90.,
+                   'max_tip_speed': np.array([70., 80., 90.]), 'max_efficiency': np.array([0.9, 0.92, 0.95])}
+        out = evaluate_samples(samples, outputs=['gearbox_mass'])
+        Q = rotor_torque(5000., samples['rotor_diameter'], samples['max_tip_speed'], samples['max_efficiency'])
+        np.testing.assert_array_equal(out['gearbox_mass'], csm_model(samples['rotor_diameter'], 5000., 90., Q)['gearbox_mass'])
+
+    def test_monte_carlo(self):
+        distributions = {'rotor_diameter': lambda rng, size: rng.uniform(110., 140., size),
+                         'turbine_profitMultiplier': lambda rng, size: rng.normal(0.1, 0.02, size)}
+        fixed = {'machine_rating': 5000., 'hub_height': 90.}
+        s1, r1 = monte_carlo(5000, distributions, fixed, seed=3, chunk_size=1024)
+        s2, r2 = monte_carlo(5000, distributions, fixed, seed=3, dtype=np.float32)
+        np.testing.assert_allclose(s2['rotor_diameter'], s1['rotor_diameter'], rtol=1e-7)
+        np.testing.assert_allclose(r2['turbine_cost'], r1['turbine_cost'], rtol=1e-6)
+        self.assertEqual(len(r1), len(csm_model(126., 5000., 90., 4e6)))
+
+        _, rec = monte_carlo(5000, distributions, fixed, outputs=['turbine_cost', 'tower_cost'], seed=3,
+                             structured=True)
+        np.testing.assert_array_equal(rec['turbine_cost'], r1['turbine_cost'])
+        self.assertEqual(rec.shape, (5000,))
+
+    def test_monte_carlo_workers(self):
+        # every block has its own stream, so the worker count and chunk size do not change the answer
+        distributions = {'rotor_diameter': lambda rng, size: rng.uniform(110., 140., size),
+                         'blade_mass_cost_coeff': lambda rng, size: rng.normal(14.6, 1.5, size)}
+        fixed = {'machine_rating': 5000., 'hub_height': 90.}
+        runs = [monte_carlo(5000, distributions, fixed, outputs=['turbine_cost'], seed=7, block_size=256,
+                            chunk_size=chunk_size, workers=workers)
+                for workers, chunk_size in ((1, 65536), (2, 100), (8, 37))]
+        for samples, results in runs[1:]:
+            np.testing.assert_array_equal(samples['rotor_diameter'], runs[0][0]['rotor_diameter'])
+            np.testing.assert_array_equal(results['turbine_cost'], runs[0][1]['turbine_cost'])
+
+        # the blocks are independent streams spawned from the seed
+        streams = sample_streams(5000, 7, 256)
+        self.assertEqual(len(streams), 20)
+        block = draw_block(distributions, streams[3], 256)
+        np.testing.assert_array_equal(runs[0][0]['blade_mass_cost_coeff'][768:1024], block['blade_mass_cost_coeff'])
+        self.assertFalse(np.array_equal(draw_block(distributions, streams[4], 256)['rotor_diameter'],
+                                        block['rotor_diameter']))
+
+
+if __name__ == "__main__":
+    unittest.main()
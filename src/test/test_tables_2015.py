@@ -0,0 +1,105 @@
+import os
+import shutil
+import tempfile
+import unittest
+
+import numpy as np
+
+from turbine_costsse.equations_2015 import csm_model, rotor_torque
+from turbine_costsse.tables_2015 import build_tables, load_tables
+
+
+class TestCostTables(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.tables = build_tables()
+
+    def exact(self, D, P, H, **kwargs):
+        return csm_model(D, P, H, rotor_torque(P, D), **kwargs)
+
+    def test_grid_points_are_exact(self):
+        grid = self.tables.grid()
+        D, P, H = grid['rotor_diameter'][3], grid['machine_rating'][5], grid['hub_height'][2]
+        for method in ('linear', 'cubic'):
+            out = self.tables(D, P, H, turbine_class=2, blade_has_carbon=True, method=method)
+            ref = self.exact(D, P, H, turbine_class=2, blade_has_carbon=True)
+            for k in self.tables.outputs:
+                self.assertAlmostEqual(out[k], ref[k], delta=1e-10*abs(ref[k]))
+
+    def test_error_bound(self):
+        rng = np.random.RandomState(7)
+        D = rng.uniform(60., 200., 500)
+        P = rng.uniform(1000., 10000., 500)
+        H = rng.uniform(60., 150., 500)
+        for combo in self.tables.combinations:
+            kwargs = dict(zip(('turbine_class', 'blade_has_carbon', 'crane'), combo))
+            ref = self.exact(D, P, H, **kwargs)
+            for method in ('linear', 'cubic'):
+                out = self.tables(D, P, H, method=method, **kwargs)
+                for k in self.tables.outputs:
+                    rel = np.abs(out[k]/ref[k] - 1.).max()
+                    self.assertLessEqual(rel, 1.5*self.tables.errors[k][method] + 1e-12, msg=(combo, method, k))
+        self.assertLess(self.tables.errors['turbine_cost']['cubic'], 1e-3)
+
+    def test_mixed_options(self):
+        D = np.array([80., 126., 180.])
+        out = self.tables(D, 5000., 90., turbine_class=[1, 2, 3], blade_has_carbon=True, crane=[True, False, True])
+        for i, (c, r) in enumerate([(1, True), (2, False), (3, True)]):
+            ref = self.tables(D[i], 5000., 90., turbine_class=c, blade_has_carbon=True, crane=r)
+            self.assertEqual(out['turbine_cost'][i], ref['turbine_cost'])
+        self.assertEqual(out['turbine_cost'].shape, (3,))
+
+    def test_invalid_queries(self):
+        with self.assertRaises(ValueError):
+            self.tables(250., 5000., 90.)
+        with self.assertRaises(ValueError):
+            self.tables(126., 5000., 90., turbine_class=4)
+        with self.assertRaises(ValueError):
+            self.tables(126., 5000., 90., turbine_class=2.5)
+        with self.assertRaises(ValueError):
+            self.tables([126., 140.], 5000., 90., turbine_class=[2., 2.5])
+        with self.assertRaises(ValueError):
+            self.tables(126., 5000., 90., crane=0.5)
+        with self.assertRaises(ValueError):
+            self.tables(126., 5000., 90., method='quintic')
+
+    def test_refinement(self):
+        tables = build_tables(outputs=('turbine_cost',), combinations=[(1, False, True)], rtol=2e-4)
+        self.assertEqual(tables.shape, (17, 17, 9))
+        self.assertLessEqual(tables.errors['turbine_cost']['cubic'], 2e-4)
+        with self.assertRaises(RuntimeError):
+            build_tables(outputs=('turbine_cost',), combinations=[(1, False, True)], rtol=1e-8, max_points=5000)
+
+    def test_save_load(self):
+        tmpdir = tempfile.mkdtemp()
+        try:
+            filename = os.path.join(tmpdir, 'tables.npz')
+            self.tables.save(filename)
+            tables = load_tables(filename)
+        finally:
+            shutil.rmtree(tmpdir)
+        self.assertEqual(tables.combinations, self.tables.combinations)
+        self.assertEqual(tables.errors, self.tables.errors)
+        D = np.linspace(70., 190., 5)
+        np.testing.assert_array_equal(tables(D, 3000., 100., crane=True)['nacelle_cost'],
+                                      self.tables(D, 3000., 100., crane=True)['nacelle_cost'])
+
+    def test_save_numpy_settings(self):
+        tables = build_tables(outputs=('turbine_cost',), bounds={'hub_height': np.array([60., 150.], np.float32)},
+                              shape=np.array([3, 3, 3]), combinations=[(1, False, False)], n_test=10,
+                              seed=np.int64(1), max_tip_speed=np.float32(85.))
+        tmpdir = tempfile.mkdtemp()
+        try:
+            filename = os.path.join(tmpdir, 'tables.npz')
+            tables.save(filename)
+            loaded = load_tables(filename)
+        finally:
+            shutil.rmtree(tmpdir)
+        self.assertEqual(loaded.bounds['hub_height'], (60., 150.))
+        self.assertEqual(loaded.settings['shape'], [3, 3, 3])
+        self.assertEqual(loaded.settings['max_tip_speed'], 85.)
+
+
+if __name__ == "__main__":
+    unittest.main()
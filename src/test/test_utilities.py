@@ -0,0 +1,157 @@
+import inspect
+import unittest
+
+import numpy as np
+from openmdao.api import Component
+
+from turbine_costsse import escalation_2015 as escalation, turbine_costsse_2015, nrel_csm_tcc_2015
+from turbine_costsse.utilities import _params, check_gradient_unit_test, check_partials, complex_step_jacobian
+
+
+# NREL 5 MW reference turbine
+values = {'blade_mass': 17650.67, 'hub_mass': 31644.5, 'pitch_system_mass': 17004.0, 'spinner_mass': 1810.5,
+          'lss_mass': 31257.3, 'main_bearing_mass': 9731.41 / 2, 'gearbox_mass': 30237.60, 'hss_mass': 1492.45,
+          'generator_mass': 16699.85, 'bedplate_mass': 93090.6, 'yaw_mass': 11878.24, 'tower_mass': 434559.0,
+          'vs_electronics_mass': 1000., 'vs_mass': 1000., 'hvac_mass': 1000., 'cover_mass': 1000.,
+          'platforms_mass': 8220., 'other_mass': 8220., 'transformer_mass': 1000., 'machine_rating': 5000.0,
+          'rotor_diameter': 126.0, 'hub_height': 90.0, 'rotor_torque': 4.37e6,
+          'hub_cost': 1.2e5, 'pitch_system_cost': 3.7e5, 'spinner_cost': 2e4, 'blade_cost': 2.5e5,
+          'lss_cost': 3.7e5, 'main_bearing_cost': 4.4e4, 'hub_system_cost': 5.1e5, 'hub_system_mass': 5e4, 'rotor_cost': 1.3e6, 'rotor_mass_tcc': 1.1e5,
+          'nacelle_cost': 2.5e6, 'nacelle_mass': 2.4e5, 'tower_cost': 1.3e6, 'tower_parts_cost': 1.3e6,
+          'hub_profitMultiplier': 0.1, 'nacelle_overheadCostMultiplier': 0.05, 'tower_assemblyCostMultiplier': 0.2,
+          'turbine_transportMultiplier': 0.03}
+
+
+# constructor arguments
+args = {'CostEscalation2015': (3,), 'CostScenarios2015': (2,), 'Outputs2Screen': (False,)}
+
+
+def components(module):
+
+    for name, cls in inspect.getmembers(module, inspect.isclass):
+        if issubclass(cls, Component) and cls.__module__ == module.__name__:
+            yield name, cls
+
+
+class TestComponentPartials(unittest.TestCase):
+
+    def check_module(self, module):
+        for name, cls in components(module):
+            comp = cls(*args.get(name, ()))
+            params = dict((k, v) for k, v in values.items() if k in comp._init_params_dict)
+            check_gradient_unit_test(self, comp, params)
+
+    def test_turbine_costsse_2015(self):
+        self.check_module(turbine_costsse_2015)
+
+    def test_nrel_csm_tcc_2015(self):
+        self.check_module(nrel_csm_tcc_2015)
+
+    def test_external_costs(self):
+        unknowns, J = complex_step_jacobian(turbine_costsse_2015.BladeCost2015(),
+                                            {'blade_mass': 17650., 'blade_cost_external': 2e5})
+        self.assertEqual(unknowns['blade_cost'], 2e5)
+        self.assertEqual(J['blade_cost', 'blade_cost_external'], 1.)
+        self.assertEqual(J['blade_cost', 'blade_mass'], 0.)
+
+        unknowns, J = complex_step_jacobian(turbine_costsse_2015.TowerCost2015(), {'tower_mass': 4e5})
+        self.assertAlmostEqual(J['tower_parts_cost', 'tower_mass'], 2.9, delta=1e-15)
+        self.assertEqual(J['tower_parts_cost', 'tower_cost_external'], 0.)
+
+    def test_drivetrain_designs(self):
+        comp = nrel_csm_tcc_2015.DrivetrainLoads(3)
+        params = {'machine_rating': np.array([2000., 5000., 8000.]), 'rotor_diameter': np.array([80., 126., 150.]),
+                  'max_tip_speed': np.array([70., 80., 90.])}
+        check_gradient_unit_test(self, comp, params)
+
+    def test_escalation_and_scenarios(self):
+        # array price indices and multipliers enter the analytic Jacobians along the diagonal
+        costs = dict((k, v) for k, v in values.items() if k in escalation.COMPONENT_COSTS)
+        comp = turbine_costsse_2015.CostEscalation2015(3)
+        params = dict(costs, machine_rating=5000., blade_number=3., main_bearing_number=2.,
+                      rotor_price_index=np.array([1., 1.02, 1.05]), nacelle_price_index=np.array([1., 1.03, 1.04]),
+                      tower_price_index=np.array([1., 0.98, 1.1]), nacelle_profitMultiplier=0.12)
+        check_gradient_unit_test(self, comp, params)
+        J = comp.linearize(_params(comp, params)[0], complex_step_jacobian(comp, params)[0], {})
+        self.assertEqual(J['turbine_cost_escalated', 'tower_price_index'].shape, (3, 3))
+
+        comp = turbine_costsse_2015.CostScenarios2015(3)
+        params = dict(costs, machine_rating=5000., blade_number=2., main_bearing_number=1.,
+                      hub_profitMultiplier=np.array([0.1, 0.15, 0.2]), nacelle_assemblyCostMultiplier=np.array([0., 0.05, 0.1]),
+                      turbine_transportMultiplier=np.array([0.02, 0.03, 0.04]))
+        check_gradient_unit_test(self, comp, params)
+
+    def test_crane(self):
+        comp = turbine_costsse_2015.OtherMainframeCost2015()
+        unknowns, J = complex_step_jacobian(comp, {'platforms_mass': 8220., 'crane': True})
+        self.assertAlmostEqual(unknowns['other_cost'], 17.1*(8220. - 3e3) + 12e3, delta=1e-8)
+        self.assertEqual(J['other_cost', 'crane_cost'], 1.)
+        self.assertAlmostEqual(J['other_cost', 'crane'], 12e3 - 17.1*3e3, delta=1e-8)
+
+    def test_sparse_adders(self):
+        # the adders return exactly the structural nonzeros of their Jacobians
+        adders = [turbine_costsse_2015.HubSystemCostAdder2015(), turbine_costsse_2015.RotorCostAdder2015(),
+                  turbine_costsse_2015.NacelleSystemCostAdder2015(), turbine_costsse_2015.TowerCostAdder2015(),
+                  turbine_costsse_2015.TurbineCostAdder2015(), turbine_costsse_2015.Outputs2Screen(False),
+                  nrel_csm_tcc_2015.turbine_mass_adder()]
+        for comp in adders:
+            params = dict((k, v) for k, v in values.items() if k in comp._init_params_dict)
+            unknowns, J_cs = complex_step_jacobian(comp, params)
+            J = comp.linearize(_params(comp, params)[0], unknowns, {})
+            nonzero = set(k for k, v in J_cs.items() if np.any(v != 0.))
+            self.assertEqual(set(J), nonzero, msg=type(comp).__name__)
+
+        J = nrel_csm_tcc_2015.turbine_mass_adder().linearize(dict(values, blade_number=3, bearing_number=2), {}, {})
+        self.assertEqual(len(J), 38)  # of 4 x 18 dense entries
+        self.assertEqual(J['nacelle_mass', 'main_bearing_mass'], 2)
+
+
+class Scale(Component):
+
+    def __init__(self, exact=True):
+        super(Scale, self).__init__()
+        self.exact = exact
+        self.add_param('x', 2.0)
+        self.add_param('a', np.array([1., 2., 3.]))
+        self.add_output('y', np.zeros(3))
+
+    def solve_nonlinear(self, params, unknowns, resids):
+        unknowns['y'] = params['x']**2 * params['a']
+
+    def linearize(self, params, unknowns, resids):
+        J = {('y', 'x'): (2*params['x']*params['a']).reshape(3, 1)}
+        if self.exact:
+            J['y', 'a'] = params['x']**2 * np.eye(3)
+        return J
+
+
+class RealPart(Component):
+
+    def __init__(self):
+        super(RealPart, self).__init__()
+        self.add_param('x', 2.0)
+        self.add_output('y', 0.0)
+
+    def solve_nonlinear(self, params, unknowns, resids):
+        unknowns['y'] = 3.*np.real(params['x'])
+
+
+class TestHarness(unittest.TestCase):
+
+    def test_linearize(self):
+        result = check_partials(Scale(), {'x': 1.5})
+        self.assertTrue(all(r[3] for r in result.values()))
+        np.testing.assert_allclose(result['y', 'a'][1], 2.25*np.eye(3), rtol=1e-15)
+
+        # missing partials count as zero
+        result = check_partials(Scale(exact=False))
+        self.assertFalse(result['y', 'a'][3])
+        self.assertTrue(result['y', 'x'][3])
+
+    def test_not_complex_step_safe(self):
+        result = check_partials(RealPart())
+        self.assertFalse(result['y', 'x'][3])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,26 @@
+"""
+Turbine_CostsSE: NREL wind turbine mass and cost models.
+
+The equations in turbine_costsse.equations_2015 only need NumPy.  The
+OpenMDAO components and groups are imported the first time they are accessed
+as package attributes, so importing the package does not load OpenMDAO.
+
+Copyright (c) NREL. All rights reserved.
+"""
+
+import importlib
+
+from turbine_costsse.equations_2015 import mass_model, cost_model, csm_model
+
+# OpenMDAO wrappers: attribute name -> module
+_lazy = {
+    'Turbine_CostsSE_2015': 'turbine_costsse.turbine_costsse_2015',
+    'nrel_csm_mass_2015':   'turbine_costsse.nrel_csm_tcc_2015',
+    'nrel_csm_2015':        'turbine_costsse.nrel_csm_tcc_2015',
+}
+
+
+def __getattr__(name):
+    if name in _lazy:
+        return getattr(importlib.import_module(_lazy[name]), name)
+    raise AttributeError("module 'turbine_costsse' has no attribute '%s'" % name)
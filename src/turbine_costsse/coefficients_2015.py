@@ -0,0 +1,221 @@
+"""
+coefficients_2015.py
+
+Registry of named, versioned coefficient sets of the 2015 NREL Cost and Scaling Model.
+
+A coefficient set is a complete set of mass coefficients, mass-cost
+coefficients and multipliers: the defaults of equations_2015, which are
+also the add_param and IndepVarComp defaults of the OpenMDAO components,
+updated with the values of the set.  Sets are stored as JSON files
+
+    {"name": "supplier_a", "version": "1.2", "description": "...",
+     "coefficients": {"blade_mass_cost_coeff": 15.2, ...}}
+
+and registered by name and version; a name without a version refers to the
+latest version.  evaluate_sets runs csm_model for all designs against all
+sets as one (designs x sets) batch.
+
+Copyright (c) NREL. All rights reserved.
+"""
+
+import glob
+import json
+import os
+from collections import OrderedDict
+
+import numpy as np
+
+from turbine_costsse.equations_2015 import csm_model, default_coeffs
+
+
+def _version_key(version):
+
+    try:
+        return tuple(int(v) for v in str(version).split('.'))
+    except ValueError:
+        raise ValueError("version '%s' is not of the form 'major.minor...'" % version)
+
+
+class CoefficientSet(OrderedDict):
+    """
+    Complete coefficients and multipliers of csm_model under a name and version.
+
+    `coefficients` overrides the equations_2015 defaults; unknown names
+    raise KeyError.  The set is a mapping of all coefficient names to
+    values and can be passed as `coeffs` to the model functions and to
+    Turbine_CostsSE_2015.
+    """
+
+    def __init__(self, name, version, coefficients=None, description=''):
+
+        super(CoefficientSet, self).__init__(default_coeffs(coefficients))
+        _version_key(version)
+        self.name = name
+        self.version = str(version)
+        self.description = description
+
+    @property
+    def key(self):
+        """'name@version' of the set."""
+
+        return '%s@%s' % (self.name, self.version)
+
+    def __repr__(self):
+        return 'CoefficientSet(%r, %r)' % (self.name, self.version)
+
+    def overrides(self):
+        """Coefficients that differ from the equations_2015 defaults."""
+
+        defaults = default_coeffs()
+        return OrderedDict((k, v) for k, v in self.items() if v != defaults[k])
+
+    def save(self, path):
+        """Write the set as JSON, with the coefficients that differ from the defaults."""
+
+        with open(path, 'w') as f:
+            json.dump(OrderedDict([('name', self.name), ('version', self.version),
+                                   ('description', self.description), ('coefficients', self.overrides())]),
+                      f, indent=2)
+
+
+def load_coefficient_set(path):
+    """Read a coefficient set from a JSON file written by CoefficientSet.save."""
+
+    with open(path) as f:
+        data = json.load(f)
+    for field in ('name', 'version'):
+        if field not in data:
+            raise ValueError("%s has no '%s'" % (path, field))
+    return CoefficientSet(data['name'], data['version'], data.get('coefficients', {}), data.get('description', ''))
+
+
+class CoefficientRegistry(object):
+    """Named coefficient sets, each with one or more versions."""
+
+    def __init__(self, sets=()):
+
+        self._sets = OrderedDict()
+        for s in sets:
+            self.register(s)
+
+    def register(self, coefficient_set, replace=False):
+        """Add a set; registering a different set under an existing name and version needs replace=True."""
+
+        versions = self._sets.setdefault(coefficient_set.name, OrderedDict())
+        old = versions.get(coefficient_set.version)
+        if old is not None and not replace and dict(old) != dict(coefficient_set):
+            raise ValueError('coefficient set %s is already registered with other values' % coefficient_set.key)
+        versions[coefficient_set.version] = coefficient_set
+        return coefficient_set
+
+    def load(self, path, replace=False):
+        """Register the set of a JSON file, or of all *.json files of a directory; returns the sets."""
+
+        paths = sorted(glob.glob(os.path.join(path, '*.json'))) if os.path.isdir(path) else [path]
+        return [self.register(load_coefficient_set(p), replace) for p in paths]
+
+    def names(self):
+        """Names of the registered sets."""
+
+        return list(self._sets)
+
+    def versions(self, name):
+        """Registered versions of set `name`, oldest first."""
+
+        if name not in self._sets:
+            raise KeyError("no coefficient set '%s'" % name)
+        return sorted(self._sets[name], key=_version_key)
+
+    def get(self, name, version=None):
+        """Set `name` ('name' or 'name@version'); the latest version unless a version is given."""
+
+        if version is None and '@' in name:
+            name, version = name.split('@', 1)
+        versions = self.versions(name)
+        if version is None:
+            version = versions[-1]
+        if str(version) not in self._sets[name]:
+            raise KeyError("no version '%s' of coefficient set '%s', available: %s"
+                           % (version, name, ', '.join(versions)))
+        return self._sets[name][str(version)]
+
+    def __contains__(self, name):
+        try:
+            self.get(name)
+        except KeyError:
+            return False
+        return True
+
+
+# the 2015 defaults of equations_2015 and the OpenMDAO components
+NREL_2015 = CoefficientSet('nrel_2015', '1.0', description='2015 NREL Cost and Scaling Model defaults')
+
+registry = CoefficientRegistry([NREL_2015])
+
+
+def set_coefficients(prob, coefficient_set):
+    """Set all coefficients and multipliers of `coefficient_set` that exist in the OpenMDAO problem `prob`."""
+
+    n = 0
+    for k, v in default_coeffs(coefficient_set).items():
+        try:
+            prob[k] = v
+        except KeyError:
+            continue
+        n += 1
+    return n
+
+
+def evaluate_sets(rotor_diameter, machine_rating, hub_height, rotor_torque, sets, outputs=None, registry=registry,
+                  **model_kwargs):
+    """
+    csm_model outputs of every design for every coefficient set.
+
+    `sets` lists CoefficientSets or keys of `registry` ('name' or
+    'name@version').  The designs (inputs and array-valued options of
+    csm_model in `model_kwargs`) are given a trailing set axis and the
+    coefficients a set axis, so one call of csm_model returns arrays of
+    shape (designs..., len(sets)).
+    """
+
+    sets = [registry.get(s) if not isinstance(s, CoefficientSet) else s for s in sets]
+    coeffs = OrderedDict((k, np.array([s[k] for s in sets])) for k in default_coeffs())
+    expand = lambda x: np.expand_dims(x, -1) if np.ndim(x) else x
+    kwargs = dict((k, expand(v)) for k, v in model_kwargs.items())
+
+    out = csm_model(expand(rotor_diameter), expand(machine_rating), expand(hub_height), expand(rotor_torque),
+                    coeffs=coeffs, **kwargs)
+    if outputs is not None:
+        out = OrderedDict((k, out[k]) for k in outputs)
+    shape = np.broadcast_shapes(*([np.shape(v) for v in out.values()] + [(len(sets),)]))
+    return OrderedDict((k, np.broadcast_to(v, shape)) for k, v in out.items())
+
+#-------------------------------------------------------------------------------
+def example():
+
+    import tempfile
+
+    from turbine_costsse.equations_2015 import rotor_torque
+
+    # two versions of a supplier set written to and loaded from files
+    directory = tempfile.mkdtemp()
+    CoefficientSet('supplier_a', '1.0', {'blade_mass_cost_coeff': 15.5, 'gearbox_mass_cost_coeff': 11.8},
+                   description='supplier A quote 2016').save(os.path.join(directory, 'supplier_a_1.0.json'))
+    CoefficientSet('supplier_a', '1.1', {'blade_mass_cost_coeff': 15.1, 'gearbox_mass_cost_coeff': 11.8,
+                                         'turbine_profitMultiplier': 0.08},
+                   description='supplier A quote 2017').save(os.path.join(directory, 'supplier_a_1.1.json'))
+    registry.load(directory)
+    print('registered: %s' % ', '.join('%s %s' % (n, registry.versions(n)) for n in registry.names()))
+
+    D = np.linspace(80., 200., 1000)
+    P = np.full_like(D, 5000.)
+    sets = ['nrel_2015', 'supplier_a@1.0', 'supplier_a']
+    out = evaluate_sets(D, P, 90., rotor_torque(P, D), sets, outputs=['turbine_cost'], crane=True)
+    i = np.searchsorted(D, 126.)
+    for j, s in enumerate(sets):
+        print('%-15s turbine_cost of the %.1f m rotor %.0f USD' % (s, D[i], out['turbine_cost'][i, j]))
+
+
+if __name__ == "__main__":
+
+    example()
@@ -0,0 +1,144 @@
+"""
+configurations_2015.py
+
+Best discrete configuration of every design of the 2015 NREL Cost and Scaling Model.
+
+Each continuous design (rotor diameter, rating, hub height and any sampled
+coefficients) is expanded by the Cartesian product of the chosen discrete
+options, for example blade_number in {2, 3} and crane on or off, and the
+whole expanded batch goes through csm_model at once: the designs of a chunk
+run along the first axis and the configurations along the second, so the
+mass and cost equations broadcast over both.  For every design the
+configuration with the lowest objective (turbine_cost by default) is kept.
+
+Copyright (c) NREL. All rights reserved.
+"""
+
+from collections import OrderedDict
+
+import numpy as np
+
+from turbine_costsse.equations_2015 import csm_model
+from turbine_costsse.sweep_2015 import OPTIONS, _allocate, _model_args, _output_names
+
+# all discrete options of csm_model and their values
+DISCRETE_OPTIONS = OrderedDict([
+    ('turbine_class',    (1, 2, 3)),
+    ('blade_has_carbon', (False, True)),
+    ('blade_number',     (2, 3)),
+    ('bearing_number',   (1, 2)),
+    ('crane',            (False, True)),
+])
+
+
+def configurations(options=None):
+    """
+    Cartesian product of discrete option values.
+
+    `options` maps OPTIONS of csm_model to sequences of values (default
+    DISCRETE_OPTIONS).  Returns an OrderedDict of 1D arrays with one entry
+    per configuration, the last option varying fastest.
+    """
+
+    options = OrderedDict(DISCRETE_OPTIONS if options is None else options)
+    unknown = [k for k in options if k not in OPTIONS]
+    if unknown:
+        raise KeyError('no discrete option(s): %s' % ', '.join(unknown))
+
+    values = [np.asarray(v) for v in options.values()]
+    grids = np.meshgrid(*values, indexing='ij') if values else []
+    return OrderedDict((k, g.ravel()) for k, g in zip(options, grids))
+
+
+def _column(x):
+    # per-design arrays of a chunk broadcast against the configurations along the second axis
+    return x[:, None] if np.ndim(x) else x
+
+
+def best_configurations(samples, options=None, objective='turbine_cost', outputs=None, dtype=np.float64,
+                        structured=False, chunk_size=65536, max_tip_speed=80., max_efficiency=0.90,
+                        **model_kwargs):
+    """
+    The configuration of lowest `objective` for every design.
+
+    `samples` and the keyword arguments are those of
+    sweep_2015.evaluate_samples and `options` is passed to configurations;
+    the enumerated options may be neither sampled nor keyword arguments.
+    A chunk holds chunk_size design-configuration pairs.  Configurations
+    with a NaN objective are never chosen and of equal objectives the first
+    configuration is kept.  Returns the values of the options and the
+    outputs of the best configuration of every design, as an OrderedDict of
+    1D arrays of dtype or a structured array, and the index of that
+    configuration in configurations(options).
+    """
+
+    configs = configurations(options)
+    names = list(configs)
+    fixed = [k for k in names if k in samples or k in model_kwargs]
+    if fixed:
+        raise ValueError('enumerated option(s) also given per design: %s' % ', '.join(fixed))
+
+    dtype = np.dtype(dtype).type
+    n = max([np.size(v) for v in samples.values()] or [1])
+    samples = OrderedDict((k, np.broadcast_to(np.asarray(v, dtype=dtype), (n,))) for k, v in samples.items())
+    if outputs is None:
+        outputs = _output_names(**model_kwargs)
+    if objective not in _output_names(**model_kwargs):
+        raise KeyError('csm_model has no output %s' % objective)
+    result, buffers = _allocate(names + list(outputs), n, dtype, structured)
+    index = np.empty(n, dtype=int)
+
+    n_configs = len(configs[names[0]]) if names else 1
+    step = max(1, chunk_size // n_configs)
+    for start in range(0, n, step):
+        sl = slice(start, min(start + step, n))
+        (D, P, H, Q), kwargs = _model_args(dict((k, v[sl]) for k, v in samples.items()), dtype,
+                                           max_tip_speed, max_efficiency, model_kwargs)
+        for k, v in kwargs.items():
+            kwargs[k] = dict((c, _column(x)) for c, x in v.items()) if k == 'coeffs' and v else _column(v)
+        for k in names:
+            kwargs[k] = configs[k][None, :]
+
+        out = csm_model(_column(D), _column(P), _column(H), _column(Q), **kwargs)
+        rows = np.arange(sl.stop - sl.start)
+        score = np.broadcast_to(out[objective], (len(rows), n_configs))
+        best = np.argmin(np.where(np.isnan(score), np.inf, score), axis=1)
+        index[sl] = best
+
+        for k in names:
+            buffers[k][sl] = configs[k][best]
+        for k in outputs:
+            buffers[k][sl] = np.broadcast_to(out[k], (len(rows), n_configs))[rows, best]
+
+    return result, index
+
+#-------------------------------------------------------------------------------
+def example():
+
+    import time
+
+    from turbine_costsse.sweep_2015 import evaluate_samples
+
+    # cheapest of the 48 configurations for 100000 random designs
+    rng = np.random.RandomState(0)
+    n = 100000
+    samples = {'rotor_diameter': rng.uniform(60., 200., n), 'machine_rating': rng.uniform(1000., 10000., n),
+               'hub_height': rng.uniform(60., 150., n)}
+    configs = configurations()
+
+    start = time.time()
+    best, index = best_configurations(samples, outputs=['turbine_cost', 'turbine_cost_kW'])
+    print('%d designs x %d configurations in %.2f s' % (n, len(configs['crane']), time.time() - start))
+    for i in np.unique(index):
+        print('  %s: %d designs' % (', '.join('%s %s' % (k, v[i]) for k, v in configs.items()),
+                                    np.count_nonzero(index == i)))
+
+    # against the default configuration of csm_model
+    default = evaluate_samples(samples, outputs=['turbine_cost'])
+    print('mean saving over the default configuration %.0f USD'
+          % (default['turbine_cost'] - best['turbine_cost']).mean())
+
+
+if __name__ == "__main__":
+
+    example()
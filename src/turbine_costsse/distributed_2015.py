@@ -0,0 +1,295 @@
+"""
+distributed_2015.py
+
+Sweeps and Monte Carlo runs of the 2015 NREL Cost and Scaling Model over MPI ranks.
+
+The designs are split into chunks of chunk_size and chunk i is evaluated by
+rank i % size, so the decomposition depends only on the number of designs,
+the chunk size and the number of ranks.  Every rank computes the streaming
+statistics (count, mean, sum of squared deviations, minimum and maximum,
+ignoring NaN) of each of its chunks; rank 0 gathers them and merges them in
+chunk order, so the statistics do not depend on the number of ranks, and
+with gather=True it also assembles the full results.  Monte Carlo runs
+share out the sample blocks of sweep_2015.sample_streams, each drawn from
+its own random stream, so they too give the same answer on any number of
+ranks.
+
+    mpirun -n 4 python -m turbine_costsse.distributed_2015
+
+mpi4py is optional: without it, or with comm=None outside mpirun, the runs
+execute on a single rank.
+
+Copyright (c) NREL. All rights reserved.
+"""
+
+from collections import OrderedDict
+
+import numpy as np
+
+from turbine_costsse.sweep_2015 import (INPUTS, SAMPLE_BLOCK, _allocate, _evaluate, _output_names, draw_block,
+                                        sample_streams)
+
+try:
+    from mpi4py import MPI
+except ImportError:
+    MPI = None
+
+
+class SerialComm(object):
+    """Stand-in for an MPI communicator of a single rank."""
+
+    def Get_rank(self):
+        return 0
+
+    def Get_size(self):
+        return 1
+
+    def gather(self, obj, root=0):
+        return [obj]
+
+    def bcast(self, obj, root=0):
+        return obj
+
+
+def get_comm():
+    """MPI.COMM_WORLD if mpi4py is installed, otherwise a SerialComm."""
+
+    return MPI.COMM_WORLD if MPI is not None else SerialComm()
+
+
+class StreamingStats(object):
+    """
+    Count, mean, sum of squared deviations, minimum and maximum of outputs.
+
+    update() adds a chunk of values and merge() combines the statistics of
+    two disjoint sets of designs with the pairwise formulas of Chan et al.
+    NaN values (for example designs pruned by screening) are skipped.
+    """
+
+    def __init__(self, outputs=()):
+
+        self.count = OrderedDict((k, 0) for k in outputs)
+        self.mean = OrderedDict((k, 0.) for k in outputs)
+        self.m2 = OrderedDict((k, 0.) for k in outputs)
+        self.min = OrderedDict((k, np.inf) for k in outputs)
+        self.max = OrderedDict((k, -np.inf) for k in outputs)
+
+    @classmethod
+    def of(cls, values):
+        """Statistics of a mapping of output arrays."""
+
+        stats = cls(values)
+        for k, v in values.items():
+            v = np.asarray(v, dtype=np.float64).reshape(-1)
+            v = v[~np.isnan(v)]
+            if len(v):
+                stats.count[k] = len(v)
+                stats.mean[k] = v.mean()
+                stats.m2[k] = np.square(v - stats.mean[k]).sum()
+                stats.min[k] = v.min()
+                stats.max[k] = v.max()
+        return stats
+
+    def update(self, values):
+        """Add a chunk of values; returns self."""
+
+        return self.merge(StreamingStats.of(values))
+
+    def merge(self, other):
+        """Combine with the statistics of other designs; returns self."""
+
+        for k in other.count:
+            if k not in self.count:
+                self.count[k], self.mean[k], self.m2[k], self.min[k], self.max[k] = 0, 0., 0., np.inf, -np.inf
+            na, nb = self.count[k], other.count[k]
+            if nb == 0:
+                continue
+            n = na + nb
+            delta = other.mean[k] - self.mean[k]
+            self.mean[k] = self.mean[k] + delta * nb / n
+            self.m2[k] = self.m2[k] + other.m2[k] + delta * delta * na * nb / n
+            self.count[k] = n
+            self.min[k] = min(self.min[k], other.min[k])
+            self.max[k] = max(self.max[k], other.max[k])
+        return self
+
+    def variance(self, ddof=0):
+        """Variance of every output."""
+
+        return OrderedDict((k, self.m2[k] / (n - ddof) if n > ddof else np.nan) for k, n in self.count.items())
+
+    def std(self, ddof=0):
+        """Standard deviation of every output."""
+
+        return OrderedDict((k, np.sqrt(v)) for k, v in self.variance(ddof).items())
+
+    def summary(self):
+        """OrderedDict of the count, mean, std, min and max of every output."""
+
+        std = self.std()
+        return OrderedDict((k, OrderedDict([('count', self.count[k]), ('mean', self.mean[k]), ('std', std[k]),
+                                            ('min', self.min[k]), ('max', self.max[k])]))
+                           for k in self.count)
+
+
+def rank_chunks(n, chunk_size, rank, size):
+    """Chunks (index, slice) of n designs that rank `rank` of `size` evaluates."""
+
+    n_chunks = -(-n // chunk_size)
+    return [(i, slice(i * chunk_size, min((i + 1) * chunk_size, n))) for i in range(rank, n_chunks, size)]
+
+
+def local_run(n, evaluate_chunk, outputs, rank, size, chunk_size=65536, dtype=np.float64, gather=True):
+    """
+    Evaluate the chunks of one rank.
+
+    evaluate_chunk(sl, buffers) writes the outputs of designs sl into the
+    buffers.  Returns a list of (chunk index, StreamingStats, results or
+    None), the payload that reduce_runs combines.
+    """
+
+    payload = []
+    for i, sl in rank_chunks(n, chunk_size, rank, size):
+        result, buffers = _allocate(outputs, sl.stop - sl.start, dtype, False)
+        evaluate_chunk(sl, buffers)
+        payload.append((i, StreamingStats.of(buffers), result if gather else None))
+    return payload
+
+
+def reduce_runs(payloads, n, outputs, dtype=np.float64, gather=True):
+    """Merge the payloads of all ranks in chunk order: the results (or None) and the StreamingStats."""
+
+    chunks = sorted((c for p in payloads for c in p), key=lambda c: c[0])
+    stats = StreamingStats(outputs)
+    result, buffers = _allocate(outputs, n, dtype, False) if gather else (None, None)
+    start = 0
+    for i, chunk_stats, chunk in chunks:
+        stats.merge(chunk_stats)
+        if gather:
+            stop = start + len(chunk[outputs[0]])
+            for k in outputs:
+                buffers[k][start:stop] = chunk[k]
+            start = stop
+    return result, stats
+
+
+def _run(n, evaluate_chunk, outputs, comm, chunk_size, dtype, gather):
+
+    comm = comm if comm is not None else get_comm()
+    payload = local_run(n, evaluate_chunk, outputs, comm.Get_rank(), comm.Get_size(), chunk_size, dtype, gather)
+    payloads = comm.gather(payload, root=0)
+    if comm.Get_rank() != 0:
+        return None, None
+    return reduce_runs(payloads, n, outputs, dtype, gather)
+
+
+def distributed_samples(samples, outputs=None, comm=None, gather=True, dtype=np.float64, chunk_size=65536,
+                        max_tip_speed=80., max_efficiency=0.90, **model_kwargs):
+    """
+    sweep_2015.evaluate_samples over the ranks of `comm`.
+
+    Every rank holds the samples and evaluates its own chunks.  Rank 0
+    returns the 1D output arrays (None with gather=False) and the
+    StreamingStats of the outputs; the other ranks return (None, None).
+    """
+
+    dtype = np.dtype(dtype).type
+    n = max([np.size(v) for v in samples.values()] or [1])
+    samples = OrderedDict((k, np.broadcast_to(np.asarray(v, dtype=dtype), (n,))) for k, v in samples.items())
+    outputs = list(outputs or _output_names(**model_kwargs))
+
+    def evaluate_chunk(sl, buffers):
+        inputs = dict((k, v[sl]) for k, v in samples.items())
+        _evaluate(inputs, buffers, slice(None), dtype, max_tip_speed, max_efficiency, model_kwargs)
+
+    return _run(n, evaluate_chunk, outputs, comm, chunk_size, dtype, gather)
+
+
+def distributed_sweep(rotor_diameter, machine_rating, hub_height, outputs=None, comm=None, gather=True,
+                      dtype=np.float64, chunk_size=65536, max_tip_speed=80., max_efficiency=0.90, **model_kwargs):
+    """
+    sweep_2015.sweep over the ranks of `comm`.
+
+    The grid designs are chunked in C order.  Rank 0 returns the outputs
+    with the grid shape (None with gather=False) and their StreamingStats.
+    """
+
+    dtype = np.dtype(dtype).type
+    axes = [np.atleast_1d(np.asarray(x, dtype=dtype)) for x in (rotor_diameter, machine_rating, hub_height)]
+    shape = tuple(len(a) for a in axes)
+    outputs = list(outputs or _output_names(**model_kwargs))
+
+    def evaluate_chunk(sl, buffers):
+        idx = np.unravel_index(np.arange(sl.start, sl.stop), shape)
+        inputs = dict((k, a[i]) for k, a, i in zip(INPUTS, axes, idx))
+        _evaluate(inputs, buffers, slice(None), dtype, max_tip_speed, max_efficiency, model_kwargs)
+
+    result, stats = _run(int(np.prod(shape)), evaluate_chunk, outputs, comm, chunk_size, dtype, gather)
+    if result is not None:
+        result = OrderedDict((k, v.reshape(shape)) for k, v in result.items())
+    return result, stats
+
+
+def distributed_monte_carlo(n, distributions, fixed=None, outputs=None, seed=None, comm=None, gather=True,
+                            dtype=np.float64, chunk_size=65536, max_tip_speed=80., max_efficiency=0.90,
+                            block_size=SAMPLE_BLOCK, **model_kwargs):
+    """
+    sweep_2015.monte_carlo over the ranks of `comm`.
+
+    The blocks of sweep_2015.sample_streams are the chunks shared out over
+    the ranks and every rank draws only its own blocks, so the samples and
+    results equal those of monte_carlo for any number of ranks.  Without a
+    seed, rank 0 picks the entropy for all ranks.  Rank 0 returns the
+    samples and the outputs (None with gather=False) and the StreamingStats
+    of both; the other ranks return None for all three.
+    """
+
+    comm = comm if comm is not None else get_comm()
+    dtype = np.dtype(dtype).type
+    seed = comm.bcast(np.random.SeedSequence(seed).entropy if comm.Get_rank() == 0 else None, root=0)
+    streams = sample_streams(n, seed, block_size)
+    fixed = OrderedDict((k, np.broadcast_to(np.asarray(v, dtype=dtype), (n,))) for k, v in (fixed or {}).items())
+    names = list(distributions)
+    outputs = list(outputs or _output_names(**model_kwargs))
+
+    def evaluate_chunk(sl, buffers):
+        size = sl.stop - sl.start
+        inputs = OrderedDict((k, v[sl]) for k, v in fixed.items())
+        inputs.update(draw_block(distributions, streams[sl.start // block_size], size, dtype))
+        for k in names:
+            buffers[k][:] = inputs[k]
+        for start in range(0, size, chunk_size):
+            chunk = slice(start, min(start + chunk_size, size))
+            _evaluate(dict((k, v[chunk]) for k, v in inputs.items()), OrderedDict((k, buffers[k]) for k in outputs),
+                      chunk, dtype, max_tip_speed, max_efficiency, model_kwargs)
+
+    result, stats = _run(n, evaluate_chunk, names + outputs, comm, block_size, dtype, gather)
+    if stats is None:
+        return None, None, None
+    if not gather:
+        return None, None, stats
+    return OrderedDict((k, result[k]) for k in names), OrderedDict((k, result[k]) for k in outputs), stats
+
+#-------------------------------------------------------------------------------
+def example():
+
+    import time
+
+    comm = get_comm()
+
+    # 2 million Monte Carlo designs, statistics only
+    distributions = {'rotor_diameter': lambda rng, size: rng.uniform(100., 160., size),
+                     'blade_mass_cost_coeff': lambda rng, size: rng.normal(14.6, 1.5, size)}
+    fixed = {'machine_rating': 5000., 'hub_height': 90.}
+    start = time.time()
+    samples, results, stats = distributed_monte_carlo(2000000, distributions, fixed, outputs=['turbine_cost'],
+                                                      seed=1, comm=comm, gather=False, crane=True)
+    if comm.Get_rank() == 0:
+        s = stats.summary()['turbine_cost']
+        print('%d ranks: turbine_cost mean %.0f USD, std %.0f USD over %d designs in %.2f s'
+              % (comm.Get_size(), s['mean'], s['std'], s['count'], time.time() - start))
+
+
+if __name__ == "__main__":
+
+    example()
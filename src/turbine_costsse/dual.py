@@ -0,0 +1,399 @@
+"""
+dual.py
+
+Forward-mode automatic differentiation with NumPy dual numbers.
+
+A Dual carries a value array and a tangent array with one extra trailing
+axis, one entry per seed direction.  NumPy ufuncs and the few array
+functions used by the equations (where, broadcast_to, copy, real, ...)
+propagate the tangents, so passing Duals through equations_2015, the
+OpenMDAO components or user-written equations gives the directional
+derivatives along all seed directions in a single vectorized evaluation.
+Second derivatives are the complex step of these exact first derivatives:
+Duals with complex values give Hessians without subtractive cancellation.
+
+Copyright (c) NREL. All rights reserved.
+"""
+
+from collections import OrderedDict
+
+import numpy as np
+
+
+def _split(x):
+
+    if isinstance(x, Dual):
+        return x.value, x.tangent
+    return x, None
+
+
+def _chain(value, *terms):
+    # value with tangent sum(partial * tangent) over (partial, tangent) terms
+
+    tangent = None
+    for partial, t in terms:
+        if t is None:
+            continue
+        term = np.asarray(partial)[..., None] * t
+        tangent = term if tangent is None else tangent + term
+    if tangent is None:
+        return value
+    return Dual(value, np.broadcast_to(tangent, np.shape(value) + tangent.shape[-1:]))
+
+
+def _select(condition, x, y):
+
+    (a, ta), (b, tb) = _split(x), _split(y)
+    value = np.where(condition, a, b)
+    if ta is None and tb is None:
+        return value
+    n = (ta if ta is not None else tb).shape[-1]
+    ta = np.zeros(np.shape(a) + (n,)) if ta is None else ta
+    tb = np.zeros(np.shape(b) + (n,)) if tb is None else tb
+    return Dual(value, np.where(np.asarray(condition)[..., None], ta, tb))
+
+
+_COMPARISONS = (np.less, np.less_equal, np.greater, np.greater_equal, np.equal, np.not_equal)
+
+
+class Dual(object):
+    """
+    Dual number array: `value` and its derivatives `tangent` along n seed
+    directions, where tangent.shape == value.shape + (n,).
+    """
+
+    def __init__(self, value, tangent):
+
+        self.value = np.asarray(value)
+        self.tangent = np.asarray(tangent)
+        if self.tangent.shape[:-1] != self.value.shape:
+            raise ValueError('tangent shape %s does not match value shape %s'
+                             % (self.tangent.shape, self.value.shape))
+
+    @property
+    def shape(self):
+        return self.value.shape
+
+    @property
+    def ndim(self):
+        return self.value.ndim
+
+    @property
+    def size(self):
+        return self.value.size
+
+    @property
+    def n_directions(self):
+        return self.tangent.shape[-1]
+
+    def __repr__(self):
+        return 'Dual(%r, %r)' % (self.value, self.tangent)
+
+    def __len__(self):
+        return len(self.value)
+
+    def __getitem__(self, index):
+        if not isinstance(index, tuple):
+            index = (index,)
+        # the direction axis stays last
+        if any(i is Ellipsis for i in index):
+            return Dual(self.value[index], self.tangent[index + (slice(None),)])
+        return Dual(self.value[index], self.tangent[index])
+
+    def __bool__(self):
+        return bool(self.value)
+
+    __nonzero__ = __bool__
+
+    # arithmetic goes through the ufuncs
+    __add__ = lambda self, other: np.add(self, other)
+    __radd__ = lambda self, other: np.add(other, self)
+    __sub__ = lambda self, other: np.subtract(self, other)
+    __rsub__ = lambda self, other: np.subtract(other, self)
+    __mul__ = lambda self, other: np.multiply(self, other)
+    __rmul__ = lambda self, other: np.multiply(other, self)
+    __truediv__ = lambda self, other: np.true_divide(self, other)
+    __rtruediv__ = lambda self, other: np.true_divide(other, self)
+    __div__, __rdiv__ = __truediv__, __rtruediv__
+    __pow__ = lambda self, other: np.power(self, other)
+    __rpow__ = lambda self, other: np.power(other, self)
+    __neg__ = lambda self: np.negative(self)
+    __pos__ = lambda self: self
+    __abs__ = lambda self: np.absolute(self)
+    __lt__ = lambda self, other: np.less(self, other)
+    __le__ = lambda self, other: np.less_equal(self, other)
+    __gt__ = lambda self, other: np.greater(self, other)
+    __ge__ = lambda self, other: np.greater_equal(self, other)
+
+    def __array_ufunc__(self, ufunc, method, *inputs, **kwargs):
+
+        if method != '__call__' or kwargs:
+            return NotImplemented
+        args = [_split(x) for x in inputs]
+        values = [a for a, t in args]
+
+        if ufunc in _COMPARISONS:
+            return ufunc(*values)
+
+        if len(args) == 1:
+            (a, ta), = args
+            if ufunc is np.negative:
+                return _chain(-a, (-1., ta))
+            if ufunc is np.positive:
+                return _chain(+a, (1., ta))
+            if ufunc is np.exp:
+                v = np.exp(a)
+                return _chain(v, (v, ta))
+            if ufunc is np.log:
+                return _chain(np.log(a), (1./a, ta))
+            if ufunc is np.sqrt:
+                v = np.sqrt(a)
+                return _chain(v, (0.5/v, ta))
+            if ufunc is np.square:
+                return _chain(a*a, (2.*a, ta))
+            if ufunc is np.sin:
+                return _chain(np.sin(a), (np.cos(a), ta))
+            if ufunc is np.cos:
+                return _chain(np.cos(a), (-np.sin(a), ta))
+            if ufunc is np.absolute:
+                return _chain(np.absolute(a), (np.sign(a), ta))
+            return NotImplemented
+
+        (a, ta), (b, tb) = args
+        if ufunc is np.add:
+            return _chain(a + b, (1., ta), (1., tb))
+        if ufunc is np.subtract:
+            return _chain(a - b, (1., ta), (-1., tb))
+        if ufunc is np.multiply:
+            return _chain(a * b, (b, ta), (a, tb))
+        if ufunc is np.true_divide:
+            v = a / b
+            return _chain(v, (1./b, ta), (-v/b, tb))
+        if ufunc is np.power:
+            v = a ** b
+            # the log is only needed for a differentiated exponent
+            return _chain(v, (b * a**(b - 1.), ta), (v*np.log(a) if tb is not None else 0., tb))
+        if ufunc is np.maximum:
+            return _select(a >= b, inputs[0], inputs[1])
+        if ufunc is np.minimum:
+            return _select(a <= b, inputs[0], inputs[1])
+        return NotImplemented
+
+    def __array_function__(self, func, types, args, kwargs):
+
+        if func is np.shape:
+            return self.shape
+        if func is np.ndim:
+            return self.ndim
+        if func is np.size:
+            return self.size
+        if func is np.real:
+            return Dual(np.real(self.value), np.real(self.tangent))
+        if func is np.copy:
+            return Dual(np.copy(self.value), np.copy(self.tangent))
+        if func is np.broadcast_to:
+            shape = tuple(np.atleast_1d(args[1] if len(args) > 1 else kwargs['shape']))
+            return Dual(np.broadcast_to(self.value, shape),
+                        np.broadcast_to(self.tangent, shape + self.tangent.shape[-1:]))
+        if func is np.expand_dims:
+            axis = args[1] if len(args) > 1 else kwargs['axis']
+            # negative axes count from the end of the value, before the direction axis
+            return Dual(np.expand_dims(self.value, axis), np.expand_dims(self.tangent, axis - 1 if axis < 0 else axis))
+        if func is np.where:
+            condition, x, y = args
+            return _select(_split(condition)[0], x, y)
+        if func is np.sum:
+            axis = kwargs.get('axis', args[1] if len(args) > 1 else None)
+            if axis is None:
+                axis = tuple(range(self.ndim))
+            axis = tuple(a % self.ndim for a in np.atleast_1d(axis))
+            return Dual(np.sum(self.value, axis=axis), np.sum(self.tangent, axis=axis))
+        return NotImplemented
+
+
+def jvp(func, primals, tangents, **kwargs):
+    """
+    Evaluate func(**primals, **kwargs) with tangents seeded on some inputs.
+
+    `tangents[name]` has the shape of primals[name] (or broadcasts to it)
+    plus a trailing axis of n seed directions.  Returns the values and the
+    directional derivatives of every output as two OrderedDicts; the
+    derivatives have the output shape plus the trailing direction axis.
+    """
+
+    n = None
+    args = dict(primals)
+    for k, t in tangents.items():
+        t = np.asarray(t, dtype=float)
+        if n is not None and t.shape[-1] != n:
+            raise ValueError('all tangents need the same number of directions')
+        n = t.shape[-1]
+        value = np.asarray(primals[k])
+        value = value.astype(np.result_type(value, float))
+        shape = np.broadcast_shapes(value.shape, t.shape[:-1])
+        args[k] = Dual(np.broadcast_to(value, shape), np.broadcast_to(t, shape + (n,)))
+    args.update(kwargs)
+
+    out = func(**args)
+    single = not isinstance(out, dict)
+    if single:
+        out = {'out': out}
+    values, derivs = OrderedDict(), OrderedDict()
+    for k, v in out.items():
+        value, tangent = _split(v)
+        values[k] = value
+        derivs[k] = tangent if tangent is not None else np.zeros(np.shape(value) + (n,))
+    if single:
+        return values['out'], derivs['out']
+    return values, derivs
+
+
+def jacobian(func, inputs, wrt=None, **kwargs):
+    """
+    Jacobian of func(**inputs, **kwargs) with respect to scalar-per-design inputs.
+
+    `inputs` maps argument names to scalars or arrays (a batch of designs);
+    `wrt` lists the names to differentiate with respect to (default: all of
+    `inputs`).  Returns the outputs and J, where J[output] has the output
+    shape plus a trailing axis over `wrt`.
+    """
+
+    if wrt is None:
+        wrt = list(inputs)
+    n = len(wrt)
+    tangents = OrderedDict((k, np.eye(n)[j]) for j, k in enumerate(wrt))
+    return jvp(func, inputs, tangents, **kwargs)
+
+
+def hessian(func, inputs, wrt=None, h=1e-30, **kwargs):
+    """
+    Hessian of func(**inputs, **kwargs) by complex step over dual numbers.
+
+    The n inputs in `wrt` (default: all of `inputs`) are each given an
+    imaginary perturbation on their own entry of a new leading axis, so a
+    single evaluation with n seed directions returns all n x n second
+    derivatives of every design of the batch to machine precision.  Returns
+    the outputs, their Jacobians and Hessians; J[output] has the output shape
+    plus a trailing axis over `wrt`, H[output] two trailing axes.
+    """
+
+    if wrt is None:
+        wrt = list(inputs)
+    n = len(wrt)
+    shape = np.broadcast_shapes(*[np.shape(v) for v in inputs.values()])
+
+    stacked = dict(inputs)
+    for j, k in enumerate(wrt):
+        x = np.broadcast_to(np.asarray(inputs[k], dtype=float), shape)
+        stacked[k] = x + 1j*h*np.eye(n)[:, j].reshape((n,) + (1,)*len(shape))
+    out, J = jacobian(func, stacked, wrt=wrt, **kwargs)
+
+    single = not isinstance(out, dict)
+    if single:
+        out, J = {'out': out}, {'out': J}
+    values, grads, hess = OrderedDict(), OrderedDict(), OrderedDict()
+    for k in out:
+        values[k] = np.real(out[k][0])
+        grads[k] = np.real(J[k][0])
+        hess[k] = np.moveaxis(np.imag(J[k]) / h, 0, -1)
+    if single:
+        return values['out'], grads['out'], hess['out']
+    return values, grads, hess
+
+
+def csm_hessian(rotor_diameter, machine_rating, hub_height, outputs=('turbine_cost_kW',), max_tip_speed=80.,
+                max_efficiency=0.90, fixed_rotor_torque=None, **kwargs):
+    """
+    Second derivatives of csm_model outputs with respect to rotor_diameter,
+    machine_rating and hub_height, vectorized over designs.
+
+    As in optimization_2015.optimize_turbine_cost (and nrel_csm_2015 with
+    drivetrain=True) the rotor torque follows from the rating and diameter
+    via max_tip_speed and max_efficiency, so its dependence on them is part
+    of the derivatives.  With fixed_rotor_torque the torque is instead held
+    at that value, as with the torque input of nrel_csm_2015.  The
+    remaining keyword arguments are passed to csm_model.  Returns
+    OrderedDicts of the values, gradients (trailing axis of 3) and Hessians
+    (two trailing axes of 3) of `outputs`.
+    """
+
+    from turbine_costsse.equations_2015 import csm_model, rotor_torque
+
+    def model(rotor_diameter, machine_rating, hub_height):
+        if fixed_rotor_torque is None:
+            Q = rotor_torque(machine_rating, rotor_diameter, max_tip_speed, max_efficiency)
+        else:
+            Q = fixed_rotor_torque
+        out = csm_model(rotor_diameter, machine_rating, hub_height, Q, **kwargs)
+        return OrderedDict((k, out[k]) for k in outputs)
+
+    return hessian(model, OrderedDict([('rotor_diameter', rotor_diameter), ('machine_rating', machine_rating),
+                                       ('hub_height', hub_height)]))
+
+
+def component_jacobian(comp, params=None):
+    """
+    Partial derivatives of an OpenMDAO component by dual numbers.
+
+    All float params are seeded at once (one direction per param entry) and
+    solve_nonlinear is called a single time.  Returns the unknowns and
+    J[(unknown, param)] in the layout of Component.linearize.
+    """
+
+    from turbine_costsse.utilities import _params, _run
+
+    values, float_params = _params(comp, params)
+    sizes = [np.size(values[k]) for k in float_params]
+    n = sum(sizes)
+
+    seeded = dict(values)
+    col = 0
+    for k, size in zip(float_params, sizes):
+        value = np.asarray(values[k], dtype=float)
+        tangent = np.zeros(value.shape + (n,))
+        tangent.reshape(size, n)[:, col:col + size] = np.eye(size)
+        seeded[k] = Dual(value, tangent)
+        col += size
+    unknowns = _run(comp, seeded)
+
+    out, J = OrderedDict(), OrderedDict()
+    for name, meta in comp._init_unknowns_dict.items():
+        if meta.get('pass_by_obj'):
+            out[name] = unknowns[name]
+            continue
+        value, tangent = _split(unknowns[name])
+        shape = np.shape(meta['val'])
+        out[name] = np.broadcast_to(value, shape).copy() if shape else value
+        if tangent is None:
+            tangent = np.zeros(shape + (n,))
+        tangent = np.broadcast_to(tangent, shape + (n,)).reshape(-1, n)
+        col = 0
+        for k, size in zip(float_params, sizes):
+            J[name, k] = tangent[:, col:col + size]
+            col += size
+    return out, J
+
+#-------------------------------------------------------------------------------
+def example():
+
+    from turbine_costsse.equations_2015 import csm_model, rotor_torque, JACOBIAN_INPUTS
+
+    # gradients of the turbine cost of 1000 designs in one evaluation
+    D = np.linspace(80., 200., 1000)
+    P = np.full_like(D, 5000.)
+    inputs = {'rotor_diameter': D, 'machine_rating': P, 'hub_height': 90., 'rotor_torque': rotor_torque(P, D)}
+    out, J = jacobian(csm_model, inputs, wrt=JACOBIAN_INPUTS, crane=True)
+    for j, k in enumerate(JACOBIAN_INPUTS):
+        print('d turbine_cost / d %s at D = 126 m: %.4g' % (k, np.interp(126., D, J['turbine_cost'][:, j])))
+
+    # second-order estimate of the mean cost per kW under input uncertainty
+    value, grad, H = csm_hessian(D, P, 90., crane=True)
+    cov = np.diag([2.**2, 100.**2, 3.**2])
+    mean = value['turbine_cost_kW'] + 0.5*np.einsum('...ij,ij->...', H['turbine_cost_kW'], cov)
+    print('turbine_cost_kW at D = 126 m: %.2f USD/kW, second-order mean %.2f USD/kW'
+          % (np.interp(126., D, value['turbine_cost_kW']), np.interp(126., D, mean)))
+
+
+if __name__ == "__main__":
+
+    example()
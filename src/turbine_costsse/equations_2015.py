@@ -0,0 +1,567 @@
+"""
+equations_2015.py
+
+Mass and cost equations of the 2015 NREL Cost and Scaling Model.
+
+This module only depends on NumPy so that the equations can be used by tools
+that do not need OpenMDAO.  The components in nrel_csm_tcc_2015.py and
+turbine_costsse_2015.py are thin wrappers around the functions below.  All
+continuous inputs may be scalars or NumPy arrays and broadcast against each
+other, so a batch of designs is evaluated in a single call.
+
+Copyright (c) NREL. All rights reserved.
+"""
+
+from collections import OrderedDict
+
+import numpy as np
+
+###### Default coefficients
+#-------------------------------------------------------------------------------
+# mass model coefficients (nrel_csm_tcc_2015.py)
+MASS_COEFFS_2015 = OrderedDict([
+    ('blade_mass_coeff',             0.5),
+    ('blade_user_exp',               2.5),
+    ('hub_mass_coeff',               2.3),
+    ('hub_mass_intercept',           1320.),
+    ('pitch_bearing_mass_coeff',     0.1295),
+    ('pitch_bearing_mass_intercept', 491.31),
+    ('bearing_housing_percent',      0.3280),
+    ('mass_sys_offset',              555.0),
+    ('spinner_mass_coeff',           15.5),
+    ('spinner_mass_intercept',       -980.0),
+    ('lss_mass_coeff',               13.),
+    ('lss_mass_exp',                 0.65),
+    ('lss_mass_intercept',           775.),
+    ('bearing_mass_coeff',           0.0001),
+    ('bearing_mass_exp',             3.5),
+    ('gearbox_mass_coeff',           113.),
+    ('gearbox_mass_exp',             0.71),
+    ('hss_mass_coeff',               0.19894),
+    ('generator_mass_coeff',         2300.),
+    ('generator_mass_intercept',     3400.),
+    ('bedplate_mass_exp',            2.2),
+    ('yaw_mass_coeff',               0.0009),
+    ('yaw_mass_exp',                 3.314),
+    ('hvac_mass_coeff',              0.08),
+    ('cover_mass_coeff',             1.2817),
+    ('cover_mass_intercept',         428.19),
+    ('platforms_mass_coeff',         0.125),
+    ('crane_weight',                 3000.),
+    ('transformer_mass_coeff',       1915.),
+    ('transformer_mass_intercept',   1910.),
+    ('tower_mass_coeff',             19.828),
+    ('tower_mass_exp',               2.0282),
+])
+
+# mass-cost coefficients (turbine_costsse_2015.py)
+COST_COEFFS_2015 = OrderedDict([
+    ('blade_mass_cost_coeff',                 14.6),
+    ('hub_mass_cost_coeff',                   3.9),
+    ('pitch_system_mass_cost_coeff',          22.1),
+    ('spinner_mass_cost_coeff',               11.1),
+    ('lss_mass_cost_coeff',                   11.9),
+    ('bearings_mass_cost_coeff',              4.5),
+    ('gearbox_mass_cost_coeff',               12.9),
+    ('hss_mass_cost_coeff',                   6.8),
+    ('generator_mass_cost_coeff',             12.4),
+    ('bedplate_mass_cost_coeff',              2.9),
+    ('yaw_mass_cost_coeff',                   8.3),
+    ('vs_electronics_mass_cost_coeff',        18.8),
+    ('hvac_mass_cost_coeff',                  124.0),
+    ('cover_mass_cost_coeff',                 5.7),
+    ('elec_connec_machine_rating_cost_coeff', 41.85),
+    ('platforms_mass_cost_coeff',             17.1),
+    ('base_hardware_cost_coeff',              0.7),
+    ('transformer_mass_cost_coeff',           18.8),
+    ('tower_mass_cost_coeff',                 2.9),
+    ('controls_machine_rating_cost_coeff',    21.15),
+    ('crane_cost',                            12e3),
+])
+
+# assembly, overhead, profit and transport multipliers
+MULTIPLIERS_2015 = OrderedDict([
+    ('hub_assemblyCostMultiplier',      0.0),
+    ('hub_overheadCostMultiplier',      0.0),
+    ('nacelle_assemblyCostMultiplier',  0.0),
+    ('nacelle_overheadCostMultiplier',  0.0),
+    ('tower_assemblyCostMultiplier',    0.0),
+    ('tower_overheadCostMultiplier',    0.0),
+    ('turbine_assemblyCostMultiplier',  0.0),
+    ('turbine_overheadCostMultiplier',  0.0),
+    ('hub_profitMultiplier',            0.0),
+    ('nacelle_profitMultiplier',        0.0),
+    ('tower_profitMultiplier',          0.0),
+    ('turbine_profitMultiplier',        0.0),
+    ('hub_transportMultiplier',         0.0),
+    ('nacelle_transportMultiplier',     0.0),
+    ('tower_transportMultiplier',       0.0),
+    ('turbine_transportMultiplier',     0.0),
+])
+
+# mass of the onboard crane removed from the platforms mass in the cost model
+CRANE_MASS = 3e3
+
+# blade mass exponents by turbine class (rows: user exp, class 1, class > 1) and carbon blades (columns: no, yes);
+# the user exp row is replaced by blade_user_exp
+BLADE_MASS_EXP_2015 = np.array([[np.nan, np.nan],
+                                [2.54,   2.47],
+                                [2.50,   2.44]])
+
+
+def _broadcast(out):
+
+    # give outputs that do not depend on the batch inputs the common batch shape
+    shape = np.broadcast_shapes(*[np.shape(v) for v in out.values()])
+    if shape:
+        # constants take the dtype of the batch outputs
+        batch = [v for v in out.values() if isinstance(v, np.ndarray) and np.shape(v) == shape]
+        dtype = np.result_type(*batch) if batch else None
+        for k, v in out.items():
+            if np.shape(v) != shape:
+                out[k] = np.copy(np.broadcast_to(v, shape))
+                if dtype is not None and np.isscalar(v):
+                    out[k] = out[k].astype(dtype)
+    return out
+
+def default_coeffs(coeffs=None):
+    """Return all default coefficients and multipliers updated with `coeffs`."""
+
+    c = OrderedDict()
+    c.update(MASS_COEFFS_2015)
+    c.update(COST_COEFFS_2015)
+    c.update(MULTIPLIERS_2015)
+    if coeffs is not None:
+        unknown = set(coeffs) - set(c)
+        if unknown:
+            raise KeyError('unknown coefficient(s): %s' % ', '.join(sorted(unknown)))
+        c.update(coeffs)
+    return c
+
+
+###### Mass equations
+#-------------------------------------------------------------------------------
+def blade_mass_exp(turbine_class, blade_has_carbon, blade_user_exp):
+
+    # select the exp for the blade mass equation from BLADE_MASS_EXP_2015, elementwise for arrays of designs
+    turbine_class = np.asarray(turbine_class)
+    row = (turbine_class == 1) + 2 * (turbine_class > 1)
+    exp = BLADE_MASS_EXP_2015[row, np.asarray(blade_has_carbon, dtype=bool).astype(int)]
+    return np.where(row == 0, blade_user_exp, exp)
+
+def blade_mass(rotor_diameter, turbine_class, blade_has_carbon, blade_mass_coeff, blade_user_exp):
+
+    exp = blade_mass_exp(turbine_class, blade_has_carbon, blade_user_exp)
+    # the table exponents are float64, cast them so that float32 batches stay float32
+    if getattr(exp, 'dtype', None) == np.float64 and isinstance(rotor_diameter, (np.ndarray, np.generic)):
+        exp = exp.astype(np.result_type(rotor_diameter.dtype, np.float32))
+    return blade_mass_coeff * (rotor_diameter / 2)**exp
+
+def hub_mass(blade_mass, hub_mass_coeff, hub_mass_intercept):
+
+    return hub_mass_coeff * blade_mass + hub_mass_intercept
+
+def pitch_system_mass(blade_mass, blade_number, pitch_bearing_mass_coeff, pitch_bearing_mass_intercept,
+                      bearing_housing_percent, mass_sys_offset):
+
+    pitchBearingMass = pitch_bearing_mass_coeff * blade_mass * blade_number + pitch_bearing_mass_intercept
+    return pitchBearingMass * (1 + bearing_housing_percent) + mass_sys_offset
+
+def spinner_mass(rotor_diameter, spinner_mass_coeff, spinner_mass_intercept):
+
+    return spinner_mass_coeff * rotor_diameter + spinner_mass_intercept
+
+def lss_mass(blade_mass, machine_rating, lss_mass_coeff, lss_mass_exp, lss_mass_intercept):
+
+    return lss_mass_coeff * (blade_mass * machine_rating/1000.)**lss_mass_exp + lss_mass_intercept
+
+def main_bearing_mass(rotor_diameter, bearing_mass_coeff, bearing_mass_exp):
+
+    # mass of a SINGLE bearing
+    return bearing_mass_coeff * rotor_diameter ** bearing_mass_exp
+
+def gearbox_mass(rotor_torque, gearbox_mass_coeff, gearbox_mass_exp):
+
+    return gearbox_mass_coeff * (rotor_torque/1000.0)**gearbox_mass_exp
+
+def hss_mass(machine_rating, hss_mass_coeff):
+
+    return hss_mass_coeff * machine_rating
+
+def generator_mass(machine_rating, generator_mass_coeff, generator_mass_intercept):
+
+    return generator_mass_coeff * machine_rating/1000. + generator_mass_intercept
+
+def bedplate_mass(rotor_diameter, bedplate_mass_exp):
+
+    return rotor_diameter**bedplate_mass_exp
+
+def yaw_mass(rotor_diameter, yaw_mass_coeff, yaw_mass_exp):
+
+    # 50% adder for non-bearing mass
+    return 1.5 * (yaw_mass_coeff * rotor_diameter ** yaw_mass_exp)
+
+def hvac_mass(machine_rating, hvac_mass_coeff):
+
+    return hvac_mass_coeff * machine_rating
+
+def cover_mass(machine_rating, cover_mass_coeff, cover_mass_intercept):
+
+    return cover_mass_coeff * machine_rating + cover_mass_intercept
+
+def _switch(flag):
+
+    # 0/1 switch as a number; complex and dual switches keep their perturbation
+    value = np.asarray(flag)
+    return flag if value.dtype == object else value * 1.
+
+def other_mass(bedplate_mass, platforms_mass_coeff, crane, crane_weight):
+
+    # nacelle platforms and onboard crane
+    platforms_mass = platforms_mass_coeff * bedplate_mass
+    return platforms_mass + crane_weight * _switch(crane)
+
+def transformer_mass(machine_rating, transformer_mass_coeff, transformer_mass_intercept):
+
+    return transformer_mass_coeff * machine_rating/1000. + transformer_mass_intercept
+
+def tower_mass(hub_height, tower_mass_coeff, tower_mass_exp):
+
+    return tower_mass_coeff * hub_height ** tower_mass_exp
+
+
+###### Cost equations
+#-------------------------------------------------------------------------------
+def blade_cost(blade_mass, blade_mass_cost_coeff, blade_cost_external):
+
+    # external cost if given; decided on the real part so that complex step and batches work
+    return np.where(np.real(blade_cost_external) < 1., blade_mass_cost_coeff * blade_mass,
+                    blade_cost_external + 0. * blade_mass)
+
+def main_bearing_cost(main_bearing_mass, main_bearing_number, bearings_mass_cost_coeff):
+
+    return bearings_mass_cost_coeff * main_bearing_mass * main_bearing_number
+
+def other_cost(platforms_mass, platforms_mass_cost_coeff, crane, crane_cost):
+
+    # the crane flag is a 0/1 mask, so designs with and without crane share one batch
+    has_crane = _switch(crane)
+    return platforms_mass_cost_coeff * (platforms_mass - CRANE_MASS * has_crane) + crane_cost * has_crane
+
+def tower_parts_cost(tower_mass, tower_mass_cost_coeff, tower_cost_external):
+
+    return np.where(np.real(tower_cost_external) < 1., tower_mass_cost_coeff * tower_mass,
+                    tower_cost_external + 0. * tower_mass)
+
+def system_cost(parts_cost, assemblyCostMultiplier, overheadCostMultiplier, profitMultiplier, transportMultiplier):
+
+    # apply multipliers for assembly, transport, overhead, and profits
+    return (1 + transportMultiplier + profitMultiplier) * ((1 + overheadCostMultiplier + assemblyCostMultiplier) * parts_cost)
+
+def system_cost_partials(parts_cost, assemblyCostMultiplier, overheadCostMultiplier, profitMultiplier, transportMultiplier):
+
+    # derivatives of system_cost wrt parts_cost, the assembly and overhead multipliers and the profit and transport multipliers
+    markup = 1 + transportMultiplier + profitMultiplier
+    factory = 1 + overheadCostMultiplier + assemblyCostMultiplier
+    return markup * factory, markup * parts_cost, factory * parts_cost
+
+
+###### Drivetrain loads
+#-------------------------------------------------------------------------------
+def rotor_speed(rotor_diameter, max_tip_speed=80.):
+
+    # rated rotor speed [rpm] at the maximum tip speed
+    return (max_tip_speed/(0.5*rotor_diameter)) * (60.0 / (2*np.pi))
+
+
+def rotor_torque(machine_rating, rotor_diameter, max_tip_speed=80., max_efficiency=0.90):
+
+    # rated torque from the maximum tip speed and drivetrain efficiency
+    ratedHubPower = machine_rating*1000. / max_efficiency
+    rotorSpeed = rotor_speed(rotor_diameter, max_tip_speed)
+    return ratedHubPower/(rotorSpeed*(np.pi/30))
+
+
+def drivetrain_loads(machine_rating, rotor_diameter, max_tip_speed=80., max_efficiency=0.90):
+    """
+    Rated rotor speed [rpm] and rotor torque [N*m] of DrivetrainLoads.
+
+    All inputs may be arrays of designs; returns an OrderedDict of
+    rotor_speed and rotor_torque with their broadcast shape.
+    """
+
+    out = OrderedDict()
+    out['rotor_speed'] = rotor_speed(rotor_diameter, max_tip_speed)
+    out['rotor_torque'] = rotor_torque(machine_rating, rotor_diameter, max_tip_speed, max_efficiency)
+    return _broadcast(out)
+
+
+def drivetrain_partials(machine_rating, rotor_diameter, max_tip_speed=80., max_efficiency=0.90):
+    """
+    Elementwise partial derivatives of drivetrain_loads.
+
+    Returns a dict J[(output, input)] for the outputs rotor_speed and
+    rotor_torque and the inputs machine_rating, rotor_diameter,
+    max_tip_speed and max_efficiency; pairs without a dependence are left out.
+    """
+
+    loads = drivetrain_loads(machine_rating, rotor_diameter, max_tip_speed, max_efficiency)
+    speed, torque = loads['rotor_speed'], loads['rotor_torque']
+    # torque = ratedHubPower * rotor_diameter / (2*max_tip_speed), since (60/(2*pi))*(pi/30) = 1
+    ratedHubPower = machine_rating*1000. / max_efficiency
+
+    J = {}
+    J['rotor_speed', 'rotor_diameter'] = -speed / rotor_diameter
+    J['rotor_speed', 'max_tip_speed'] = (60.0 / (2*np.pi)) / (0.5*rotor_diameter)
+    J['rotor_torque', 'machine_rating'] = 1000. / max_efficiency * rotor_diameter / (2.*max_tip_speed)
+    J['rotor_torque', 'rotor_diameter'] = ratedHubPower / (2.*max_tip_speed)
+    J['rotor_torque', 'max_tip_speed'] = -torque / max_tip_speed
+    J['rotor_torque', 'max_efficiency'] = -torque / max_efficiency
+    return J
+
+
+###### Models
+#-------------------------------------------------------------------------------
+def mass_model(rotor_diameter, machine_rating, hub_height, rotor_torque,
+               turbine_class=1, blade_has_carbon=False, blade_number=3, bearing_number=2, crane=False,
+               coeffs=None):
+    """
+    Component masses of nrel_csm_mass_2015.
+
+    Returns an OrderedDict with the same outputs as the OpenMDAO group.
+    `coeffs` overrides entries of MASS_COEFFS_2015.
+    """
+
+    c = default_coeffs(coeffs)
+    m = OrderedDict()
+
+    m['blade_mass'] = blade_mass(rotor_diameter, turbine_class, blade_has_carbon,
+                                 c['blade_mass_coeff'], c['blade_user_exp'])
+    m['hub_mass'] = hub_mass(m['blade_mass'], c['hub_mass_coeff'], c['hub_mass_intercept'])
+    m['pitch_system_mass'] = pitch_system_mass(m['blade_mass'], blade_number,
+                                               c['pitch_bearing_mass_coeff'], c['pitch_bearing_mass_intercept'],
+                                               c['bearing_housing_percent'], c['mass_sys_offset'])
+    m['spinner_mass'] = spinner_mass(rotor_diameter, c['spinner_mass_coeff'], c['spinner_mass_intercept'])
+    m['lss_mass'] = lss_mass(m['blade_mass'], machine_rating,
+                             c['lss_mass_coeff'], c['lss_mass_exp'], c['lss_mass_intercept'])
+    m['main_bearing_mass'] = main_bearing_mass(rotor_diameter, c['bearing_mass_coeff'], c['bearing_mass_exp'])
+    m['gearbox_mass'] = gearbox_mass(rotor_torque, c['gearbox_mass_coeff'], c['gearbox_mass_exp'])
+    m['hss_mass'] = hss_mass(machine_rating, c['hss_mass_coeff'])
+    m['generator_mass'] = generator_mass(machine_rating, c['generator_mass_coeff'], c['generator_mass_intercept'])
+    m['bedplate_mass'] = bedplate_mass(rotor_diameter, c['bedplate_mass_exp'])
+    m['yaw_mass'] = yaw_mass(rotor_diameter, c['yaw_mass_coeff'], c['yaw_mass_exp'])
+    m['hvac_mass'] = hvac_mass(machine_rating, c['hvac_mass_coeff'])
+    m['cover_mass'] = cover_mass(machine_rating, c['cover_mass_coeff'], c['cover_mass_intercept'])
+    m['other_mass'] = other_mass(m['bedplate_mass'], c['platforms_mass_coeff'], crane, c['crane_weight'])
+    m['transformer_mass'] = transformer_mass(machine_rating, c['transformer_mass_coeff'],
+                                             c['transformer_mass_intercept'])
+    m['tower_mass'] = tower_mass(hub_height, c['tower_mass_coeff'], c['tower_mass_exp'])
+
+    # turbine_mass_adder
+    m['hub_system_mass'] = m['hub_mass'] + m['pitch_system_mass'] + m['spinner_mass']
+    m['rotor_mass'] = m['blade_mass'] * blade_number + m['hub_system_mass']
+    m['nacelle_mass'] = m['lss_mass'] + bearing_number * m['main_bearing_mass'] + \
+                        m['gearbox_mass'] + m['hss_mass'] + m['generator_mass'] + \
+                        m['bedplate_mass'] + m['yaw_mass'] + m['hvac_mass'] + \
+                        m['cover_mass'] + m['other_mass'] + m['transformer_mass']
+    m['turbine_mass'] = m['rotor_mass'] + m['nacelle_mass'] + m['tower_mass']
+
+    return _broadcast(m)
+
+def cost_model(masses, machine_rating, blade_number=3, main_bearing_number=2, crane=False,
+               blade_cost_external=0., tower_cost_external=0., coeffs=None):
+    """
+    Component and system costs of Turbine_CostsSE_2015.
+
+    `masses` maps the mass inputs of Turbine_CostsSE_2015 ('blade_mass',
+    'hub_mass', ...) to values; missing masses default to zero as they do in
+    the OpenMDAO components.  `coeffs` overrides entries of COST_COEFFS_2015
+    and MULTIPLIERS_2015.
+    """
+
+    c = default_coeffs(coeffs)
+    m = lambda name: masses.get(name, 0.0)
+    out = OrderedDict()
+
+    # rotor
+    out['blade_cost'] = blade_cost(m('blade_mass'), c['blade_mass_cost_coeff'], blade_cost_external)
+    out['hub_cost'] = c['hub_mass_cost_coeff'] * m('hub_mass')
+    out['pitch_system_cost'] = c['pitch_system_mass_cost_coeff'] * m('pitch_system_mass')
+    out['spinner_cost'] = c['spinner_mass_cost_coeff'] * m('spinner_mass')
+    out['hub_system_mass'] = m('hub_mass') + m('pitch_system_mass') + m('spinner_mass')
+    out['hub_system_cost'] = system_cost(out['hub_cost'] + out['pitch_system_cost'] + out['spinner_cost'],
+                                         c['hub_assemblyCostMultiplier'], c['hub_overheadCostMultiplier'],
+                                         c['hub_profitMultiplier'], c['hub_transportMultiplier'])
+    out['rotor_cost'] = out['blade_cost'] * blade_number + out['hub_system_cost']
+    out['rotor_mass_tcc'] = m('blade_mass') * blade_number + out['hub_system_mass']
+
+    # nacelle
+    out['lss_cost'] = c['lss_mass_cost_coeff'] * m('lss_mass')
+    out['main_bearing_cost'] = main_bearing_cost(m('main_bearing_mass'), main_bearing_number,
+                                                 c['bearings_mass_cost_coeff'])
+    out['gearbox_cost'] = c['gearbox_mass_cost_coeff'] * m('gearbox_mass')
+    out['hss_cost'] = c['hss_mass_cost_coeff'] * m('hss_mass')
+    out['generator_cost'] = c['generator_mass_cost_coeff'] * m('generator_mass')
+    out['bedplate_cost'] = c['bedplate_mass_cost_coeff'] * m('bedplate_mass')
+    out['yaw_system_cost'] = c['yaw_mass_cost_coeff'] * m('yaw_mass')
+    out['hvac_cost'] = c['hvac_mass_cost_coeff'] * m('hvac_mass')
+    out['controls_cost'] = machine_rating * c['controls_machine_rating_cost_coeff']
+    out['vs_cost'] = c['vs_electronics_mass_cost_coeff'] * m('vs_electronics_mass')
+    out['elec_cost'] = c['elec_connec_machine_rating_cost_coeff'] * machine_rating
+    out['cover_cost'] = c['cover_mass_cost_coeff'] * m('cover_mass')
+    out['other_cost'] = other_cost(m('platforms_mass'), c['platforms_mass_cost_coeff'], crane, c['crane_cost'])
+    out['transformer_cost'] = c['transformer_mass_cost_coeff'] * m('transformer_mass')
+
+    # the nacelle adder multiplies the single bearing cost by the number of bearings again
+    partsCost = out['lss_cost'] + main_bearing_number * out['main_bearing_cost'] + out['gearbox_cost'] + \
+                out['hss_cost'] + out['generator_cost'] + out['bedplate_cost'] + out['yaw_system_cost'] + \
+                out['vs_cost'] + out['hvac_cost'] + out['cover_cost'] + out['elec_cost'] + \
+                out['controls_cost'] + out['other_cost'] + out['transformer_cost']
+    out['nacelle_cost'] = system_cost(partsCost,
+                                      c['nacelle_assemblyCostMultiplier'], c['nacelle_overheadCostMultiplier'],
+                                      c['nacelle_profitMultiplier'], c['nacelle_transportMultiplier'])
+    out['nacelle_mass'] = m('lss_mass') + main_bearing_number * m('main_bearing_mass') + m('gearbox_mass') + \
+                          m('hss_mass') + m('generator_mass') + m('bedplate_mass') + m('yaw_mass') + \
+                          m('vs_mass') + m('hvac_mass') + m('cover_mass') + m('transformer_mass')
+
+    # tower
+    out['tower_parts_cost'] = tower_parts_cost(m('tower_mass'), c['tower_mass_cost_coeff'], tower_cost_external)
+    out['tower_cost'] = system_cost(out['tower_parts_cost'],
+                                    c['tower_assemblyCostMultiplier'], c['tower_overheadCostMultiplier'],
+                                    c['tower_profitMultiplier'], c['tower_transportMultiplier'])
+
+    # turbine
+    out['turbine_mass'] = out['rotor_mass_tcc'] + out['nacelle_mass'] + m('tower_mass')
+    out['turbine_cost'] = system_cost(out['rotor_cost'] + out['nacelle_cost'] + out['tower_cost'],
+                                      c['turbine_assemblyCostMultiplier'], c['turbine_overheadCostMultiplier'],
+                                      c['turbine_profitMultiplier'], c['turbine_transportMultiplier'])
+    out['turbine_cost_kW'] = out['turbine_cost'] / machine_rating
+
+    return _broadcast(out)
+
+def csm_model(rotor_diameter, machine_rating, hub_height, rotor_torque,
+              turbine_class=1, blade_has_carbon=False, blade_number=3, bearing_number=2, crane=False,
+              blade_cost_external=0., tower_cost_external=0., coeffs=None):
+    """
+    Masses and costs of nrel_csm_2015.
+
+    The mass model feeds the cost model; the nacelle platforms mass is the
+    'other_mass' of the mass model and `bearing_number` is used for both
+    models.  Where both models compute the same quantity (hub system, nacelle
+    and turbine mass) the cost model value is returned, as in the OpenMDAO
+    group.
+    """
+
+    out = mass_model(rotor_diameter, machine_rating, hub_height, rotor_torque,
+                     turbine_class=turbine_class, blade_has_carbon=blade_has_carbon,
+                     blade_number=blade_number, bearing_number=bearing_number, crane=crane,
+                     coeffs=coeffs)
+
+    masses = dict(out)
+    masses['platforms_mass'] = out['other_mass']
+    out.update(cost_model(masses, machine_rating, blade_number=blade_number,
+                          main_bearing_number=bearing_number, crane=crane,
+                          blade_cost_external=blade_cost_external, tower_cost_external=tower_cost_external,
+                          coeffs=coeffs))
+    return _broadcast(out)
+
+
+###### Derivatives
+#-------------------------------------------------------------------------------
+# continuous inputs of csm_model that csm_model_jacobian differentiates with respect to
+JACOBIAN_INPUTS = ('rotor_diameter', 'machine_rating', 'hub_height', 'rotor_torque')
+
+def csm_model_jacobian(rotor_diameter, machine_rating, hub_height, rotor_torque,
+                       turbine_class=1, blade_has_carbon=False, blade_number=3, bearing_number=2, crane=False,
+                       blade_cost_external=0., tower_cost_external=0., coeffs=None):
+    """
+    Masses and costs of nrel_csm_2015 with their exact first derivatives.
+
+    Returns (outputs, jacobian) where outputs is the result of csm_model and
+    jacobian[name][..., j] is the derivative of outputs[name] with respect to
+    JACOBIAN_INPUTS[j].
+    """
+
+    out = csm_model(rotor_diameter, machine_rating, hub_height, rotor_torque,
+                    turbine_class=turbine_class, blade_has_carbon=blade_has_carbon,
+                    blade_number=blade_number, bearing_number=bearing_number, crane=crane,
+                    blade_cost_external=blade_cost_external, tower_cost_external=tower_cost_external,
+                    coeffs=coeffs)
+
+    c = default_coeffs(coeffs)
+    D, P, H, Q = [np.asarray(x, dtype=float)[..., None]
+                  for x in (rotor_diameter, machine_rating, hub_height, rotor_torque)]
+    eD, eP, eH, eQ = np.eye(4)
+    v = lambda name: np.asarray(out[name])[..., None]
+    multiplier = lambda system: system_cost(1., c[system + '_assemblyCostMultiplier'], c[system + '_overheadCostMultiplier'],
+                                            c[system + '_profitMultiplier'], c[system + '_transportMultiplier'])
+    J = OrderedDict()
+
+    # mass model
+    exp = np.asarray(blade_mass_exp(turbine_class, blade_has_carbon, c['blade_user_exp']))[..., None]
+    J['blade_mass'] = c['blade_mass_coeff'] * exp / 2. * (D / 2)**(exp - 1) * eD
+    J['hub_mass'] = c['hub_mass_coeff'] * J['blade_mass']
+    J['pitch_system_mass'] = c['pitch_bearing_mass_coeff'] * blade_number * (1 + c['bearing_housing_percent']) * J['blade_mass']
+    J['spinner_mass'] = c['spinner_mass_coeff'] * eD
+    u = v('blade_mass') * P / 1000.
+    J['lss_mass'] = c['lss_mass_coeff'] * c['lss_mass_exp'] * u**(c['lss_mass_exp'] - 1) * \
+                    (J['blade_mass'] * P + v('blade_mass') * eP) / 1000.
+    J['main_bearing_mass'] = c['bearing_mass_coeff'] * c['bearing_mass_exp'] * D**(c['bearing_mass_exp'] - 1) * eD
+    J['gearbox_mass'] = c['gearbox_mass_coeff'] * c['gearbox_mass_exp'] / 1000. * (Q / 1000.)**(c['gearbox_mass_exp'] - 1) * eQ
+    J['hss_mass'] = c['hss_mass_coeff'] * eP
+    J['generator_mass'] = c['generator_mass_coeff'] / 1000. * eP
+    J['bedplate_mass'] = c['bedplate_mass_exp'] * D**(c['bedplate_mass_exp'] - 1) * eD
+    J['yaw_mass'] = 1.5 * c['yaw_mass_coeff'] * c['yaw_mass_exp'] * D**(c['yaw_mass_exp'] - 1) * eD
+    J['hvac_mass'] = c['hvac_mass_coeff'] * eP
+    J['cover_mass'] = c['cover_mass_coeff'] * eP
+    J['other_mass'] = c['platforms_mass_coeff'] * J['bedplate_mass']
+    J['transformer_mass'] = c['transformer_mass_coeff'] / 1000. * eP
+    J['tower_mass'] = c['tower_mass_coeff'] * c['tower_mass_exp'] * H**(c['tower_mass_exp'] - 1) * eH
+
+    # rotor costs
+    J['blade_cost'] = c['blade_mass_cost_coeff'] * J['blade_mass'] * np.asarray(blade_cost_external < 1.)[..., None]
+    J['hub_cost'] = c['hub_mass_cost_coeff'] * J['hub_mass']
+    J['pitch_system_cost'] = c['pitch_system_mass_cost_coeff'] * J['pitch_system_mass']
+    J['spinner_cost'] = c['spinner_mass_cost_coeff'] * J['spinner_mass']
+    J['hub_system_mass'] = J['hub_mass'] + J['pitch_system_mass'] + J['spinner_mass']
+    J['hub_system_cost'] = multiplier('hub') * (J['hub_cost'] + J['pitch_system_cost'] + J['spinner_cost'])
+    J['rotor_cost'] = J['blade_cost'] * blade_number + J['hub_system_cost']
+    J['rotor_mass_tcc'] = J['blade_mass'] * blade_number + J['hub_system_mass']
+    J['rotor_mass'] = J['rotor_mass_tcc']
+
+    # nacelle costs
+    J['lss_cost'] = c['lss_mass_cost_coeff'] * J['lss_mass']
+    J['main_bearing_cost'] = c['bearings_mass_cost_coeff'] * bearing_number * J['main_bearing_mass']
+    J['gearbox_cost'] = c['gearbox_mass_cost_coeff'] * J['gearbox_mass']
+    J['hss_cost'] = c['hss_mass_cost_coeff'] * J['hss_mass']
+    J['generator_cost'] = c['generator_mass_cost_coeff'] * J['generator_mass']
+    J['bedplate_cost'] = c['bedplate_mass_cost_coeff'] * J['bedplate_mass']
+    J['yaw_system_cost'] = c['yaw_mass_cost_coeff'] * J['yaw_mass']
+    J['hvac_cost'] = c['hvac_mass_cost_coeff'] * J['hvac_mass']
+    J['controls_cost'] = c['controls_machine_rating_cost_coeff'] * eP
+    J['vs_cost'] = 0. * eP
+    J['elec_cost'] = c['elec_connec_machine_rating_cost_coeff'] * eP
+    J['cover_cost'] = c['cover_mass_cost_coeff'] * J['cover_mass']
+    J['other_cost'] = c['platforms_mass_cost_coeff'] * J['other_mass']
+    J['transformer_cost'] = c['transformer_mass_cost_coeff'] * J['transformer_mass']
+    J['nacelle_cost'] = multiplier('nacelle') * \
+                        (J['lss_cost'] + bearing_number * J['main_bearing_cost'] + J['gearbox_cost'] + J['hss_cost'] +
+                         J['generator_cost'] + J['bedplate_cost'] + J['yaw_system_cost'] + J['vs_cost'] +
+                         J['hvac_cost'] + J['cover_cost'] + J['elec_cost'] + J['controls_cost'] + J['other_cost'] +
+                         J['transformer_cost'])
+    J['nacelle_mass'] = J['lss_mass'] + bearing_number * J['main_bearing_mass'] + J['gearbox_mass'] + J['hss_mass'] + \
+                        J['generator_mass'] + J['bedplate_mass'] + J['yaw_mass'] + J['hvac_mass'] + \
+                        J['cover_mass'] + J['transformer_mass']
+
+    # tower and turbine costs
+    J['tower_parts_cost'] = c['tower_mass_cost_coeff'] * J['tower_mass'] * np.asarray(tower_cost_external < 1.)[..., None]
+    J['tower_cost'] = multiplier('tower') * J['tower_parts_cost']
+    J['turbine_mass'] = J['rotor_mass_tcc'] + J['nacelle_mass'] + J['tower_mass']
+    J['turbine_cost'] = multiplier('turbine') * (J['rotor_cost'] + J['nacelle_cost'] + J['tower_cost'])
+    J['turbine_cost_kW'] = J['turbine_cost'] / P - v('turbine_cost') / P**2 * eP
+
+    jac = OrderedDict()
+    for k in out:
+        jac[k] = np.array(np.broadcast_to(J[k], np.shape(out[k]) + (len(JACOBIAN_INPUTS),)))
+
+    return out, jac
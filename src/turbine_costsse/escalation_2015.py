@@ -0,0 +1,139 @@
+"""
+escalation_2015.py
+
+Escalation of 2015 turbine costs to other years with price indices.
+
+The component costs of Turbine_CostsSE_2015 are in 2015 USD.  Each
+component is scaled by its price index over a year axis and the subsystem
+and turbine costs are assembled again from the escalated components, so a
+batch of designs gives (designs x years) cost arrays in one pass.
+
+Copyright (c) NREL. All rights reserved.
+"""
+
+from collections import OrderedDict
+
+import numpy as np
+
+from turbine_costsse.equations_2015 import default_coeffs, system_cost
+
+BASE_YEAR = 2015
+
+SUBSYSTEMS = ('rotor', 'nacelle', 'tower')
+
+# component costs of Turbine_CostsSE_2015 and the subsystem they belong to
+COMPONENT_COSTS = OrderedDict([
+    ('blade_cost',          'rotor'),
+    ('hub_cost',            'rotor'),
+    ('pitch_system_cost',   'rotor'),
+    ('spinner_cost',        'rotor'),
+    ('lss_cost',            'nacelle'),
+    ('main_bearing_cost',   'nacelle'),
+    ('gearbox_cost',        'nacelle'),
+    ('hss_cost',            'nacelle'),
+    ('generator_cost',      'nacelle'),
+    ('bedplate_cost',       'nacelle'),
+    ('yaw_system_cost',     'nacelle'),
+    ('vs_cost',             'nacelle'),
+    ('hvac_cost',           'nacelle'),
+    ('cover_cost',          'nacelle'),
+    ('elec_cost',           'nacelle'),
+    ('controls_cost',       'nacelle'),
+    ('other_cost',          'nacelle'),
+    ('transformer_cost',    'nacelle'),
+    ('tower_parts_cost',    'tower'),
+])
+
+
+def annual_index(years, rate, base_year=BASE_YEAR):
+    """Price index of a constant annual escalation rate, 1 in the base year."""
+
+    return (1. + np.asarray(rate, dtype=float)) ** (np.asarray(years, dtype=float) - base_year)
+
+
+def escalate_costs(costs, indices, blade_number=3, main_bearing_number=2, machine_rating=None, coeffs=None):
+    """
+    Escalate component costs over a year axis.
+
+    `costs` maps the names in COMPONENT_COSTS to 2015 USD costs, scalars or
+    arrays of any shape (outputs of Turbine_CostsSE_2015 or
+    equations_2015.cost_model); missing components cost nothing.  `indices`
+    maps a component name, a subsystem name ('rotor', 'nacelle', 'tower') or
+    'default' to a 1D array of price indices over the years, relative to
+    2015; the most specific entry applies and components without one keep
+    their 2015 cost.  `coeffs` overrides the cost multipliers as in
+    cost_model.  The counts, machine_rating and the multipliers may be
+    arrays of the shape of the costs.
+
+    Returns the escalated component costs and hub_system_cost, rotor_cost,
+    nacelle_cost, tower_cost and turbine_cost (plus turbine_cost_kW when
+    machine_rating is given), each with the shape of the costs plus a
+    trailing year axis.
+    """
+
+    for k in indices:
+        if k not in COMPONENT_COSTS and k not in SUBSYSTEMS and k != 'default':
+            raise KeyError("'%s' is not a component, subsystem or 'default'" % k)
+    n_years = max([np.size(v) for v in indices.values()] or [1])
+    # per-design counts and multipliers broadcast against the year axis like the costs
+    c = dict((k, np.expand_dims(v, -1) if np.ndim(v) else v) for k, v in default_coeffs(coeffs).items())
+    blade_number = np.expand_dims(blade_number, -1)
+    main_bearing_number = np.expand_dims(main_bearing_number, -1)
+
+    out = OrderedDict()
+    for k, subsystem in COMPONENT_COSTS.items():
+        index = indices.get(k, indices.get(subsystem, indices.get('default', np.ones(n_years))))
+        if np.ndim(index) != 1 or np.shape(index)[0] != n_years:
+            raise ValueError('price index of %s must be a 1D array of %d years' % (k, n_years))
+        out[k] = np.expand_dims(costs.get(k, 0.0), -1) * index
+
+    out['hub_system_cost'] = system_cost(out['hub_cost'] + out['pitch_system_cost'] + out['spinner_cost'],
+                                         c['hub_assemblyCostMultiplier'], c['hub_overheadCostMultiplier'],
+                                         c['hub_profitMultiplier'], c['hub_transportMultiplier'])
+    out['rotor_cost'] = out['blade_cost'] * blade_number + out['hub_system_cost']
+
+    # same parts sum as the nacelle adder, including its second bearing number factor
+    partsCost = out['lss_cost'] + main_bearing_number * out['main_bearing_cost'] + out['gearbox_cost'] + \
+                out['hss_cost'] + out['generator_cost'] + out['bedplate_cost'] + out['yaw_system_cost'] + \
+                out['vs_cost'] + out['hvac_cost'] + out['cover_cost'] + out['elec_cost'] + \
+                out['controls_cost'] + out['other_cost'] + out['transformer_cost']
+    out['nacelle_cost'] = system_cost(partsCost,
+                                      c['nacelle_assemblyCostMultiplier'], c['nacelle_overheadCostMultiplier'],
+                                      c['nacelle_profitMultiplier'], c['nacelle_transportMultiplier'])
+
+    out['tower_cost'] = system_cost(out['tower_parts_cost'],
+                                    c['tower_assemblyCostMultiplier'], c['tower_overheadCostMultiplier'],
+                                    c['tower_profitMultiplier'], c['tower_transportMultiplier'])
+
+    out['turbine_cost'] = system_cost(out['rotor_cost'] + out['nacelle_cost'] + out['tower_cost'],
+                                      c['turbine_assemblyCostMultiplier'], c['turbine_overheadCostMultiplier'],
+                                      c['turbine_profitMultiplier'], c['turbine_transportMultiplier'])
+    if machine_rating is not None:
+        out['turbine_cost_kW'] = out['turbine_cost'] / np.expand_dims(machine_rating, -1)
+
+    return out
+
+#-------------------------------------------------------------------------------
+def example():
+
+    from turbine_costsse.equations_2015 import csm_model, rotor_torque
+
+    # 1000 designs escalated over 2015-2050
+    D = np.linspace(80., 200., 1000)
+    P = np.full_like(D, 5000.)
+    costs = csm_model(D, P, 90., rotor_torque(P, D), crane=True)
+
+    years = np.arange(2015, 2051)
+    indices = {'default': annual_index(years, 0.025),
+               'tower':   annual_index(years, 0.035),
+               'blade_cost': annual_index(years, 0.015)}
+    out = escalate_costs(costs, indices, machine_rating=P)
+
+    print('turbine_cost shape %s' % (out['turbine_cost'].shape,))
+    print('126 m rotor: %.0f USD in 2015, %.0f USD in 2050'
+          % tuple(np.interp(126., D, out['turbine_cost'][:, j]) for j in (0, -1)))
+
+
+if __name__ == "__main__":
+
+    example()
@@ -0,0 +1,151 @@
+"""
+export_2015.py
+
+Export of cost and mass breakdowns to Apache Arrow and Parquet.
+
+Results of the sweep and fleet tools (mappings of output arrays or
+structured arrays) are converted to Arrow record batches directly from the
+NumPy buffers and written to Parquet one chunk at a time, so that a
+generator such as sweep_2015.iter_sweep never has to hold the full table.
+pyarrow is optional: without it, write_table falls back to a directory of
+.npy part files holding one structured array per chunk, which read_table
+loads back with memory mapping.
+
+Copyright (c) NREL. All rights reserved.
+"""
+
+import glob
+import os
+from collections import OrderedDict
+
+import numpy as np
+
+from turbine_costsse.sweep_2015 import as_records
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:
+    pa = pq = None
+
+
+def _require_pyarrow():
+
+    if pa is None:
+        raise ImportError('pyarrow is required for Arrow and Parquet output, use format="npy" without it')
+
+
+def to_columns(results, columns=None):
+    """
+    Contiguous 1D column arrays of `results`.
+
+    `results` is a mapping of output arrays or a structured array; arrays
+    of any shape are flattened.  Contiguous arrays are returned without a
+    copy; fields of a structured array are copied once.
+    """
+
+    names = results.dtype.names if isinstance(results, np.ndarray) else list(results)
+    if names is None:
+        raise ValueError('results must be a mapping of arrays or a structured array')
+    if columns is not None:
+        unknown = [k for k in columns if k not in names]
+        if unknown:
+            raise KeyError('unknown column(s): %s' % ', '.join(unknown))
+        names = columns
+    return OrderedDict((k, np.ascontiguousarray(results[k]).reshape(-1)) for k in names)
+
+
+def to_record_batch(results, columns=None):
+    """Arrow RecordBatch of `results` that shares the memory of contiguous columns."""
+
+    _require_pyarrow()
+    cols = to_columns(results, columns)
+    return pa.RecordBatch.from_arrays([pa.array(v) for v in cols.values()], names=list(cols))
+
+
+def write_table(path, chunks, columns=None, format=None, compression='snappy'):
+    """
+    Write results to `path` chunk by chunk and return the number of rows.
+
+    `chunks` is one result (mapping of arrays or structured array) or an
+    iterable of them with the same columns.  With format='parquet' (the
+    default when pyarrow is installed) every chunk becomes a row group of a
+    Parquet file; with format='npy' `path` is a directory that receives one
+    .npy file per chunk.  An existing file or table at `path` is replaced.
+    """
+
+    if isinstance(chunks, (dict, np.ndarray)):
+        chunks = [chunks]
+    if format is None:
+        format = 'npy' if pa is None else 'parquet'
+    if format not in ('parquet', 'npy'):
+        raise ValueError("unknown format '%s', use 'parquet' or 'npy'" % format)
+
+    rows = 0
+    if format == 'parquet':
+        _require_pyarrow()
+        writer = None
+        try:
+            for chunk in chunks:
+                batch = to_record_batch(chunk, columns)
+                if writer is None:
+                    writer = pq.ParquetWriter(path, batch.schema, compression=compression)
+                writer.write_table(pa.Table.from_batches([batch]))
+                rows += batch.num_rows
+        finally:
+            if writer is not None:
+                writer.close()
+    else:
+        if not os.path.isdir(path):
+            os.makedirs(path)
+        # a rewrite replaces the table, so parts of an earlier write must not be read back with it
+        for f in glob.glob(os.path.join(path, 'part-*.npy')):
+            os.remove(f)
+        for i, chunk in enumerate(chunks):
+            records = as_records(to_columns(chunk, columns))
+            np.save(os.path.join(path, 'part-%05d.npy' % i), records)
+            rows += len(records)
+
+    return rows
+
+
+def read_table(path, columns=None):
+    """Read a table written by write_table into an OrderedDict of column arrays."""
+
+    if os.path.isdir(path):
+        parts = [np.load(f, mmap_mode='r') for f in sorted(glob.glob(os.path.join(path, 'part-*.npy')))]
+        if not parts:
+            return OrderedDict()
+        names = columns if columns is not None else parts[0].dtype.names
+        return OrderedDict((k, np.concatenate([p[k] for p in parts])) for k in names)
+
+    _require_pyarrow()
+    table = pq.read_table(path, columns=columns)
+    return OrderedDict((k, table.column(k).to_numpy()) for k in table.column_names)
+
+#-------------------------------------------------------------------------------
+def example():
+
+    import tempfile
+    import time
+
+    from turbine_costsse.sweep_2015 import iter_sweep
+
+    D = np.linspace(60., 200., 141)
+    P = np.linspace(1000., 10000., 91)
+    H = np.linspace(60., 150., 46)
+
+    path = os.path.join(tempfile.mkdtemp(), 'csm_sweep.parquet' if pa is not None else 'csm_sweep')
+    start = time.time()
+    rows = write_table(path, iter_sweep(D, P, H, crane=True, chunk_size=100000))
+    print('%d rows written to %s in %.2f s' % (rows, path, time.time() - start))
+
+    start = time.time()
+    table = read_table(path, columns=['rotor_diameter', 'turbine_cost'])
+    print('turbine_cost column read back in %.3f s, cheapest design %.0f USD'
+          % (time.time() - start, table['turbine_cost'].min()))
+
+
+if __name__ == "__main__":
+
+    example()
@@ -0,0 +1,329 @@
+"""
+fleet_2015.py
+
+Cost roll-up of a fleet of turbines with Turbine_CostsSE_2015.
+
+Each turbine of the fleet is a record (a dict) holding the inputs of
+Turbine_CostsSE_2015 and any other fields, such as project, site or
+vintage, to group the results by.  Turbines with identical inputs are
+costed once and the results are expanded back onto the fleet.
+
+FleetAggregate keeps the group totals of a large fleet up to date when a
+fleet-wide coefficient or multiplier changes.  The parts costs of the hub,
+blades, nacelle and tower are linear in the mass-cost coefficients, so
+their group sums are stored per coefficient: a coefficient change updates
+them in O(groups) and the multipliers are applied to the sums, without
+evaluating the model again.
+
+Copyright (c) NREL. All rights reserved.
+"""
+
+from collections import OrderedDict
+
+import numpy as np
+
+from turbine_costsse.dual import Dual, jacobian
+from turbine_costsse.equations_2015 import COST_COEFFS_2015, MULTIPLIERS_2015, cost_model, system_cost
+from turbine_costsse.scenarios_2015 import PARTS, parts_costs
+
+MASS_INPUTS = ('blade_mass', 'hub_mass', 'pitch_system_mass', 'spinner_mass', 'lss_mass', 'main_bearing_mass',
+               'gearbox_mass', 'hss_mass', 'generator_mass', 'bedplate_mass', 'yaw_mass', 'vs_electronics_mass',
+               'vs_mass', 'hvac_mass', 'cover_mass', 'platforms_mass', 'transformer_mass', 'tower_mass')
+
+# inputs of Turbine_CostsSE_2015 with the defaults of its components
+DESIGN_INPUTS = OrderedDict([(k, 0.0) for k in MASS_INPUTS] + [
+    ('machine_rating',      0.0),
+    ('blade_number',        3.0),
+    ('main_bearing_number', 2.0),
+    ('crane',               0.0),
+    ('blade_cost_external', 0.0),
+    ('tower_cost_external', 0.0),
+] + list(COST_COEFFS_2015.items()) + list(MULTIPLIERS_2015.items()))
+
+ROLLUP_OUTPUTS = ('rotor_cost', 'nacelle_cost', 'tower_cost', 'turbine_cost')
+
+
+# numeric switches of the components and their allowed values
+SWITCHES = OrderedDict([
+    ('blade_number',        lambda v: v >= 1 and v == int(v)),
+    ('main_bearing_number', lambda v: v >= 1 and v == int(v)),
+    ('crane',               lambda v: v in (0., 1.)),
+])
+
+
+def _design(record):
+    # full set of inputs of one record, in DESIGN_INPUTS order; all are floats as in the components
+    design = OrderedDict()
+    for k, default in DESIGN_INPUTS.items():
+        v = record.get(k, default)
+        if isinstance(v, str):
+            raise ValueError('%s must be a number, got %r' % (k, v))
+        design[k] = float(v)
+        if k in SWITCHES and not SWITCHES[k](design[k]):
+            raise ValueError('%s must be %s, got %r' % (k, 'a positive whole number' if k != 'crane' else
+                                                        'True, False, 1 or 0', v))
+    return design
+
+
+def _evaluate_openmdao(designs, outputs):
+
+    from openmdao.api import Problem
+    from turbine_costsse.turbine_costsse_2015 import Turbine_CostsSE_2015
+
+    prob = Problem(Turbine_CostsSE_2015())
+    prob.setup(check=False)
+
+    values = np.zeros((len(designs), len(outputs)))
+    for i, design in enumerate(designs):
+        for k, v in design.items():
+            prob[k] = v
+        prob.run()
+        values[i] = [prob[k] for k in outputs]
+    return values
+
+
+def _evaluate_equations(designs, outputs):
+
+    # all designs in one batch, flags and discrete options included
+    cols = dict((k, np.array([d[k] for d in designs])) for k in DESIGN_INPUTS)
+    coeff_names = list(COST_COEFFS_2015) + list(MULTIPLIERS_2015)
+    out = cost_model(cols, cols['machine_rating'], blade_number=cols['blade_number'],
+                     main_bearing_number=cols['main_bearing_number'], crane=cols['crane'],
+                     blade_cost_external=cols['blade_cost_external'], tower_cost_external=cols['tower_cost_external'],
+                     coeffs=dict((k, cols[k]) for k in coeff_names))
+    return np.stack([np.broadcast_to(out[k], (len(designs),)) for k in outputs], axis=-1)
+
+
+class FleetCosts(object):
+    """
+    Results of fleet_costs.
+
+    `designs` lists the distinct inputs found in the fleet and
+    `design_outputs[name]` the corresponding outputs; `design_index[i]` is the
+    design of record i.  `groups` maps each group key, a tuple of the
+    `group_by` field values, to the number of turbines and the total of every
+    output over the group.
+    """
+
+    def __init__(self, designs, design_index, outputs, values, group_by, group_index, group_keys):
+
+        self.designs = designs
+        self.design_index = design_index
+        self.outputs = tuple(outputs)
+        self.design_outputs = OrderedDict((k, values[:, j]) for j, k in enumerate(outputs))
+        self.group_by = tuple(group_by)
+
+        counts = np.bincount(group_index, minlength=len(group_keys))
+        totals = np.zeros((len(group_keys), len(outputs)))
+        np.add.at(totals, group_index, values[design_index])
+        self.groups = OrderedDict()
+        for g, key in enumerate(group_keys):
+            self.groups[key] = OrderedDict([('n_turbines', int(counts[g]))] +
+                                           [(k, totals[g, j]) for j, k in enumerate(outputs)])
+
+    @property
+    def n_designs(self):
+        """Number of distinct designs that were costed."""
+
+        return len(self.designs)
+
+    def turbine_outputs(self):
+        """Outputs of every record of the fleet, in record order."""
+
+        return OrderedDict((k, v[self.design_index]) for k, v in self.design_outputs.items())
+
+    def totals(self):
+        """Totals over the whole fleet."""
+
+        out = OrderedDict([('n_turbines', len(self.design_index))])
+        for k, v in self.design_outputs.items():
+            out[k] = v[self.design_index].sum()
+        return out
+
+
+def fleet_costs(records, group_by=(), outputs=ROLLUP_OUTPUTS, use_openmdao=True):
+    """
+    Cost a fleet of turbines and roll the results up by group.
+
+    `records` is a sequence of dicts, one per turbine, holding inputs of
+    Turbine_CostsSE_2015 (masses, machine_rating, blade_number, crane,
+    coefficients, multipliers, ...); missing inputs take the component
+    defaults and fields that are not inputs are only used for grouping.
+    `group_by` names the fields whose values define the groups.  Each distinct
+    design is run once through Turbine_CostsSE_2015, or through
+    equations_2015.cost_model with use_openmdao=False.
+    """
+
+    index = OrderedDict()
+    design_index = np.zeros(len(records), dtype=int)
+    groups = OrderedDict()
+    group_index = np.zeros(len(records), dtype=int)
+    for i, record in enumerate(records):
+        design = _design(record)
+        design_index[i] = index.setdefault(tuple(design.items()), len(index))
+        group_index[i] = groups.setdefault(tuple(record.get(g) for g in group_by), len(groups))
+
+    designs = [OrderedDict(key) for key in index]
+    evaluate = _evaluate_openmdao if use_openmdao else _evaluate_equations
+    values = evaluate(designs, outputs)
+
+    return FleetCosts(designs, design_index, outputs, values, group_by, group_index, list(groups))
+
+
+class FleetAggregate(object):
+    """
+    Group totals of a fleet that follow changes of the fleet-wide coefficients.
+
+    `masses` maps the mass inputs of Turbine_CostsSE_2015 to arrays over N
+    designs; `machine_rating` and the design options are scalars or arrays
+    over the designs.  `counts` gives the number of turbines of each design
+    (default 1) and `group_index` the group of each design (default: a
+    single group).  `coeffs` sets the initial mass-cost coefficients and
+    multipliers.  The designs are costed once, in chunks of chunk_size, and
+    only the group sums are kept.
+    """
+
+    def __init__(self, masses, machine_rating, counts=None, group_index=None, blade_number=3, main_bearing_number=2,
+                 crane=False, blade_cost_external=0., tower_cost_external=0., coeffs=None, chunk_size=65536):
+
+        options = OrderedDict([('machine_rating', machine_rating), ('blade_number', blade_number),
+                               ('main_bearing_number', main_bearing_number), ('crane', crane),
+                               ('blade_cost_external', blade_cost_external),
+                               ('tower_cost_external', tower_cost_external),
+                               ('counts', 1. if counts is None else counts),
+                               ('group_index', 0 if group_index is None else group_index)])
+        n = int(np.prod(np.broadcast_shapes(*[np.shape(v) for v in list(masses.values()) + list(options.values())])))
+        masses = OrderedDict((k, np.broadcast_to(v, (n,))) for k, v in masses.items())
+        options = OrderedDict((k, np.broadcast_to(v, (n,))) for k, v in options.items())
+        group_index = options.pop('group_index').astype(int)
+        counts = options.pop('counts')
+        self.n_groups = int(group_index.max()) + 1 if n else 0
+
+        self.coeffs = OrderedDict(list(COST_COEFFS_2015.items()) + list(MULTIPLIERS_2015.items()))
+        self._check(coeffs or {})
+        self.coeffs.update(coeffs or {})
+        self._column = OrderedDict((k, j) for j, k in enumerate(COST_COEFFS_2015))
+
+        group_sum = lambda g, w: np.bincount(g, weights=w, minlength=self.n_groups)
+        self.n_turbines = group_sum(group_index, counts)
+        self.machine_rating = group_sum(group_index, counts * options['machine_rating'])
+
+        # summed parts costs per group: basis (groups, parts, coefficients) and offset (groups, parts)
+        self._basis = np.zeros((self.n_groups, len(PARTS), len(self._column)))
+        offset = np.zeros((self.n_groups, len(PARTS)))
+        for start in range(0, n, chunk_size):
+            chunk = slice(start, min(start + chunk_size, n))
+            m = OrderedDict((k, v[chunk]) for k, v in masses.items())
+            o = OrderedDict((k, v[chunk]) for k, v in options.items())
+
+            def parts(**c):
+                costs = cost_model(m, coeffs=c, **o)
+                return parts_costs(costs, o['blade_number'], o['main_bearing_number'])
+
+            # the parts costs are linear in the coefficients: values at zero and exact derivatives
+            values, derivs = jacobian(parts, OrderedDict((k, 0.) for k in self._column))
+            g, w = group_index[chunk], counts[chunk]
+            for i, k in enumerate(PARTS):
+                offset[:, i] += group_sum(g, w * values[k])
+                for j in range(len(self._column)):
+                    self._basis[:, i, j] += group_sum(g, w * derivs[k][:, j])
+
+        self._parts = np.dot(self._basis, [self.coeffs[k] for k in self._column]) + offset
+
+    def _check(self, names):
+
+        unknown = set(names) - set(self.coeffs)
+        if unknown:
+            raise KeyError('unknown coefficient(s) or multiplier(s): %s' % ', '.join(sorted(unknown)))
+
+    def update(self, **coeffs):
+        """
+        Change mass-cost coefficients or multipliers of the whole fleet.
+
+        A coefficient change adds its column of summed masses times the
+        change to the group parts costs, O(groups); a multiplier change only
+        replaces the stored value, which applies to the parts sums.
+        """
+
+        self._check(coeffs)
+        for k, v in coeffs.items():
+            if k in self._column:
+                self._parts = self._parts + self._basis[:, :, self._column[k]] * (v - self.coeffs[k])
+            self.coeffs[k] = v
+
+    def _rollup(self, **coeffs):
+
+        # the parts sums at `coeffs`, expanded about the stored ones so dual-number coefficients pass through
+        c = coeffs
+        parts = self._parts
+        for k, j in self._column.items():
+            if isinstance(c[k], Dual) or not np.array_equal(c[k], self.coeffs[k]):
+                parts = parts + self._basis[:, :, j] * (c[k] - self.coeffs[k])
+        p = dict((k, parts[:, i]) for i, k in enumerate(PARTS))
+        multipliers = lambda system: (c[system + '_assemblyCostMultiplier'], c[system + '_overheadCostMultiplier'],
+                                      c[system + '_profitMultiplier'], c[system + '_transportMultiplier'])
+
+        out = OrderedDict()
+        out['rotor_cost'] = p['blades_cost'] + system_cost(p['hub_parts_cost'], *multipliers('hub'))
+        out['nacelle_cost'] = system_cost(p['nacelle_parts_cost'], *multipliers('nacelle'))
+        out['tower_cost'] = system_cost(p['tower_parts_cost'], *multipliers('tower'))
+        out['turbine_cost'] = system_cost(out['rotor_cost'] + out['nacelle_cost'] + out['tower_cost'],
+                                          *multipliers('turbine'))
+        out['turbine_cost_kW'] = out['turbine_cost'] / self.machine_rating
+        return out
+
+    def totals(self):
+        """
+        Rotor, nacelle, tower and turbine cost of every group (arrays over
+        the groups), with the number of turbines, the installed rating and
+        the capacity-weighted turbine_cost_kW.
+        """
+
+        out = OrderedDict([('n_turbines', self.n_turbines), ('machine_rating', self.machine_rating)])
+        out.update(self._rollup(**self.coeffs))
+        return out
+
+    def sensitivities(self, names):
+        """
+        Derivatives of the group totals with respect to coefficients or
+        multipliers `names`, by the chain rule through the adder stages;
+        each output has a trailing axis over `names`.
+        """
+
+        self._check(names)
+        return jacobian(self._rollup, self.coeffs, wrt=list(names))[1]
+
+#-------------------------------------------------------------------------------
+def example():
+
+    import time
+
+    turbine = {'blade_mass': 17650.67, 'hub_mass': 31644.5, 'pitch_system_mass': 17004.0, 'spinner_mass': 1810.5,
+               'lss_mass': 31257.3, 'main_bearing_mass': 9731.41 / 2, 'gearbox_mass': 30237.60,
+               'hss_mass': 1492.45, 'generator_mass': 16699.85, 'bedplate_mass': 93090.6, 'yaw_mass': 11878.24,
+               'tower_mass': 434559.0, 'vs_electronics_mass': 1000., 'hvac_mass': 1000., 'cover_mass': 1000.,
+               'platforms_mass': 1000., 'transformer_mass': 1000., 'machine_rating': 5000.0, 'crane': True}
+
+    # two projects: 150 identical turbines, and 30 turbines with taller towers built over two years
+    records = [dict(turbine, project='A', vintage=2016) for i in range(150)]
+    records += [dict(turbine, tower_mass=500e3, project='B', vintage=2017 + i % 2) for i in range(30)]
+
+    fleet = fleet_costs(records, group_by=('project', 'vintage'))
+    print('%d turbines, %d distinct designs costed' % (len(records), fleet.n_designs))
+    for key, totals in fleet.groups.items():
+        print('  %s: %d turbines, turbine cost %.0f USD' % (key, totals['n_turbines'], totals['turbine_cost']))
+
+    # a fleet of a million turbines of 10000 designs in 5 regions, re-priced after a gearbox quote
+    rng = np.random.RandomState(0)
+    masses = dict((k, turbine[k] * rng.uniform(0.8, 1.2, 10000)) for k in MASS_INPUTS if k in turbine)
+    aggregate = FleetAggregate(masses, 5000., counts=100, group_index=rng.randint(0, 5, 10000), crane=True)
+    start = time.time()
+    aggregate.update(gearbox_mass_cost_coeff=14.0, nacelle_profitMultiplier=0.1)
+    totals = aggregate.totals()
+    print('%d turbines updated in %.2e s, fleet turbine cost %.4g USD'
+          % (totals['n_turbines'].sum(), time.time() - start, totals['turbine_cost'].sum()))
+
+
+if __name__ == "__main__":
+
+    example()
@@ -10,6 +10,7 @@ import numpy as np
 from openmdao.api import Component, Problem, Group, IndepVarComp
 
 from turbine_costsse.turbine_costsse_2015 import Turbine_CostsSE_2015
+from turbine_costsse import equations_2015 as eq
 
 # --------------------------------------------------------------------
 class BladeMass(Component):
@@ -21,8 +22,8 @@ class BladeMass(Component):
         self.add_param('rotor_diameter', 0.0, desc= 'rotor diameter of the machine')
         self.add_param('turbine_class', 1, desc='turbine class')
         self.add_param('blade_has_carbon', False, desc= 'does the blade have carbon?') #default to doesn't have carbon
-        self.add_param('blade_mass_coeff', 0.5, desc= 'A in the blade mass equation: A*(rotor_diameter/B)^exp') #default from ppt
-        self.add_param('blade_user_exp', 2.5, desc='optional user-entered exp for the blade mass equation')
+        self.add_param('blade_mass_coeff', eq.MASS_COEFFS_2015['blade_mass_coeff'], desc= 'A in the blade mass equation: A*(rotor_diameter/B)^exp') #default from ppt
+        self.add_param('blade_user_exp', eq.MASS_COEFFS_2015['blade_user_exp'], desc='optional user-entered exp for the blade mass equation')
         
         # Outputs
         self.add_output('blade_mass', 0.0, desc= 'component mass [kg]')
@@ -35,23 +36,8 @@ class BladeMass(Component):
         blade_mass_coeff = params['blade_mass_coeff']
         blade_user_exp = params['blade_user_exp']
     
-        # select the exp for the blade mass equation
-        exp = 0.0
-        if turbine_class == 1:
-            if blade_has_carbon:
-              exp = 2.47
-            else:
-              exp = 2.54
-        elif turbine_class > 1:
-            if blade_has_carbon:
-              exp = 2.44
-            else:
-              exp = 2.50
-        else:
-            exp = blade_user_exp
-        
         # calculate the blade mass
-        unknowns['blade_mass'] = blade_mass_coeff * (rotor_diameter / 2)**exp
+        unknowns['blade_mass'] = eq.blade_mass(rotor_diameter, turbine_class, blade_has_carbon, blade_mass_coeff, blade_user_exp)
 
   # --------------------------------------------------------------------
 class HubMass(Component):
@@ -61,8 +47,8 @@ class HubMass(Component):
         
         # Variables
         self.add_param('blade_mass', 0.0, desc= 'component mass [kg]')
-        self.add_param('hub_mass_coeff', 2.3, desc= 'A in the hub mass equation: A*blade_mass + B') #default from ppt
-        self.add_param('hub_mass_intercept', 1320., desc= 'B in the hub mass equation: A*blade_mass + B') #default from ppt
+        self.add_param('hub_mass_coeff', eq.MASS_COEFFS_2015['hub_mass_coeff'], desc= 'A in the hub mass equation: A*blade_mass + B') #default from ppt
+        self.add_param('hub_mass_intercept', eq.MASS_COEFFS_2015['hub_mass_intercept'], desc= 'B in the hub mass equation: A*blade_mass + B') #default from ppt
         
         # Outputs
         self.add_output('hub_mass', 0.0, desc='component mass [kg]')
@@ -74,7 +60,7 @@ class HubMass(Component):
         hub_mass_intercept = params['hub_mass_intercept']
         
         # calculate the hub mass
-        unknowns['hub_mass'] = hub_mass_coeff * blade_mass + hub_mass_intercept
+        unknowns['hub_mass'] = eq.hub_mass(blade_mass, hub_mass_coeff, hub_mass_intercept)
 
 # --------------------------------------------------------------------
 class PitchSystemMass(Component):
@@ -83,11 +69,11 @@ class PitchSystemMass(Component):
         super(PitchSystemMass, self).__init__()
         
         self.add_param('blade_mass', 0.0, desc= 'component mass [kg]')
-        self.add_param('blade_number', 3, desc='number of rotor blades')
-        self.add_param('pitch_bearing_mass_coeff', 0.1295, desc='A in the pitch bearing mass equation: A*blade_mass*blade_number + B') #default from old CSM
-        self.add_param('pitch_bearing_mass_intercept', 491.31, desc='B in the pitch bearing mass equation: A*blade_mass*blade_number + B') #default from old CSM
-        self.add_param('bearing_housing_percent', .3280, desc='bearing housing percentage (in decimal form: ex 10% is 0.10)') #default from old CSM
-        self.add_param('mass_sys_offset', 555.0, desc='mass system offset') #default from old CSM
+        self.add_param('blade_number', 3.0, desc='number of rotor blades')
+        self.add_param('pitch_bearing_mass_coeff', eq.MASS_COEFFS_2015['pitch_bearing_mass_coeff'], desc='A in the pitch bearing mass equation: A*blade_mass*blade_number + B') #default from old CSM
+        self.add_param('pitch_bearing_mass_intercept', eq.MASS_COEFFS_2015['pitch_bearing_mass_intercept'], desc='B in the pitch bearing mass equation: A*blade_mass*blade_number + B') #default from old CSM
+        self.add_param('bearing_housing_percent', eq.MASS_COEFFS_2015['bearing_housing_percent'], desc='bearing housing percentage (in decimal form: ex 10% is 0.10)') #default from old CSM
+        self.add_param('mass_sys_offset', eq.MASS_COEFFS_2015['mass_sys_offset'], desc='mass system offset') #default from old CSM
         
         # Outputs
         self.add_output('pitch_system_mass', 0.0, desc='component mass [kg]')
@@ -102,8 +88,8 @@ class PitchSystemMass(Component):
         mass_sys_offset = params['mass_sys_offset']
         
         # calculate the hub mass
-        pitchBearingMass = pitch_bearing_mass_coeff * blade_mass * blade_number + pitch_bearing_mass_intercept
-        unknowns['pitch_system_mass'] = pitchBearingMass * (1 + bearing_housing_percent) + mass_sys_offset
+        unknowns['pitch_system_mass'] = eq.pitch_system_mass(blade_mass, blade_number, pitch_bearing_mass_coeff, pitch_bearing_mass_intercept,
+                                                             bearing_housing_percent, mass_sys_offset)
 
 # --------------------------------------------------------------------
 class SpinnerMass(Component):
@@ -114,8 +100,8 @@ class SpinnerMass(Component):
     
         # Variables
         self.add_param('rotor_diameter', 0.0, desc= 'rotor diameter of the machine')
-        self.add_param('spinner_mass_coeff', 15.5, desc= 'A in the spinner mass equation: A*rotor_diameter + B')
-        self.add_param('spinner_mass_intercept', -980.0, desc= 'B in the spinner mass equation: A*rotor_diameter + B')
+        self.add_param('spinner_mass_coeff', eq.MASS_COEFFS_2015['spinner_mass_coeff'], desc= 'A in the spinner mass equation: A*rotor_diameter + B')
+        self.add_param('spinner_mass_intercept', eq.MASS_COEFFS_2015['spinner_mass_intercept'], desc= 'B in the spinner mass equation: A*rotor_diameter + B')
         
         # Outputs
         self.add_output('spinner_mass', 0.0, desc='component mass [kg]')
@@ -127,7 +113,7 @@ class SpinnerMass(Component):
         spinner_mass_intercept = params['spinner_mass_intercept']
         
         # calculate the spinner mass
-        unknowns['spinner_mass'] = spinner_mass_coeff * rotor_diameter + spinner_mass_intercept
+        unknowns['spinner_mass'] = eq.spinner_mass(rotor_diameter, spinner_mass_coeff, spinner_mass_intercept)
 
 # --------------------------------------------------------------------
 class LowSpeedShaftMass(Component):
@@ -139,9 +125,9 @@ class LowSpeedShaftMass(Component):
         # Variables
         self.add_param('blade_mass', 0.0, desc='mass for a single wind turbine blade')
         self.add_param('machine_rating', 0.0, desc='machine rating')
-        self.add_param('lss_mass_coeff', 13., desc='A in the lss mass equation: A*(blade_mass*rated_power)^exp + B')
-        self.add_param('lss_mass_exp', 0.65, desc='exp in the lss mass equation: A*(blade_mass*rated_power)^exp + B')
-        self.add_param('lss_mass_intercept', 775., desc='B in the lss mass equation: A*(blade_mass*rated_power)^exp + B')
+        self.add_param('lss_mass_coeff', eq.MASS_COEFFS_2015['lss_mass_coeff'], desc='A in the lss mass equation: A*(blade_mass*rated_power)^exp + B')
+        self.add_param('lss_mass_exp', eq.MASS_COEFFS_2015['lss_mass_exp'], desc='exp in the lss mass equation: A*(blade_mass*rated_power)^exp + B')
+        self.add_param('lss_mass_intercept', eq.MASS_COEFFS_2015['lss_mass_intercept'], desc='B in the lss mass equation: A*(blade_mass*rated_power)^exp + B')
         
         # Outputs
         self.add_output('lss_mass', 0.0, desc='component mass [kg]')
@@ -155,7 +141,7 @@ class LowSpeedShaftMass(Component):
         lss_mass_intercept = params['lss_mass_intercept']
     
         # calculate the lss mass
-        unknowns['lss_mass'] = lss_mass_coeff * (blade_mass * machine_rating/1000.)**lss_mass_exp + lss_mass_intercept
+        unknowns['lss_mass'] = eq.lss_mass(blade_mass, machine_rating, lss_mass_coeff, lss_mass_exp, lss_mass_intercept)
 
 # --------------------------------------------------------------------
 class BearingMass(Component):
@@ -166,8 +152,8 @@ class BearingMass(Component):
 
         # Variables
         self.add_param('rotor_diameter', 0.0, desc= 'rotor diameter of the machine')
-        self.add_param('bearing_mass_coeff', 0.0001, desc= 'A in the bearing mass equation: A*rotor_diameter^exp') #default from ppt
-        self.add_param('bearing_mass_exp', 3.5, desc= 'exp in the bearing mass equation: A*rotor_diameter^exp') #default from ppt
+        self.add_param('bearing_mass_coeff', eq.MASS_COEFFS_2015['bearing_mass_coeff'], desc= 'A in the bearing mass equation: A*rotor_diameter^exp') #default from ppt
+        self.add_param('bearing_mass_exp', eq.MASS_COEFFS_2015['bearing_mass_exp'], desc= 'exp in the bearing mass equation: A*rotor_diameter^exp') #default from ppt
         
         # Outputs
         self.add_output('main_bearing_mass', 0.0, desc='component mass [kg]')
@@ -179,7 +165,48 @@ class BearingMass(Component):
         bearing_mass_exp = params['bearing_mass_exp']
         
         # calculates the mass of a SINGLE bearing
-        unknowns['main_bearing_mass'] = bearing_mass_coeff * rotor_diameter ** bearing_mass_exp
+        unknowns['main_bearing_mass'] = eq.main_bearing_mass(rotor_diameter, bearing_mass_coeff, bearing_mass_exp)
+
+# --------------------------------------------------------------------
+class DrivetrainLoads(Component):
+    """
+    Rated rotor speed and rotor torque from the machine rating, rotor
+    diameter, maximum tip speed and drivetrain efficiency, for one design or
+    for n_designs designs at once.  The torque feeds GearboxMass.
+    """
+
+    def __init__(self, n_designs=None):
+
+        super(DrivetrainLoads, self).__init__()
+
+        value = lambda v: v if n_designs is None else np.full(n_designs, v)
+        self.n_designs = n_designs
+
+        # Variables
+        self.add_param('machine_rating', value(0.0), desc='machine rating [kW]')
+        self.add_param('rotor_diameter', value(0.0), desc='rotor diameter of the machine')
+        self.add_param('max_tip_speed', value(80.0), desc='maximum tip speed [m/s]')
+        self.add_param('max_efficiency', value(0.90), desc='drivetrain efficiency at rated power')
+
+        # Outputs
+        self.add_output('rotor_speed', value(0.0), desc='rotor speed at rated power [rpm]')
+        self.add_output('rotor_torque', value(0.0), desc='torque from rotor at rated power')
+
+    def solve_nonlinear(self, params, unknowns, resids):
+
+        loads = eq.drivetrain_loads(params['machine_rating'], params['rotor_diameter'],
+                                    params['max_tip_speed'], params['max_efficiency'])
+        unknowns['rotor_speed'] = loads['rotor_speed']
+        unknowns['rotor_torque'] = loads['rotor_torque']
+
+    def linearize(self, params, unknowns, resids):
+
+        J = eq.drivetrain_partials(params['machine_rating'], params['rotor_diameter'],
+                                   params['max_tip_speed'], params['max_efficiency'])
+        # each design only depends on its own inputs
+        if self.n_designs is not None:
+            J = dict((key, np.diag(np.broadcast_to(d, (self.n_designs,)))) for key, d in J.items())
+        return J
 
 # --------------------------------------------------------------------
 class GearboxMass(Component):
@@ -190,8 +217,8 @@ class GearboxMass(Component):
   
         # Variables
         self.add_param('rotor_torque', 0.0, desc = 'torque from rotor at rated power') #JMF do we want this default?
-        self.add_param('gearbox_mass_coeff', 113., desc= 'A in the gearbox mass equation: A*rotor_torque^exp')
-        self.add_param('gearbox_mass_exp', 0.71, desc= 'exp in the gearbox mass equation: A*rotor_torque^exp')
+        self.add_param('gearbox_mass_coeff', eq.MASS_COEFFS_2015['gearbox_mass_coeff'], desc= 'A in the gearbox mass equation: A*rotor_torque^exp')
+        self.add_param('gearbox_mass_exp', eq.MASS_COEFFS_2015['gearbox_mass_exp'], desc= 'exp in the gearbox mass equation: A*rotor_torque^exp')
         
         # Outputs
         self.add_output('gearbox_mass', 0.0, desc='component mass [kg]')
@@ -203,7 +230,7 @@ class GearboxMass(Component):
         gearbox_mass_exp = params['gearbox_mass_exp']
         
         # calculate the gearbox mass
-        unknowns['gearbox_mass'] = gearbox_mass_coeff * (rotor_torque/1000.0)**gearbox_mass_exp
+        unknowns['gearbox_mass'] = eq.gearbox_mass(rotor_torque, gearbox_mass_coeff, gearbox_mass_exp)
 
 # --------------------------------------------------------------------
 class HighSpeedSideMass(Component):
@@ -214,7 +241,7 @@ class HighSpeedSideMass(Component):
 
         # Variables
         self.add_param('machine_rating', 0.0, desc='machine rating')
-        self.add_param('hss_mass_coeff', 0.19894, desc= 'NREL CSM hss equation; removing intercept since it is negligible')
+        self.add_param('hss_mass_coeff', eq.MASS_COEFFS_2015['hss_mass_coeff'], desc= 'NREL CSM hss equation; removing intercept since it is negligible')
         
         # Outputs
         self.add_output('hss_mass', 0.0, desc='component mass [kg]')
@@ -225,7 +252,7 @@ class HighSpeedSideMass(Component):
         hss_mass_coeff = params['hss_mass_coeff']
         
         # TODO: this is in DriveSE; replace this with code in DriveSE and have DriveSE use this code??
-        unknowns['hss_mass'] = hss_mass_coeff * machine_rating
+        unknowns['hss_mass'] = eq.hss_mass(machine_rating, hss_mass_coeff)
 
 # --------------------------------------------------------------------
 class GeneratorMass(Component):
@@ -237,8 +264,8 @@ class GeneratorMass(Component):
   
         # Variables
         self.add_param('machine_rating', 0.0, desc='machine rating')
-        self.add_param('generator_mass_coeff', 2300., desc= 'A in the generator mass equation: A*rated_power + B') #default from ppt
-        self.add_param('generator_mass_intercept', 3400., desc= 'B in the generator mass equation: A*rated_power + B') #default from ppt
+        self.add_param('generator_mass_coeff', eq.MASS_COEFFS_2015['generator_mass_coeff'], desc= 'A in the generator mass equation: A*rated_power + B') #default from ppt
+        self.add_param('generator_mass_intercept', eq.MASS_COEFFS_2015['generator_mass_intercept'], desc= 'B in the generator mass equation: A*rated_power + B') #default from ppt
         
         # Outputs
         self.add_output('generator_mass', 0.0, desc='component mass [kg]')
@@ -250,7 +277,7 @@ class GeneratorMass(Component):
         generator_mass_intercept = params['generator_mass_intercept']
     
         # calculate the generator mass
-        unknowns['generator_mass'] = generator_mass_coeff * machine_rating/1000. + generator_mass_intercept
+        unknowns['generator_mass'] = eq.generator_mass(machine_rating, generator_mass_coeff, generator_mass_intercept)
 
 # --------------------------------------------------------------------
 class BedplateMass(Component):
@@ -261,7 +288,7 @@ class BedplateMass(Component):
 
         # Variables
         self.add_param('rotor_diameter', 0.0, desc= 'rotor diameter of the machine')
-        self.add_param('bedplate_mass_exp', 2.2, desc= 'exp in the bedplate mass equation: rotor_diameter^exp')
+        self.add_param('bedplate_mass_exp', eq.MASS_COEFFS_2015['bedplate_mass_exp'], desc= 'exp in the bedplate mass equation: rotor_diameter^exp')
         
         # Outputs
         self.add_output('bedplate_mass', 0.0, desc='component mass [kg]')
@@ -272,7 +299,7 @@ class BedplateMass(Component):
         bedplate_mass_exp = params['bedplate_mass_exp']
         
         # calculate the bedplate mass
-        unknowns['bedplate_mass'] = rotor_diameter**bedplate_mass_exp
+        unknowns['bedplate_mass'] = eq.bedplate_mass(rotor_diameter, bedplate_mass_exp)
 
 # --------------------------------------------------------------------
 class YawSystemMass(Component):
@@ -283,8 +310,8 @@ class YawSystemMass(Component):
 
         # Variables
         self.add_param('rotor_diameter', 0.0, desc= 'rotor diameter of the machine')
-        self.add_param('yaw_mass_coeff', 0.0009, desc= 'A in the yaw mass equation: A*rotor_diameter^exp') #NREL CSM
-        self.add_param('yaw_mass_exp', 3.314, desc= 'exp in the yaw mass equation: A*rotor_diameter^exp') #NREL CSM
+        self.add_param('yaw_mass_coeff', eq.MASS_COEFFS_2015['yaw_mass_coeff'], desc= 'A in the yaw mass equation: A*rotor_diameter^exp') #NREL CSM
+        self.add_param('yaw_mass_exp', eq.MASS_COEFFS_2015['yaw_mass_exp'], desc= 'exp in the yaw mass equation: A*rotor_diameter^exp') #NREL CSM
         
         # Outputs
         self.add_output('yaw_mass', 0.0, desc='component mass [kg]')
@@ -296,7 +323,7 @@ class YawSystemMass(Component):
         yaw_mass_exp = params['yaw_mass_exp']
     
         # calculate yaw system mass #TODO - 50% adder for non-bearing mass
-        unknowns['yaw_mass'] = 1.5 * (yaw_mass_coeff * rotor_diameter ** yaw_mass_exp) #JMF do we really want to expose all these?
+        unknowns['yaw_mass'] = eq.yaw_mass(rotor_diameter, yaw_mass_coeff, yaw_mass_exp) #JMF do we really want to expose all these?
 
 #TODO: no variable speed mass; ignore for now
 
@@ -309,7 +336,7 @@ class HydraulicCoolingMass(Component):
         
         # Variables
         self.add_param('machine_rating', 0.0, desc='machine rating')
-        self.add_param('hvac_mass_coeff', 0.08, desc= 'hvac linear coeff') #NREL CSM
+        self.add_param('hvac_mass_coeff', eq.MASS_COEFFS_2015['hvac_mass_coeff'], desc= 'hvac linear coeff') #NREL CSM
         
         # Outputs
         self.add_output('hvac_mass', 0.0, desc='component mass [kg]')
@@ -320,7 +347,7 @@ class HydraulicCoolingMass(Component):
         hvac_mass_coeff = params['hvac_mass_coeff']
         
         # calculate hvac system mass
-        unknowns['hvac_mass'] = hvac_mass_coeff * machine_rating
+        unknowns['hvac_mass'] = eq.hvac_mass(machine_rating, hvac_mass_coeff)
 
 # --------------------------------------------------------------------
 class NacelleCoverMass(Component):
@@ -331,8 +358,8 @@ class NacelleCoverMass(Component):
     
         # Variables
         self.add_param('machine_rating', 0.0, desc='machine rating')
-        self.add_param('cover_mass_coeff', 1.2817, desc= 'A in the spinner mass equation: A*rotor_diameter + B')
-        self.add_param('cover_mass_intercept', 428.19, desc= 'B in the spinner mass equation: A*rotor_diameter + B')
+        self.add_param('cover_mass_coeff', eq.MASS_COEFFS_2015['cover_mass_coeff'], desc= 'A in the spinner mass equation: A*rotor_diameter + B')
+        self.add_param('cover_mass_intercept', eq.MASS_COEFFS_2015['cover_mass_intercept'], desc= 'B in the spinner mass equation: A*rotor_diameter + B')
         
         # Outputs
         self.add_output('cover_mass', 0.0, desc='component mass [kg]')
@@ -344,7 +371,7 @@ class NacelleCoverMass(Component):
         cover_mass_intercept = params['cover_mass_intercept']
         
         # calculate nacelle cover mass
-        unknowns['cover_mass'] = cover_mass_coeff * machine_rating + cover_mass_intercept
+        unknowns['cover_mass'] = eq.cover_mass(machine_rating, cover_mass_coeff, cover_mass_intercept)
 
 # TODO: ignoring controls and electronics mass for now
 
@@ -358,9 +385,9 @@ class OtherMainframeMass(Component):
         
         # Variables
         self.add_param('bedplate_mass', 0.0, desc='component mass [kg]')
-        self.add_param('platforms_mass_coeff', 0.125, desc='nacelle platforms mass coeff as a function of bedplate mass [kg/kg]') #default from old CSM
-        self.add_param('crane', False, desc='flag for presence of onboard crane')
-        self.add_param('crane_weight', 3000., desc='weight of onboard crane')
+        self.add_param('platforms_mass_coeff', eq.MASS_COEFFS_2015['platforms_mass_coeff'], desc='nacelle platforms mass coeff as a function of bedplate mass [kg/kg]') #default from old CSM
+        self.add_param('crane', 0.0, desc='flag for presence of onboard crane, 1 with and 0 without crane')
+        self.add_param('crane_weight', eq.MASS_COEFFS_2015['crane_weight'], desc='weight of onboard crane')
         #TODO: there is no base hardware mass model in the old model. Cost is not dependent on mass.
         
         # Outputs
@@ -373,16 +400,8 @@ class OtherMainframeMass(Component):
         crane = params['crane']
         crane_weight = params['crane_weight']
         
-        # calculate nacelle cover mass           
-        platforms_mass = platforms_mass_coeff * bedplate_mass
-
-        # --- crane ---        
-        if (crane):
-            crane_mass =  crane_weight
-        else:
-            crane_mass = 0.  
-        
-        unknowns['other_mass'] = platforms_mass + crane_mass
+        # calculate nacelle platforms and crane mass
+        unknowns['other_mass'] = eq.other_mass(bedplate_mass, platforms_mass_coeff, crane, crane_weight)
 
 # --------------------------------------------------------------------
 class TransformerMass(Component):
@@ -393,8 +412,8 @@ class TransformerMass(Component):
     
         # Variables
         self.add_param('machine_rating', 0.0, desc='machine rating')
-        self.add_param('transformer_mass_coeff', 1915., desc= 'A in the transformer mass equation: A*rated_power + B') #default from ppt
-        self.add_param('transformer_mass_intercept', 1910., desc= 'B in the transformer mass equation: A*rated_power + B') #default from ppt
+        self.add_param('transformer_mass_coeff', eq.MASS_COEFFS_2015['transformer_mass_coeff'], desc= 'A in the transformer mass equation: A*rated_power + B') #default from ppt
+        self.add_param('transformer_mass_intercept', eq.MASS_COEFFS_2015['transformer_mass_intercept'], desc= 'B in the transformer mass equation: A*rated_power + B') #default from ppt
         
         # Outputs
         self.add_output('transformer_mass', 0.0, desc='component mass [kg]')
@@ -406,7 +425,7 @@ class TransformerMass(Component):
         transformer_mass_intercept = params['transformer_mass_intercept']
         
         # calculate the transformer mass
-        unknowns['transformer_mass'] = transformer_mass_coeff * machine_rating/1000. + transformer_mass_intercept
+        unknowns['transformer_mass'] = eq.transformer_mass(machine_rating, transformer_mass_coeff, transformer_mass_intercept)
 
 # --------------------------------------------------------------------
 class TowerMass(Component):
@@ -417,8 +436,8 @@ class TowerMass(Component):
 
         # Variables
         self.add_param('hub_height', 0.0, desc= 'hub height of wind turbine above ground / sea level')
-        self.add_param('tower_mass_coeff', 19.828, desc= 'A in the tower mass equation: A*hub_height^B') #default from ppt
-        self.add_param('tower_mass_exp', 2.0282, desc= 'B in the tower mass equation: A*hub_height^B') #default from ppt
+        self.add_param('tower_mass_coeff', eq.MASS_COEFFS_2015['tower_mass_coeff'], desc= 'A in the tower mass equation: A*hub_height^B') #default from ppt
+        self.add_param('tower_mass_exp', eq.MASS_COEFFS_2015['tower_mass_exp'], desc= 'B in the tower mass equation: A*hub_height^B') #default from ppt
         
         # Outputs
         self.add_output('tower_mass', 0.0, desc='component mass [kg]')
@@ -430,7 +449,7 @@ class TowerMass(Component):
         tower_mass_exp = params['tower_mass_exp']
         
         # calculate the tower mass
-        unknowns['tower_mass'] = tower_mass_coeff * hub_height ** tower_mass_exp
+        unknowns['tower_mass'] = eq.tower_mass(hub_height, tower_mass_coeff, tower_mass_exp)
  
 
 # Turbine mass adder
@@ -462,8 +481,8 @@ class turbine_mass_adder(Component):
         self.add_param('tower_mass', 0.0, desc='component mass [kg]')
     
         # Parameters
-        self.add_param('blade_number', 3, desc = 'number of rotor blades')
-        self.add_param('bearing_number', 2, desc = 'number of main bearings')
+        self.add_param('blade_number', 3.0, desc = 'number of rotor blades')
+        self.add_param('bearing_number', 2.0, desc = 'number of main bearings')
     
         # Outputs
         self.add_output('hub_system_mass', 0.0, desc='hub system mass')
@@ -501,14 +520,40 @@ class turbine_mass_adder(Component):
                             cover_mass + other_mass + transformer_mass
         unknowns['turbine_mass'] = unknowns['rotor_mass'] + unknowns['nacelle_mass'] + tower_mass
 
+    def linearize(self, params, unknowns, resids):
+
+        # unit entries except for the blade and bearing counts
+        J = {}
+        for name in ('hub_mass', 'pitch_system_mass', 'spinner_mass'):
+            J['hub_system_mass', name] = 1.
+            J['rotor_mass', name] = 1.
+            J['turbine_mass', name] = 1.
+        J['rotor_mass', 'blade_mass'] = params['blade_number']
+        J['turbine_mass', 'blade_mass'] = params['blade_number']
+        for name in ('lss_mass', 'main_bearing_mass', 'gearbox_mass', 'hss_mass', 'generator_mass', 'bedplate_mass', 'yaw_mass',
+                     'hvac_mass', 'cover_mass', 'other_mass', 'transformer_mass'):
+            d = params['bearing_number'] if name == 'main_bearing_mass' else 1.
+            J['nacelle_mass', name] = d
+            J['turbine_mass', name] = d
+        J['turbine_mass', 'tower_mass'] = 1.
+        # the counts are numeric switches
+        J['rotor_mass', 'blade_number'] = params['blade_mass']
+        J['turbine_mass', 'blade_number'] = params['blade_mass']
+        J['nacelle_mass', 'bearing_number'] = params['main_bearing_mass']
+        J['turbine_mass', 'bearing_number'] = params['main_bearing_mass']
+        return J
+
 # --------------------------------------------------------------------
 
 class nrel_csm_mass_2015(Group):
     
-    def __init__(self):
+    def __init__(self, drivetrain=False):
       
         super(nrel_csm_mass_2015, self).__init__()
 
+        # with drivetrain=True the rotor torque follows from max_tip_speed and max_efficiency
+        if drivetrain:
+            self.add('drivetrain', DrivetrainLoads(), promotes=['*'])
         self.add('blade',BladeMass(), promotes=['*'])
         self.add('hub',HubMass(), promotes=['*'])
         self.add('pitch',PitchSystemMass(), promotes=['*'])
@@ -528,26 +573,42 @@ class nrel_csm_mass_2015(Group):
         self.add('turbine',turbine_mass_adder(), promotes=['*'])
        
 
+mass_promotes = ['rotor_diameter', 'turbine_class', 'blade_has_carbon', 'blade_number', 'machine_rating',
+                 'hub_height', 'rotor_torque', 'bearing_number', 'crane', 'crane_weight',
+                 'blade_user_exp', 'bearing_housing_percent', 'mass_sys_offset',
+                 '*_mass_coeff', '*_mass_exp', '*_mass_intercept',
+                 'blade_mass', 'hub_mass', 'pitch_system_mass', 'spinner_mass', 'lss_mass', 'main_bearing_mass',
+                 'gearbox_mass', 'hss_mass', 'generator_mass', 'bedplate_mass', 'yaw_mass', 'hvac_mass',
+                 'cover_mass', 'other_mass', 'transformer_mass', 'tower_mass', 'rotor_mass']
+
+drivetrain_promotes = ['max_tip_speed', 'max_efficiency', 'rotor_speed']
+
 class nrel_csm_2015(Group):
-	  
-	  def __init__(self):
-	  	  
-	  	  super(nrel_csm_2015, self).__init__()
-	  	  
-	  	  self.add('desvars', IndepVarComp([('rotor_diameter', 0.0),
-			    																 ('machine_rating', 0.0),							    																 
-			    																 ]),promotes=['*'])
-	  	  
-	  	  self.add('nrel_csm_mass', nrel_csm_mass_2015(), promotes=['*'])
-	  	  self.add('turbine_costs', Turbine_CostsSE_2015(), promotes=['*'])
-	  	  
+
+    def __init__(self, drivetrain=False):
+
+        super(nrel_csm_2015, self).__init__()
+
+        self.add('desvars', IndepVarComp([('rotor_diameter', 0.0),
+                                          ('machine_rating', 0.0),
+                                          ]),promotes=['*'])
+
+        # the hub system, nacelle and turbine masses are also computed by the cost model,
+        # so only the component masses and the mass model inputs are promoted here
+        # rotor_torque is an input, or with drivetrain=True computed by DrivetrainLoads from max_tip_speed and max_efficiency
+        self.add('nrel_csm_mass', nrel_csm_mass_2015(drivetrain),
+                 promotes=mass_promotes + (drivetrain_promotes if drivetrain else []))
+        self.add('turbine_costs', Turbine_CostsSE_2015(), promotes=['*'])
+
+        # nacelle platforms (including the crane) are sized by the mass model
+        self.connect('other_mass', 'platforms_mass')
 
 #-----------------------------------------------------------------
 
 def mass_example():
 
     # simple test of module
-    trb = nrel_csm_mass_2015()
+    trb = nrel_csm_mass_2015(drivetrain=True)
     prob = Problem(trb)
     prob.setup()
 
@@ -561,12 +622,8 @@ def mass_example():
     prob['crane'] = True
 
     # Rotor force calculations for nacelle inputs
-    maxTipSpd = 80.0
-    maxEfficiency = 0.90
-
-    ratedHubPower  = prob['machine_rating']*1000. / maxEfficiency 
-    rotorSpeed     = (maxTipSpd/(0.5*prob['rotor_diameter'])) * (60.0 / (2*np.pi))
-    prob['rotor_torque'] = ratedHubPower/(rotorSpeed*(np.pi/30))
+    prob['max_tip_speed'] = 80.0
+    prob['max_efficiency'] = 0.90
 
     prob.run()
    
@@ -578,7 +635,7 @@ def mass_example():
 def cost_example():
 
     # simple test of module
-    trb = nrel_csm_2015()
+    trb = nrel_csm_2015(drivetrain=True)
     prob = Problem(trb)
     prob.setup()
 
@@ -593,12 +650,8 @@ def cost_example():
     prob['crane'] = True
 
     # Rotor force calculations for nacelle inputs
-    maxTipSpd = 80.0
-    maxEfficiency = 0.90
-
-    ratedHubPower  = prob['machine_rating']*1000. / maxEfficiency 
-    rotorSpeed     = (maxTipSpd/(0.5*prob['rotor_diameter'])) * (60.0 / (2*np.pi))
-    prob['rotor_torque'] = ratedHubPower/(rotorSpeed*(np.pi/30))
+    prob['max_tip_speed'] = 80.0
+    prob['max_efficiency'] = 0.90
 
     prob.run()
 
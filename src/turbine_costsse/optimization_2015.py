@@ -0,0 +1,194 @@
+"""
+optimization_2015.py
+
+Gradient-based sizing of a turbine with the 2015 NREL Cost and Scaling Model.
+
+The objective and constraint gradients come from the analytic derivatives in
+equations_2015.csm_model_jacobian, so no finite differencing of the model is
+needed.
+
+Copyright (c) NREL. All rights reserved.
+"""
+
+import time
+from collections import OrderedDict
+
+import numpy as np
+from scipy.optimize import minimize
+
+from turbine_costsse.equations_2015 import csm_model, csm_model_jacobian, rotor_torque
+
+DESIGN_VARS = ('rotor_diameter', 'machine_rating', 'hub_height')
+
+DEFAULT_BOUNDS = OrderedDict([
+    ('rotor_diameter', (60., 200.)),
+    ('machine_rating', (1000., 10000.)),
+    ('hub_height',     (60., 150.)),
+])
+
+
+class _Model(object):
+    """Caches the model evaluation at the last design point."""
+
+    def __init__(self, max_tip_speed, max_efficiency, exact_gradient, model_kwargs):
+
+        self.max_tip_speed = max_tip_speed
+        self.max_efficiency = max_efficiency
+        self.exact_gradient = exact_gradient
+        self.model_kwargs = model_kwargs
+        self.reset()
+
+    def outputs(self, x):
+
+        self._update(x)
+        return self._out
+
+    def jacobian(self, x):
+
+        self._update(x)
+        if not self._jac_used:
+            self.njev += 1
+            self._jac_used = True
+        return self._jac
+
+    def reset(self):
+
+        self.nfev = self.njev = 0
+        self._x = None
+
+    def _update(self, x):
+
+        if self._x is not None and np.array_equal(x, self._x):
+            return
+        D, P, H = x
+        # torque is proportional to both rating and diameter
+        Q = rotor_torque(P, D, self.max_tip_speed, self.max_efficiency)
+        dQ_dD, dQ_dP = Q/D, Q/P
+        if self.exact_gradient:
+            out, J = csm_model_jacobian(D, P, H, Q, **self.model_kwargs)
+
+            # chain rule through the rotor torque
+            jac = OrderedDict()
+            for k, Jk in J.items():
+                jac[k] = np.array([Jk[0] + Jk[3]*dQ_dD, Jk[1] + Jk[3]*dQ_dP, Jk[2]])
+        else:
+            out, jac = csm_model(D, P, H, Q, **self.model_kwargs), None
+
+        self._x = np.array(x, dtype=float)
+        self._out, self._jac = out, jac
+        self._jac_used = False
+        self.nfev += 1
+
+
+def optimize_turbine_cost(x0, objective='turbine_cost_kW', design_vars=DESIGN_VARS, bounds=None, constraints=(),
+                          max_tip_speed=80., max_efficiency=0.90, exact_gradient=True, method='SLSQP',
+                          options=None, **model_kwargs):
+    """
+    Minimize a cost objective of nrel_csm_2015 over the turbine size.
+
+    x0 gives rotor_diameter, machine_rating and hub_height; the ones not listed
+    in `design_vars` stay fixed.  `objective` is an output name or a callable
+    objective(outputs, jacobian) -> (value, gradient), where jacobian[name] is
+    the gradient of an output with respect to DESIGN_VARS.  `constraints` is a
+    sequence of (output name, lower, upper) with None for an open side.  The
+    rotor torque follows from the rating and diameter via the maximum tip
+    speed and drivetrain efficiency.  Remaining keyword arguments (turbine
+    class, flags, coeffs, ...) are passed to csm_model.
+
+    With exact_gradient=False the optimizer falls back on finite differences
+    of the model for comparison (a callable objective then gets jacobian=None
+    and its gradient is ignored).  The returned scipy OptimizeResult has the
+    extra fields `design`, `outputs` and `wall_time`; `nfev` and `njev` count
+    model and Jacobian evaluations.
+    """
+
+    start = time.time()
+
+    if bounds is None:
+        bounds = {}
+    bounds = OrderedDict((k, bounds.get(k, DEFAULT_BOUNDS[k])) for k in DESIGN_VARS)
+    for k in design_vars:
+        if k not in DESIGN_VARS:
+            raise ValueError("'%s' is not a design variable, use one of %s" % (k, ', '.join(DESIGN_VARS)))
+    idx = [DESIGN_VARS.index(k) for k in design_vars]
+    x_start = np.array([x0[k] for k in DESIGN_VARS], dtype=float)
+    lower = np.array([bounds[k][0] for k in design_vars])
+    upper = np.array([bounds[k][1] for k in design_vars])
+    span = upper - lower
+
+    model = _Model(max_tip_speed, max_efficiency, exact_gradient, model_kwargs)
+
+    # design variables are scaled to [0, 1] over their bounds
+    def to_x(z):
+        x = x_start.copy()
+        x[idx] = lower + z*span
+        return x
+
+    def value(name, z):
+        x = to_x(z)
+        if callable(name):
+            return name(model.outputs(x), model.jacobian(x) if exact_gradient else None)[0]
+        return model.outputs(x)[name]
+
+    def grad(name, z):
+        x = to_x(z)
+        if callable(name):
+            g = name(model.outputs(x), model.jacobian(x))[1]
+        else:
+            g = model.jacobian(x)[name]
+        return np.asarray(g)[idx] * span
+
+    z0 = np.clip((x_start[idx] - lower) / span, 0., 1.)
+    f_scale = abs(value(objective, z0)) or 1.
+
+    if exact_gradient:
+        fun = lambda z: (value(objective, z) / f_scale, grad(objective, z) / f_scale)
+    else:
+        fun = lambda z: value(objective, z) / f_scale
+
+    cons = []
+    for name, lo, up in constraints:
+        for bound, sign in ((lo, 1.), (up, -1.)):
+            if bound is None:
+                continue
+            scale = abs(bound) or 1.
+            g = lambda z, name=name, bound=bound, sign=sign, scale=scale: \
+                sign * (value(name, z) - bound) / scale
+            dg = lambda z, name=name, sign=sign, scale=scale: \
+                sign * grad(name, z) / scale
+            cons.append({'type': 'ineq', 'fun': g, 'jac': dg if exact_gradient else None})
+
+    model.reset()
+    res = minimize(fun, z0, jac=exact_gradient, method=method, bounds=[(0., 1.)]*len(idx),
+                   constraints=cons, options=options)
+
+    res.nfev, res.njev = model.nfev, model.njev
+    x = to_x(res.x)
+    res.design = OrderedDict(zip(DESIGN_VARS, x))
+    res.outputs = model.outputs(x)
+    res.fun = value(objective, res.x)
+    res.wall_time = time.time() - start
+
+    return res
+
+#-------------------------------------------------------------------------------
+def example():
+
+    # cheapest turbine per kW with an upper limit on the nacelle mass
+    x0 = {'rotor_diameter': 126.0, 'machine_rating': 5000.0, 'hub_height': 90.0}
+    bounds = {'rotor_diameter': (100., 160.), 'machine_rating': (3000., 8000.), 'hub_height': (80., 120.)}
+    constraints = [('nacelle_mass', None, 150e3)]
+
+    for exact in (True, False):
+        res = optimize_turbine_cost(x0, bounds=bounds, constraints=constraints, crane=True, exact_gradient=exact)
+        print('%s gradients: %s' % ('Exact' if exact else 'Finite difference', res.message))
+        print('  iterations %d, function evaluations %d, gradient evaluations %d, wall time %.4f s'
+              % (res.nit, res.nfev, res.njev, res.wall_time))
+        for k, v in res.design.items():
+            print('  %s %.3f' % (k, v))
+        print('  turbine_cost_kW %.3f' % res.outputs['turbine_cost_kW'])
+
+
+if __name__ == "__main__":
+
+    example()
@@ -0,0 +1,198 @@
+"""
+pareto_2015.py
+
+Pareto fronts of large design sets of the 2015 NREL Cost and Scaling Model.
+
+A design is on the front if no other design is at least as good in every
+objective and better in one; all objectives are minimized.  The front of
+two objectives is found by sorting on the first and keeping the designs
+that improve the running minimum of the second, in O(N log N).  The front
+of three objectives is found by a bottom-up divide and conquer over the
+designs sorted on the first (Kung et al.): at every level the designs of
+each right-hand block are checked against the left-hand block for
+dominance in the other two, all blocks at once with one sort and running
+minimum.  Each of the log N levels is a sort, so three objectives take
+O(N log^2 N) in vectorized NumPy.  Of designs with equal objectives only
+the first is kept, and designs with a NaN objective are never on the front.
+
+ParetoFront streams over the chunks of sweep_2015.iter_sweep or any other
+sequence of results: each chunk is reduced to its own front and merged with
+the front so far, so only the front is held in memory.
+
+Copyright (c) NREL. All rights reserved.
+"""
+
+from collections import OrderedDict
+
+import numpy as np
+
+DEFAULT_OBJECTIVES = ('turbine_cost', 'turbine_mass')
+
+
+def _front_2d(x, y):
+
+    order = np.lexsort((y, x))
+    ys = y[order]
+    # a design is kept if its second objective is below that of every design sorted before it
+    best = np.minimum.accumulate(ys)
+    keep = np.empty(len(ys), dtype=bool)
+    keep[:1] = True
+    keep[1:] = ys[1:] < best[:-1]
+    return np.sort(order[keep])
+
+
+def _front_3d(x, y, z):
+
+    n = len(x)
+    order = np.lexsort((z, y, x))
+    # dense ranks, so that equal values compare equal
+    ry = np.unique(y, return_inverse=True)[1][order]
+    rz = np.unique(z, return_inverse=True)[1][order]
+    # a design is dropped if one sorted before it is at least as good in y and z; the blocks of
+    # 2*size designs are split in halves and the right half is checked against the left half
+    pos = np.arange(n)
+    big = n + 1
+    size = 1
+    while size < n:
+        block = pos // (2 * size)
+        right = (pos // size) % 2
+        # by block, then y, left before right on equal y
+        s = np.argsort((block * big + ry) * 2 + right)
+        # running minimum of z over the left designs of each block; the offset keeps blocks apart
+        offset = block[s] * big
+        best = np.minimum.accumulate(np.where(right[s] == 1, n, rz[s]) - offset)
+        dropped = s[(right[s] == 1) & (best + offset <= rz[s])]
+        if len(dropped):
+            keep = np.ones(len(pos), dtype=bool)
+            keep[dropped] = False
+            pos, ry, rz = pos[keep], ry[keep], rz[keep]
+        size *= 2
+    return np.sort(order[pos])
+
+
+def pareto_mask(objectives):
+    """
+    Boolean mask of the non-dominated rows of an (N, M) array of objectives.
+
+    M is 2 or 3 and all objectives are minimized.
+    """
+
+    objectives = np.asarray(objectives, dtype=np.float64)
+    if objectives.ndim != 2 or objectives.shape[1] not in (2, 3):
+        raise ValueError('objectives must be an (N, 2) or (N, 3) array, got shape %s' % (objectives.shape,))
+
+    valid = np.flatnonzero(~np.isnan(objectives).any(axis=1))
+    columns = [objectives[valid, j] for j in range(objectives.shape[1])]
+    front = _front_2d(*columns) if len(columns) == 2 else _front_3d(*columns)
+    mask = np.zeros(len(objectives), dtype=bool)
+    mask[valid[front]] = True
+    return mask
+
+
+def _objectives(results, objectives):
+
+    names = results.dtype.names if isinstance(results, np.ndarray) else list(results)
+    missing = [k for k in objectives if k not in (names or ())]
+    if missing:
+        raise KeyError('results have no objective(s): %s' % ', '.join(missing))
+    return np.stack([np.asarray(results[k], dtype=np.float64).reshape(-1) for k in objectives], axis=1)
+
+
+def _take(results, index):
+
+    if isinstance(results, np.ndarray):
+        return results.reshape(-1)[index]
+    return OrderedDict((k, np.asarray(v).reshape(-1)[index]) for k, v in results.items())
+
+
+def _concatenate(a, b):
+
+    if isinstance(a, np.ndarray):
+        return np.concatenate([a, b])
+    return OrderedDict((k, np.concatenate([a[k], b[k]])) for k in a)
+
+
+def pareto_front(results, objectives=DEFAULT_OBJECTIVES):
+    """
+    Non-dominated designs of `results`.
+
+    `results` is a mapping of equally shaped output arrays or a structured
+    array (the results of sweep_2015); arrays of any shape are flattened.
+    Returns the front in the same form as 1D arrays, in the order of the
+    designs, and the flat indices of its designs.
+    """
+
+    index = np.flatnonzero(pareto_mask(_objectives(results, objectives)))
+    return _take(results, index), index
+
+
+class ParetoFront(object):
+    """
+    Pareto front of a stream of result chunks.
+
+    update() takes one chunk (a mapping of output arrays or a structured
+    array, all chunks with the same columns) and merges its front with the
+    front so far.  `front` holds the rows of the non-dominated designs and
+    `index` their positions in the stream.
+    """
+
+    def __init__(self, objectives=DEFAULT_OBJECTIVES):
+
+        self.objectives = tuple(objectives)
+        self.front = None
+        self.index = np.zeros(0, dtype=int)
+        self.n_designs = 0
+
+    def __len__(self):
+        return len(self.index)
+
+    def update(self, chunk):
+        """Merge the front of `chunk` into the front; returns self."""
+
+        rows, index = pareto_front(chunk, self.objectives)
+        n = int(np.size(chunk[self.objectives[0]]))
+        index = index + self.n_designs
+        self.n_designs += n
+        if self.front is not None:
+            rows = _concatenate(self.front, rows)
+            index = np.concatenate([self.index, index])
+
+        # the earlier designs come first, so of equal designs the first of the stream is kept
+        keep = np.flatnonzero(pareto_mask(_objectives(rows, self.objectives)))
+        self.front = _take(rows, keep)
+        self.index = index[keep]
+        return self
+
+
+def stream_pareto(chunks, objectives=DEFAULT_OBJECTIVES):
+    """ParetoFront of all chunks of an iterable such as sweep_2015.iter_sweep."""
+
+    front = ParetoFront(objectives)
+    for chunk in chunks:
+        front.update(chunk)
+    return front
+
+#-------------------------------------------------------------------------------
+def example():
+
+    import time
+
+    from turbine_costsse.sweep_2015 import iter_sweep
+
+    # 1.2 million designs streamed in chunks: the smallest turbine has the lowest cost and mass, so the
+    # trade-offs are against the cost per kW
+    D = np.linspace(60., 200., 200)
+    P = np.linspace(1000., 10000., 200)
+    H = np.linspace(60., 150., 30)
+    outputs = ['turbine_cost', 'turbine_mass', 'turbine_cost_kW']
+
+    for objectives in (('turbine_cost_kW', 'turbine_mass'), ('turbine_cost', 'turbine_mass', 'turbine_cost_kW')):
+        start = time.time()
+        front = stream_pareto(iter_sweep(D, P, H, outputs=outputs, chunk_size=100000), objectives)
+        print('%d designs, %d on the front of %s, %.2f s'
+              % (front.n_designs, len(front), ', '.join(objectives), time.time() - start))
+
+
+if __name__ == "__main__":
+
+    example()
@@ -0,0 +1,140 @@
+"""
+pricing_2015.py
+
+Pricing matrices for instant re-pricing of fixed designs under new mass-cost coefficients.
+
+For fixed masses, machine ratings and multipliers every cost of
+Turbine_CostsSE_2015 is linear in the mass-cost coefficients of
+COST_COEFFS_2015: each component cost is a coefficient times a mass (or
+rating) and the adders multiply sums of them by constant factors.  A
+pricing matrix stores that linear map for N designs, cost = B @ c + offset,
+where B (N x K) holds the exact derivatives with respect to the K
+coefficients, computed in one dual-number pass, and the offset holds the
+parts that do not scale with a coefficient (external blade and tower
+costs).  Re-pricing all designs under a new coefficient vector, or under S
+vectors at once, is then a matrix product instead of N model runs.
+
+Copyright (c) NREL. All rights reserved.
+"""
+
+from collections import OrderedDict
+
+import numpy as np
+
+from turbine_costsse.equations_2015 import COST_COEFFS_2015, MULTIPLIERS_2015, cost_model
+from turbine_costsse.dual import jacobian
+
+PRICED_COEFFS = tuple(COST_COEFFS_2015)
+
+PRICED_OUTPUTS = ('rotor_cost', 'nacelle_cost', 'tower_cost', 'turbine_cost', 'turbine_cost_kW')
+
+
+class PricingMatrix(object):
+    """
+    Linear map from the mass-cost coefficients to the costs of a set of designs.
+
+    `basis[output]` has the design shape plus a trailing axis over `coeffs`
+    and `offset[output]` the design shape.
+    """
+
+    def __init__(self, basis, offset, coeffs=PRICED_COEFFS):
+
+        self.basis = basis
+        self.offset = offset
+        self.coeffs = tuple(coeffs)
+        self.outputs = tuple(basis)
+
+    @property
+    def n_designs(self):
+        """Number of designs priced by the matrix."""
+
+        return int(np.prod(np.shape(self.offset[self.outputs[0]])))
+
+    def vector(self, coeffs=None):
+        """
+        Coefficient vector (K,) of a mapping of coefficient values, or a
+        (K, S) matrix if the values are arrays of S alternatives.  Missing
+        coefficients take their COST_COEFFS_2015 defaults.
+        """
+
+        coeffs = dict(coeffs or {})
+        unknown = set(coeffs) - set(self.coeffs)
+        if unknown:
+            raise KeyError('not a priced coefficient: %s' % ', '.join(sorted(unknown)))
+        values = [np.asarray(coeffs.get(k, COST_COEFFS_2015[k]), dtype=float) for k in self.coeffs]
+        shape = np.broadcast_shapes(*[v.shape for v in values])
+        return np.stack([np.broadcast_to(v, shape) for v in values])
+
+    def __call__(self, coeffs=None, outputs=None):
+        """
+        Costs of all designs for coefficient values `coeffs`: a mapping as in
+        vector(), a vector of length K or a (K, S) matrix of S coefficient
+        vectors, which adds a trailing axis of S to every output.
+        """
+
+        c = coeffs if isinstance(coeffs, np.ndarray) else self.vector(coeffs)
+        if c.shape[0] != len(self.coeffs):
+            raise ValueError('expected %d coefficients, got %d' % (len(self.coeffs), c.shape[0]))
+
+        out = OrderedDict()
+        for k in (outputs or self.outputs):
+            offset = self.offset[k] if c.ndim == 1 else np.expand_dims(self.offset[k], -1)
+            out[k] = np.tensordot(self.basis[k], c, axes=([-1], [0])) + offset
+        return out
+
+
+def pricing_matrix(masses, machine_rating, blade_number=3, main_bearing_number=2, crane=False,
+                   blade_cost_external=0., tower_cost_external=0., multipliers=None, outputs=PRICED_OUTPUTS):
+    """
+    Pricing matrix of designs with fixed masses and multipliers.
+
+    The arguments are those of equations_2015.cost_model for a batch of
+    designs; `multipliers` overrides MULTIPLIERS_2015 and stays fixed, as
+    the costs are not linear in the multipliers (see scenarios_2015 for
+    multiplier scenarios).
+    """
+
+    multipliers = dict(multipliers or {})
+    unknown = set(multipliers) - set(MULTIPLIERS_2015)
+    if unknown:
+        raise KeyError('not a multiplier: %s' % ', '.join(sorted(unknown)))
+
+    def model(**c):
+        out = cost_model(masses, machine_rating, blade_number=blade_number, main_bearing_number=main_bearing_number,
+                         crane=crane, blade_cost_external=blade_cost_external,
+                         tower_cost_external=tower_cost_external, coeffs=dict(multipliers, **c))
+        return OrderedDict((k, out[k]) for k in outputs)
+
+    # the derivatives are constant, so any coefficient values give the basis; at zero the values are the offset
+    offset, basis = jacobian(model, OrderedDict((k, 0.) for k in PRICED_COEFFS))
+    return PricingMatrix(basis, offset)
+
+#-------------------------------------------------------------------------------
+def example():
+
+    import time
+
+    from turbine_costsse.equations_2015 import mass_model, rotor_torque
+
+    # a fleet of 100000 designs re-priced under 20 supplier quotes
+    rng = np.random.RandomState(0)
+    D = rng.uniform(80., 180., 100000)
+    P = rng.uniform(2000., 8000., 100000)
+    masses = mass_model(D, P, 90., rotor_torque(P, D))
+    masses['platforms_mass'] = masses['other_mass']
+
+    start = time.time()
+    B = pricing_matrix(masses, P, crane=True, multipliers={'turbine_profitMultiplier': 0.1})
+    print('pricing matrix of %d designs built in %.3f s' % (B.n_designs, time.time() - start))
+
+    quotes = {'blade_mass_cost_coeff': rng.normal(14.6, 1., 20), 'gearbox_mass_cost_coeff': rng.normal(12.9, 1., 20)}
+    start = time.time()
+    out = B(quotes, outputs=['turbine_cost'])
+    print('%s costs re-priced in %.3f s, fleet total %.3g to %.3g USD'
+          % (out['turbine_cost'].shape, time.time() - start, out['turbine_cost'].sum(axis=0).min(),
+             out['turbine_cost'].sum(axis=0).max()))
+
+
+if __name__ == "__main__":
+
+    example()
@@ -0,0 +1,152 @@
+"""
+scenarios_2015.py
+
+Evaluation of assembly, overhead, profit and transport multiplier scenarios.
+
+The component costs of the 2015 model do not depend on the multipliers, so
+the parts cost of every system (hub, blades, nacelle, tower) is summed once
+per design and the S scenarios are applied in the adder stages by
+broadcasting, giving (designs x scenarios) cost arrays without rerunning
+the mass and cost equations for each scenario.
+
+Copyright (c) NREL. All rights reserved.
+"""
+
+from collections import OrderedDict
+
+import numpy as np
+
+from turbine_costsse.equations_2015 import MULTIPLIERS_2015, csm_model, system_cost
+
+# parts costs that parts_costs returns, summed from the component costs
+PARTS = ('hub_parts_cost', 'blades_cost', 'nacelle_parts_cost', 'tower_parts_cost')
+
+SCENARIO_OUTPUTS = ('hub_system_cost', 'rotor_cost', 'nacelle_cost', 'tower_cost', 'turbine_cost')
+
+
+def scenario_matrix(scenarios):
+    """
+    Multipliers of S scenarios as an OrderedDict of arrays of length S.
+
+    `scenarios` is a sequence of dicts, one per scenario, or a mapping of
+    multiplier names to sequences of length S.  Multipliers that are not
+    given take their defaults from MULTIPLIERS_2015.
+    """
+
+    if isinstance(scenarios, dict):
+        names = set(scenarios)
+    else:
+        names = set(k for s in scenarios for k in s)
+    unknown = names - set(MULTIPLIERS_2015)
+    if unknown:
+        raise KeyError('unknown multiplier(s): %s' % ', '.join(sorted(unknown)))
+
+    if isinstance(scenarios, dict):
+        # arrays are not cast, so complex and dual-number multipliers pass through
+        columns = {}
+        for k, v in scenarios.items():
+            v = np.asarray(v, dtype=float) if isinstance(v, (list, tuple, float, int)) else v
+            columns[k] = np.expand_dims(v, -1) if np.ndim(v) == 0 else v
+        n = max([np.shape(v)[0] for v in columns.values()] or [1])
+    else:
+        columns = dict((k, np.array([s.get(k, MULTIPLIERS_2015[k]) for s in scenarios], dtype=float)) for k in names)
+        n = len(scenarios)
+
+    matrix = OrderedDict()
+    for k, default in MULTIPLIERS_2015.items():
+        v = columns.get(k, np.full(n, default))
+        if np.shape(v) not in ((1,), (n,)):
+            raise ValueError('multiplier %s has %d values for %d scenarios' % (k, np.size(v), n))
+        matrix[k] = np.broadcast_to(v, (n,))
+    return matrix
+
+
+def parts_costs(costs, blade_number=3, main_bearing_number=2):
+    """
+    Multiplier-free parts cost of every system from the component costs.
+
+    `costs` holds the component costs of equations_2015.cost_model or
+    Turbine_CostsSE_2015 (scalars or arrays of designs).  As in the nacelle
+    adder, the single bearing cost is counted main_bearing_number times.
+    """
+
+    c = lambda name: costs.get(name, 0.0)
+    parts = OrderedDict()
+    parts['hub_parts_cost'] = c('hub_cost') + c('pitch_system_cost') + c('spinner_cost')
+    parts['blades_cost'] = c('blade_cost') * blade_number
+    parts['nacelle_parts_cost'] = c('lss_cost') + main_bearing_number * c('main_bearing_cost') + c('gearbox_cost') + \
+                                  c('hss_cost') + c('generator_cost') + c('bedplate_cost') + c('yaw_system_cost') + \
+                                  c('vs_cost') + c('hvac_cost') + c('cover_cost') + c('elec_cost') + \
+                                  c('controls_cost') + c('other_cost') + c('transformer_cost')
+    parts['tower_parts_cost'] = c('tower_parts_cost')
+    return parts
+
+
+def apply_scenarios(parts, scenarios, machine_rating=None):
+    """
+    System costs of every design under every multiplier scenario.
+
+    `parts` is the result of parts_costs and `scenarios` is passed to
+    scenario_matrix.  Returns the SCENARIO_OUTPUTS (plus turbine_cost_kW
+    when machine_rating is given), each with the shape of the parts costs
+    plus a trailing scenario axis.
+    """
+
+    m = scenario_matrix(scenarios)
+    p = dict((k, np.expand_dims(parts[k], -1)) for k in PARTS)
+    multipliers = lambda system: (m[system + '_assemblyCostMultiplier'], m[system + '_overheadCostMultiplier'],
+                                  m[system + '_profitMultiplier'], m[system + '_transportMultiplier'])
+
+    out = OrderedDict()
+    out['hub_system_cost'] = system_cost(p['hub_parts_cost'], *multipliers('hub'))
+    out['rotor_cost'] = p['blades_cost'] + out['hub_system_cost']
+    out['nacelle_cost'] = system_cost(p['nacelle_parts_cost'], *multipliers('nacelle'))
+    out['tower_cost'] = system_cost(p['tower_parts_cost'], *multipliers('tower'))
+    out['turbine_cost'] = system_cost(out['rotor_cost'] + out['nacelle_cost'] + out['tower_cost'], *multipliers('turbine'))
+    if machine_rating is not None:
+        out['turbine_cost_kW'] = out['turbine_cost'] / np.expand_dims(machine_rating, -1)
+
+    shape = np.broadcast_shapes(*[np.shape(v) for v in out.values()])
+    return OrderedDict((k, np.broadcast_to(v, shape)) for k, v in out.items())
+
+
+def csm_scenarios(rotor_diameter, machine_rating, hub_height, rotor_torque, scenarios,
+                  blade_number=3, bearing_number=2, **model_kwargs):
+    """
+    csm_model costs of a batch of designs under S multiplier scenarios.
+
+    The masses and component costs are computed once by csm_model (the
+    keyword arguments are passed on; multipliers in its coeffs are ignored)
+    and the scenarios are broadcast over the adder stages.
+    """
+
+    costs = csm_model(rotor_diameter, machine_rating, hub_height, rotor_torque,
+                      blade_number=blade_number, bearing_number=bearing_number, **model_kwargs)
+    return apply_scenarios(parts_costs(costs, blade_number, bearing_number), scenarios, machine_rating)
+
+#-------------------------------------------------------------------------------
+def example():
+
+    import time
+
+    from turbine_costsse.equations_2015 import rotor_torque
+
+    # 10000 designs under 50 markup scenarios
+    rng = np.random.RandomState(0)
+    D = np.linspace(80., 200., 10000)
+    P = np.full_like(D, 5000.)
+    scenarios = {'turbine_profitMultiplier': rng.uniform(0.05, 0.20, 50),
+                 'turbine_transportMultiplier': rng.uniform(0.01, 0.05, 50),
+                 'nacelle_assemblyCostMultiplier': rng.uniform(0.0, 0.1, 50)}
+
+    start = time.time()
+    out = csm_scenarios(D, P, 90., rotor_torque(P, D), scenarios, crane=True)
+    print('turbine_cost %s in %.3f s' % (out['turbine_cost'].shape, time.time() - start))
+    i = np.searchsorted(D, 126.)
+    print('%.1f m rotor: %.0f to %.0f USD over the scenarios'
+          % (D[i], out['turbine_cost'][i].min(), out['turbine_cost'][i].max()))
+
+
+if __name__ == "__main__":
+
+    example()
@@ -0,0 +1,182 @@
+"""
+screening_2015.py
+
+Mass-limit screening of design batches before the cost stage.
+
+The masses of nrel_csm_mass_2015 (equations_2015.mass_model) are computed
+for every design of a chunk and checked against transport, crane or other
+limits, for example {'blade_mass': 25e3, 'nacelle_mass': (None, 120e3)}.
+Only the feasible designs are passed on to the cost stage
+(equations_2015.cost_model, the equations of Turbine_CostsSE_2015), and the
+report gives the number of designs each limit pruned and an estimate of
+the cost-stage time the pruning saved.
+
+Copyright (c) NREL. All rights reserved.
+"""
+
+import time
+from collections import OrderedDict
+
+import numpy as np
+
+from turbine_costsse.equations_2015 import cost_model, mass_model
+from turbine_costsse.sweep_2015 import _allocate, _model_args, _output_names
+
+# keyword arguments of csm_model that the mass model takes
+MASS_OPTIONS = ('turbine_class', 'blade_has_carbon', 'blade_number', 'bearing_number', 'crane', 'coeffs')
+
+
+def _bounds(limits):
+
+    bounds = OrderedDict()
+    for k, v in limits.items():
+        lower, upper = v if isinstance(v, (tuple, list)) else (None, v)
+        bounds[k] = (-np.inf if lower is None else lower, np.inf if upper is None else upper)
+    return bounds
+
+
+def feasible_mask(masses, limits):
+    """
+    Designs whose masses are within `limits`, and the violations of each limit.
+
+    `limits` maps outputs of mass_model to an upper limit or a (lower,
+    upper) pair, either of which may be None.  Returns the boolean mask and
+    an OrderedDict of the number of designs violating each limit.
+    """
+
+    unknown = [k for k in limits if k not in masses]
+    if unknown:
+        raise KeyError('no mass output(s): %s' % ', '.join(unknown))
+
+    shape = np.broadcast_shapes(*[np.shape(masses[k]) for k in limits])
+    feasible = np.ones(shape, dtype=bool)
+    violations = OrderedDict()
+    for k, (lower, upper) in _bounds(limits).items():
+        ok = np.broadcast_to((masses[k] >= lower) & (masses[k] <= upper), shape)
+        violations[k] = int(ok.size - np.count_nonzero(ok))
+        feasible &= ok
+    return feasible, violations
+
+
+class ScreeningReport(object):
+    """Outcome of a screened evaluation: the feasible mask, prune counts and stage timings."""
+
+    def __init__(self, feasible, violations, mass_time, cost_time):
+
+        self.feasible = feasible
+        self.violations = violations
+        self.mass_time = mass_time
+        self.cost_time = cost_time
+
+    @property
+    def n_designs(self):
+        return int(np.size(self.feasible))
+
+    @property
+    def n_pruned(self):
+        return self.n_designs - int(np.count_nonzero(self.feasible))
+
+    @property
+    def time_saved(self):
+        """Cost-stage time of the pruned designs, at the measured time per costed design."""
+
+        n_costed = self.n_designs - self.n_pruned
+        return self.cost_time / n_costed * self.n_pruned if n_costed else 0.
+
+    def __str__(self):
+        lines = ['%d of %d designs pruned by the mass limits, about %.3f s of cost evaluation saved'
+                 % (self.n_pruned, self.n_designs, self.time_saved)]
+        lines += ['  %s: %d designs outside the limits' % (k, n) for k, n in self.violations.items()]
+        lines += ['  mass stage %.3f s, cost stage %.3f s' % (self.mass_time, self.cost_time)]
+        return '\n'.join(lines)
+
+
+def screen_samples(samples, limits, outputs=None, dtype=np.float64, structured=False, chunk_size=65536,
+                   max_tip_speed=80., max_efficiency=0.90, **model_kwargs):
+    """
+    Evaluate csm_model at a set of samples, costing only the designs within the mass limits.
+
+    `samples` and the keyword arguments are those of
+    sweep_2015.evaluate_samples and `limits` is passed to feasible_mask.
+    The limits apply to the mass_model outputs, whose nacelle_mass includes
+    the platforms.  Mass outputs are stored for every design; cost outputs,
+    and the masses the cost model recomputes as in csm_model, are NaN for
+    the pruned designs.  Returns the
+    results and a ScreeningReport.
+    """
+
+    dtype = np.dtype(dtype).type
+    n = max([np.size(v) for v in samples.values()] or [1])
+    samples = OrderedDict((k, np.broadcast_to(np.asarray(v, dtype=dtype), (n,))) for k, v in samples.items())
+    if outputs is None:
+        outputs = _output_names(**model_kwargs)
+    result, buffers = _allocate(outputs, n, dtype, structured)
+
+    feasible = np.zeros(n, dtype=bool)
+    violations = OrderedDict((k, 0) for k in limits)
+    mass_time = cost_time = 0.
+    for start in range(0, n, chunk_size):
+        sl = slice(start, min(start + chunk_size, n))
+        (D, P, H, Q), kwargs = _model_args(dict((k, v[sl]) for k, v in samples.items()), dtype,
+                                           max_tip_speed, max_efficiency, model_kwargs)
+
+        t0 = time.time()
+        size = sl.stop - sl.start
+        masses = mass_model(D, P, H, Q, **dict((k, kwargs[k]) for k in MASS_OPTIONS if k in kwargs))
+        masses = OrderedDict((k, np.broadcast_to(v, (size,))) for k, v in masses.items())
+        ok, chunk_violations = feasible_mask(masses, limits)
+        feasible[sl] = ok
+        for k, v in chunk_violations.items():
+            violations[k] += v
+        t1 = time.time()
+
+        index = np.flatnonzero(ok)
+        take = lambda x: x[index] if np.ndim(x) else x
+        coeffs = kwargs.get('coeffs')
+        costed = OrderedDict((k, v[index]) for k, v in masses.items())
+        costed['platforms_mass'] = costed['other_mass']
+        costs = cost_model(costed, P[index], blade_number=take(kwargs.get('blade_number', 3)),
+                           main_bearing_number=take(kwargs.get('bearing_number', 2)),
+                           crane=take(kwargs.get('crane', False)),
+                           blade_cost_external=take(kwargs.get('blade_cost_external', 0.)),
+                           tower_cost_external=take(kwargs.get('tower_cost_external', 0.)),
+                           coeffs=dict((k, take(v)) for k, v in coeffs.items()) if coeffs else None)
+        cost_time += time.time() - t1
+        mass_time += t1 - t0
+
+        for k, buf in buffers.items():
+            chunk = buf[sl]
+            if k in masses:
+                chunk[:] = masses[k]
+            if k in costs:
+                chunk[:] = np.nan
+                chunk[index] = costs[k]
+
+    return result, ScreeningReport(feasible, violations, mass_time, cost_time)
+
+#-------------------------------------------------------------------------------
+def example():
+
+    from turbine_costsse.sweep_2015 import evaluate_samples
+
+    # 500000 random designs under road transport and crane limits
+    rng = np.random.RandomState(0)
+    n = 500000
+    samples = {'rotor_diameter': rng.uniform(60., 200., n), 'machine_rating': rng.uniform(1000., 10000., n),
+               'hub_height': rng.uniform(60., 150., n)}
+    limits = {'blade_mass': 40e3, 'nacelle_mass': 250e3, 'tower_mass': (None, 400e3)}
+
+    start = time.time()
+    evaluate_samples(samples, outputs=['turbine_cost'])
+    print('all designs costed in %.3f s' % (time.time() - start))
+
+    start = time.time()
+    results, report = screen_samples(samples, limits, outputs=['turbine_cost', 'blade_mass'])
+    print('screened run in %.3f s' % (time.time() - start))
+    print(report)
+    print('cheapest feasible design %.0f USD' % np.nanmin(results['turbine_cost']))
+
+
+if __name__ == "__main__":
+
+    example()
@@ -0,0 +1,214 @@
+"""
+surrogate_2015.py
+
+Fitted response surfaces of the 2015 NREL Cost and Scaling Model.
+
+A surrogate is fitted to samples of csm_model over rotor diameter, machine
+rating and hub height for one set of discrete options and coefficients.
+Evaluating it is a handful of array operations, and it is saved to a small
+.npz file that can be loaded with NumPy alone.
+
+Copyright (c) NREL. All rights reserved.
+"""
+
+import json
+from collections import OrderedDict
+
+import numpy as np
+from numpy.polynomial import legendre
+
+from turbine_costsse.equations_2015 import csm_model, rotor_torque
+
+INPUTS = ('rotor_diameter', 'machine_rating', 'hub_height')
+
+DEFAULT_OUTPUTS = ('turbine_cost', 'turbine_cost_kW', 'turbine_mass', 'rotor_cost', 'nacelle_cost', 'tower_cost')
+
+DEFAULT_BOUNDS = OrderedDict([
+    ('rotor_diameter', (60., 200.)),
+    ('machine_rating', (1000., 10000.)),
+    ('hub_height',     (60., 150.)),
+])
+
+
+def _json_default(value):
+    # NumPy scalars and arrays in the metadata as plain JSON numbers and lists
+    if isinstance(value, (np.ndarray, np.generic)):
+        return value.tolist()
+    raise TypeError('%s is not JSON serializable' % type(value).__name__)
+
+
+def latin_hypercube(n, bounds, seed=None):
+    """Latin hypercube sample of n points; `bounds` maps input names to (lower, upper)."""
+
+    rng = np.random.RandomState(seed)
+    names = list(bounds)
+    u = (rng.rand(n, len(names)) + np.array([rng.permutation(n) for _ in names]).T) / n
+    sample = OrderedDict()
+    for j, k in enumerate(names):
+        lo, up = bounds[k]
+        sample[k] = lo + u[:, j]*(up - lo)
+    return sample
+
+
+def _total_degree_exponents(degree, ndim):
+
+    if ndim == 0:
+        return [()]
+    return [(i,) + e for i in range(degree + 1) for e in _total_degree_exponents(degree - i, ndim - 1)]
+
+
+def _polynomial_basis(t, exponents):
+
+    V = [legendre.legvander(t[..., j], exponents.max()) for j in range(t.shape[-1])]
+    A = 1.
+    for j in range(t.shape[-1]):
+        A = A * V[j][..., exponents[:, j]]
+    return A
+
+
+def _rbf_basis(t, centers):
+
+    r = np.sqrt(((t[..., None, :] - centers)**2).sum(axis=-1))
+    return np.concatenate([r**3, np.ones(t.shape[:-1] + (1,)), t], axis=-1)
+
+
+class Surrogate(object):
+    """
+    Response surface of csm_model outputs over INPUTS.
+
+    Inputs are mapped to [-1, 1] in log space.  Strictly positive outputs are
+    fitted in log space too, which makes the power law mass equations nearly
+    polynomial.  `kind` is 'polynomial' (total degree Legendre least squares)
+    or 'rbf' (cubic radial basis interpolation with a linear tail).
+    """
+
+    def __init__(self, kind, outputs, bounds, log_outputs, arrays, errors=None, settings=None):
+
+        self.kind = kind
+        self.outputs = tuple(outputs)
+        self.bounds = OrderedDict((k, tuple(bounds[k])) for k in INPUTS)
+        self.log_outputs = np.asarray(log_outputs, dtype=bool)
+        self.arrays = arrays
+        self.errors = errors if errors is not None else OrderedDict()
+        self.settings = settings if settings is not None else {}
+
+        self._lo = np.log([self.bounds[k][0] for k in INPUTS])
+        self._hi = np.log([self.bounds[k][1] for k in INPUTS])
+
+    def _scale(self, rotor_diameter, machine_rating, hub_height):
+
+        x = np.stack(np.broadcast_arrays(np.log(rotor_diameter), np.log(machine_rating), np.log(hub_height)), axis=-1)
+        return 2.*(x - self._lo)/(self._hi - self._lo) - 1.
+
+    def __call__(self, rotor_diameter, machine_rating, hub_height):
+        """Approximate outputs; inputs are scalars or arrays that broadcast."""
+
+        t = self._scale(rotor_diameter, machine_rating, hub_height)
+        if self.kind == 'polynomial':
+            A = _polynomial_basis(t, self.arrays['exponents'])
+        else:
+            A = _rbf_basis(t, self.arrays['centers'])
+        y = A.dot(self.arrays['weights'])
+        y = np.where(self.log_outputs, np.exp(y), y)
+        return OrderedDict((k, y[..., i]) for i, k in enumerate(self.outputs))
+
+    def save(self, filename):
+
+        meta = {'kind': self.kind, 'outputs': self.outputs, 'bounds': self.bounds,
+                'errors': self.errors, 'settings': self.settings}
+        np.savez_compressed(filename, meta=json.dumps(meta, default=_json_default), log_outputs=self.log_outputs,
+                            **self.arrays)
+
+
+def load_surrogate(filename):
+    """Load a surrogate written by Surrogate.save."""
+
+    with np.load(filename) as f:
+        meta = json.loads(str(f['meta']))
+        arrays = dict((k, f[k]) for k in f.files if k not in ('meta', 'log_outputs'))
+        log_outputs = f['log_outputs']
+    errors = OrderedDict((k, OrderedDict((e, meta['errors'][k][e]) for e in ('max_rel_error', 'rms_rel_error')))
+                         for k in meta['outputs'] if k in meta['errors'])
+    return Surrogate(meta['kind'], meta['outputs'], meta['bounds'], log_outputs, arrays,
+                     errors=errors, settings=meta['settings'])
+
+
+def _fit(kind, t, y, degree):
+
+    if kind == 'polynomial':
+        exponents = np.array(_total_degree_exponents(degree, t.shape[1]))
+        A = _polynomial_basis(t, exponents)
+        arrays = {'exponents': exponents, 'weights': np.linalg.lstsq(A, y, rcond=None)[0]}
+    elif kind == 'rbf':
+        n, ndim = t.shape
+        r = np.sqrt(((t[:, None, :] - t[None, :, :])**2).sum(axis=-1))
+        P = np.hstack([np.ones((n, 1)), t])
+        A = np.block([[r**3, P], [P.T, np.zeros((ndim + 1, ndim + 1))]])
+        rhs = np.vstack([y, np.zeros((ndim + 1, y.shape[1]))])
+        arrays = {'centers': t, 'weights': np.linalg.solve(A, rhs)}
+    else:
+        raise ValueError("unknown surrogate kind '%s', use 'polynomial' or 'rbf'" % kind)
+    return arrays
+
+
+def build_surrogate(kind='polynomial', outputs=DEFAULT_OUTPUTS, bounds=None, n_samples=500, n_test=1000, degree=6,
+                    seed=0, max_tip_speed=80., max_efficiency=0.90, **model_kwargs):
+    """
+    Sample csm_model and fit a Surrogate of `outputs`.
+
+    The rotor torque of every sample follows from the rating and diameter via
+    the maximum tip speed and drivetrain efficiency; the remaining keyword
+    arguments (turbine class, flags, coeffs, ...) are passed to csm_model and
+    stay fixed.  The fit is checked against `n_test` independent samples and
+    the maximum and RMS relative errors of each output are stored in the
+    `errors` attribute of the returned surrogate.  They estimate the error
+    from those samples and are not a bound elsewhere in the domain.
+    """
+
+    if bounds is None:
+        bounds = {}
+    bounds = OrderedDict((k, tuple(bounds.get(k, DEFAULT_BOUNDS[k]))) for k in INPUTS)
+
+    def sample(n, seed):
+        x = latin_hypercube(n, bounds, seed)
+        Q = rotor_torque(x['machine_rating'], x['rotor_diameter'], max_tip_speed, max_efficiency)
+        out = csm_model(x['rotor_diameter'], x['machine_rating'], x['hub_height'], Q, **model_kwargs)
+        return x, np.column_stack([out[k] for k in outputs])
+
+    x, y = sample(n_samples, seed)
+    log_outputs = (y > 0.).all(axis=0)
+    s = Surrogate(kind, outputs, bounds, log_outputs, {})
+    t = s._scale(x['rotor_diameter'], x['machine_rating'], x['hub_height'])
+    s.arrays = _fit(kind, t, np.where(log_outputs, np.log(np.abs(y)), y), degree)
+
+    settings = dict((k, v) for k, v in model_kwargs.items() if k != 'coeffs')
+    settings.update({'n_samples': n_samples, 'degree': degree, 'seed': seed,
+                     'max_tip_speed': max_tip_speed, 'max_efficiency': max_efficiency})
+    if model_kwargs.get('coeffs'):
+        settings['coeffs'] = dict(model_kwargs['coeffs'])
+    s.settings = settings
+
+    if n_test:
+        x, y = sample(n_test, seed + 1)
+        approx = s(x['rotor_diameter'], x['machine_rating'], x['hub_height'])
+        for i, k in enumerate(outputs):
+            rel = (approx[k] - y[:, i]) / np.maximum(np.abs(y[:, i]), 1e-300)
+            s.errors[k] = OrderedDict([('max_rel_error', float(np.abs(rel).max())),
+                                       ('rms_rel_error', float(np.sqrt((rel**2).mean())))])
+
+    return s
+
+#-------------------------------------------------------------------------------
+def example():
+
+    for kind in ('polynomial', 'rbf'):
+        s = build_surrogate(kind, crane=True)
+        print('%s surrogate, error against nrel_csm_2015 on 1000 test points:' % kind)
+        for k, e in s.errors.items():
+            print('  %-16s max %.2e  rms %.2e' % (k, e['max_rel_error'], e['rms_rel_error']))
+        print('  5 MW turbine cost %.2f USD' % s(126., 5000., 90.)['turbine_cost'])
+
+
+if __name__ == "__main__":
+
+    example()
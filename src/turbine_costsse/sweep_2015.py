@@ -0,0 +1,302 @@
+"""
+sweep_2015.py
+
+Parameter sweeps and Monte Carlo runs of the 2015 NREL Cost and Scaling Model.
+
+Designs are evaluated with csm_model in chunks of `chunk_size` and the
+outputs are written into preallocated buffers, either one array per output
+or, with structured=True, a single structured array with one field per
+output that stores all results in one contiguous block.  The
+`dtype` of the inputs and buffers is selectable: float32 halves the memory
+and bandwidth of large runs, float64 stays the default.
+
+Error analysis of float32: the inputs are rounded to float32 (relative error
+at most 2**-24 = 6e-8) and every operation of the chain adds a rounding error
+of the same size.  The mass equations are power laws, which scale the
+relative input error by their exponent (at most 2.54), and the cost chain
+sums positive terms with multipliers, which does not amplify relative
+errors.  The relative error of turbine_cost against a float64 run is thus a
+few 1e-7; over the default design space (rotor diameter 60-200 m, rating
+1-10 MW, hub height 60-150 m) it was measured at 4e-7 at most.  Outputs that
+are differences of nearly equal numbers (spinner_mass near D = 63 m, where
+it changes sign) lose relative accuracy in float32 but keep an absolute
+error of about 1e-4 kg.
+
+Monte Carlo samples are drawn in blocks of SAMPLE_BLOCK, each from its own
+stream spawned from the seed with numpy's SeedSequence, so a run is
+reproducible bit for bit whichever worker or MPI rank draws and evaluates
+each block.
+
+Copyright (c) NREL. All rights reserved.
+"""
+
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+from turbine_costsse.equations_2015 import csm_model, drivetrain_loads
+
+INPUTS = ('rotor_diameter', 'machine_rating', 'hub_height')
+
+# per-design options of csm_model that may be sampled along with the inputs
+OPTIONS = ('turbine_class', 'blade_has_carbon', 'blade_number', 'bearing_number', 'crane',
+           'blade_cost_external', 'tower_cost_external')
+
+# Monte Carlo samples per random stream
+SAMPLE_BLOCK = 65536
+
+
+def _output_names(**model_kwargs):
+
+    return list(csm_model(126., 5000., 90., 4e6, **model_kwargs))
+
+
+def result_dtype(outputs, dtype=np.float64):
+    """Structured dtype with one field of `dtype` per output name."""
+
+    return np.dtype([(str(k), dtype) for k in outputs])
+
+
+def as_records(results, dtype=None):
+    """Copy a mapping of equally shaped output arrays into a structured array."""
+
+    shape = np.broadcast_shapes(*[np.shape(v) for v in results.values()])
+    if dtype is None:
+        dtype = np.result_type(*results.values())
+    records = np.empty(shape, dtype=result_dtype(results, dtype))
+    for k, v in results.items():
+        records[k] = v
+    return records
+
+
+def _allocate(outputs, n, dtype, structured):
+    # returns the result and the per-output views that _evaluate writes into
+    if structured:
+        records = np.empty(n, dtype=result_dtype(outputs, dtype))
+        return records, OrderedDict((k, records[k]) for k in outputs)
+    buffers = OrderedDict((k, np.empty(n, dtype=dtype)) for k in outputs)
+    return buffers, buffers
+
+
+def _model_args(inputs, dtype, max_tip_speed, max_efficiency, model_kwargs):
+    # positional inputs and keyword arguments of csm_model for one chunk of designs
+
+    inputs = dict((k, np.asarray(v, dtype=dtype)) for k, v in inputs.items())
+    D, P, H = [inputs.pop(k) for k in INPUTS]
+    # per-design tip speeds and efficiencies may be sampled like the inputs
+    tip_speed = inputs.pop('max_tip_speed', dtype(max_tip_speed))
+    efficiency = inputs.pop('max_efficiency', dtype(max_efficiency))
+    Q = inputs.pop('rotor_torque', None)
+    if Q is None:
+        Q = drivetrain_loads(P, D, tip_speed, efficiency)['rotor_torque']
+
+    # sampled options are applied elementwise, the remaining inputs are coefficients
+    kwargs = dict(model_kwargs)
+    for k in OPTIONS:
+        if k in inputs:
+            kwargs[k] = inputs.pop(k)
+    if inputs:
+        kwargs['coeffs'] = dict(kwargs.get('coeffs') or {}, **inputs)
+    return (D, P, H, Q), kwargs
+
+
+def _evaluate(inputs, buffers, sl, dtype, max_tip_speed, max_efficiency, model_kwargs):
+    # evaluate one chunk of designs and store it in buffers[k][sl]
+
+    args, kwargs = _model_args(inputs, dtype, max_tip_speed, max_efficiency, model_kwargs)
+    out = csm_model(*args, **kwargs)
+    for k, buf in buffers.items():
+        buf[sl] = out[k]
+
+
+def sweep(rotor_diameter, machine_rating, hub_height, outputs=None, dtype=np.float64, structured=False,
+          chunk_size=65536, max_tip_speed=80., max_efficiency=0.90, **model_kwargs):
+    """
+    Evaluate csm_model on the full grid of the given input values.
+
+    Each input is a scalar or a 1D array; the result maps every output
+    (default: all outputs of csm_model) to an array of dtype with the shape
+    (len(rotor_diameter), len(machine_rating), len(hub_height)), or with
+    structured=True returns a structured array of that shape with one field
+    per output.  The rotor torque follows from the rating and diameter via
+    the maximum tip speed and drivetrain efficiency; the remaining keyword
+    arguments are passed to csm_model.
+    """
+
+    dtype = np.dtype(dtype).type
+    axes = [np.atleast_1d(np.asarray(x, dtype=dtype)) for x in (rotor_diameter, machine_rating, hub_height)]
+    shape = tuple(len(a) for a in axes)
+    n = int(np.prod(shape))
+    if outputs is None:
+        outputs = _output_names(**model_kwargs)
+    result, buffers = _allocate(outputs, n, dtype, structured)
+
+    for start in range(0, n, chunk_size):
+        sl = slice(start, min(start + chunk_size, n))
+        idx = np.unravel_index(np.arange(sl.start, sl.stop), shape)
+        inputs = dict((k, a[i]) for k, a, i in zip(INPUTS, axes, idx))
+        _evaluate(inputs, buffers, sl, dtype, max_tip_speed, max_efficiency, model_kwargs)
+
+    if structured:
+        return result.reshape(shape)
+    return OrderedDict((k, v.reshape(shape)) for k, v in result.items())
+
+
+def iter_sweep(rotor_diameter, machine_rating, hub_height, outputs=None, dtype=np.float64, structured=False,
+               chunk_size=65536, max_tip_speed=80., max_efficiency=0.90, **model_kwargs):
+    """
+    Generator version of sweep for streaming large grids.
+
+    Yields the grid designs in C order in chunks of up to chunk_size.  Each
+    chunk holds the INPUTS of its designs followed by the outputs, as an
+    OrderedDict of 1D arrays or a structured array.
+    """
+
+    dtype = np.dtype(dtype).type
+    axes = [np.atleast_1d(np.asarray(x, dtype=dtype)) for x in (rotor_diameter, machine_rating, hub_height)]
+    shape = tuple(len(a) for a in axes)
+    n = int(np.prod(shape))
+    if outputs is None:
+        outputs = _output_names(**model_kwargs)
+
+    for start in range(0, n, chunk_size):
+        stop = min(start + chunk_size, n)
+        idx = np.unravel_index(np.arange(start, stop), shape)
+        inputs = OrderedDict((k, a[i]) for k, a, i in zip(INPUTS, axes, idx))
+        result, buffers = _allocate(list(INPUTS) + list(outputs), stop - start, dtype, structured)
+        for k in INPUTS:
+            buffers[k][:] = inputs[k]
+        _evaluate(inputs, OrderedDict((k, buffers[k]) for k in outputs), slice(None), dtype,
+                  max_tip_speed, max_efficiency, model_kwargs)
+        yield result
+
+
+def evaluate_samples(samples, outputs=None, dtype=np.float64, structured=False, chunk_size=65536,
+                     max_tip_speed=80., max_efficiency=0.90, **model_kwargs):
+    """
+    Evaluate csm_model at a set of samples.
+
+    `samples` maps the INPUTS, optionally 'rotor_torque' (or per-design
+    'max_tip_speed' and 'max_efficiency' to derive it from), the OPTIONS and
+    any coefficient or multiplier names of csm_model to scalars or 1D arrays
+    of equal length, so one batch may mix turbine classes, carbon blades and
+    cranes.
+    Returns an OrderedDict of 1D output arrays of dtype, or a structured
+    array with one field per output if structured=True.
+    """
+
+    dtype = np.dtype(dtype).type
+    n = max([np.size(v) for v in samples.values()] or [1])
+    samples = OrderedDict((k, np.broadcast_to(np.asarray(v, dtype=dtype), (n,))) for k, v in samples.items())
+    if outputs is None:
+        outputs = _output_names(**model_kwargs)
+    result, buffers = _allocate(outputs, n, dtype, structured)
+
+    for start in range(0, n, chunk_size):
+        sl = slice(start, min(start + chunk_size, n))
+        inputs = dict((k, v[sl]) for k, v in samples.items())
+        _evaluate(inputs, buffers, sl, dtype, max_tip_speed, max_efficiency, model_kwargs)
+
+    return result
+
+
+def sample_streams(n, seed=None, block_size=SAMPLE_BLOCK):
+    """
+    Independent random streams of a Monte Carlo run of n samples.
+
+    The samples are drawn in blocks of block_size and block b uses the b-th
+    child of SeedSequence(seed), so each block can be drawn by any worker
+    and the samples depend only on the seed and the block size.
+    """
+
+    return np.random.SeedSequence(seed).spawn(-(-n // block_size))
+
+
+def draw_block(distributions, stream, size, dtype=np.float64):
+    """Samples of one block: each distribution in turn draws `size` values from a Generator of `stream`."""
+
+    rng = np.random.default_rng(stream)
+    return OrderedDict((k, np.asarray(draw(rng, size), dtype=dtype)) for k, draw in distributions.items())
+
+
+def _monte_carlo_block(b, streams, distributions, inputs, samples, buffers, n, block_size, chunk_size, dtype,
+                       max_tip_speed, max_efficiency, model_kwargs):
+    # draw block b into the sample buffers and evaluate it in chunks
+
+    block = slice(b * block_size, min((b + 1) * block_size, n))
+    for k, v in draw_block(distributions, streams[b], block.stop - block.start, dtype).items():
+        samples[k][block] = v
+    for start in range(block.start, block.stop, chunk_size):
+        sl = slice(start, min(start + chunk_size, block.stop))
+        _evaluate(dict((k, v[sl]) for k, v in inputs.items()), buffers, sl, dtype, max_tip_speed, max_efficiency,
+                  model_kwargs)
+
+
+def monte_carlo(n, distributions, fixed=None, outputs=None, seed=None, dtype=np.float64, structured=False,
+                chunk_size=65536, max_tip_speed=80., max_efficiency=0.90, workers=1, block_size=SAMPLE_BLOCK,
+                **model_kwargs):
+    """
+    Monte Carlo run of csm_model.
+
+    `distributions` maps input, coefficient or multiplier names to callables
+    f(rng, size) that draw samples from a numpy Generator, for example
+    lambda rng, size: rng.normal(126., 5., size).  `fixed` gives values of
+    inputs that are not sampled.  The samples are drawn block by block from
+    the streams of sample_streams and the blocks are shared out over
+    `workers` threads; the results do not depend on the number of workers
+    or on chunk_size.  Returns the samples and the outputs, both as
+    OrderedDicts of 1D arrays of dtype; with structured=True the outputs
+    are a structured array.
+    """
+
+    dtype = np.dtype(dtype).type
+    streams = sample_streams(n, seed, block_size)
+    samples = OrderedDict((k, np.empty(n, dtype=dtype)) for k in distributions)
+    inputs = OrderedDict((k, np.broadcast_to(np.asarray(v, dtype=dtype), (n,))) for k, v in (fixed or {}).items())
+    inputs.update(samples)
+    if outputs is None:
+        outputs = _output_names(**model_kwargs)
+    results, buffers = _allocate(outputs, n, dtype, structured)
+
+    run = lambda b: _monte_carlo_block(b, streams, distributions, inputs, samples, buffers, n, block_size, chunk_size,
+                                       dtype, max_tip_speed, max_efficiency, model_kwargs)
+    if workers > 1:
+        with ThreadPoolExecutor(workers) as pool:
+            list(pool.map(run, range(len(streams))))
+    else:
+        for b in range(len(streams)):
+            run(b)
+    return samples, results
+
+#-------------------------------------------------------------------------------
+def example():
+
+    D = np.linspace(60., 200., 141)
+    P = np.linspace(1000., 10000., 91)
+    H = np.linspace(60., 150., 46)
+
+    ref = sweep(D, P, H, crane=True)
+    out = sweep(D, P, H, crane=True, dtype=np.float32)
+    size = lambda res: sum(v.nbytes for v in res.values()) / 1e6
+    err = np.abs(out['turbine_cost'] / ref['turbine_cost'] - 1.).max()
+    print('%d designs: float64 buffers %.1f MB, float32 buffers %.1f MB' % (ref['turbine_cost'].size, size(ref), size(out)))
+    print('float32 turbine_cost maximum relative error %.2e' % err)
+
+    # all outputs in one structured array, sliced by field
+    records = sweep(D, P, H, crane=True, dtype=np.float32, structured=True)
+    print('structured result %s of %d bytes per design, cheapest design %.0f USD'
+          % (records.shape, records.dtype.itemsize, records['turbine_cost'].min()))
+
+    # uncertainty of the turbine cost from the blade and tower cost coefficients
+    distributions = {'blade_mass_cost_coeff': lambda rng, size: rng.normal(14.6, 1.5, size),
+                     'tower_mass_cost_coeff': lambda rng, size: rng.uniform(2.5, 3.3, size)}
+    fixed = {'rotor_diameter': 126., 'machine_rating': 5000., 'hub_height': 90.}
+    samples, results = monte_carlo(100000, distributions, fixed, outputs=['turbine_cost'], seed=1, dtype=np.float32)
+    print('Monte Carlo turbine_cost mean %.0f USD, std %.0f USD'
+          % (results['turbine_cost'].mean(dtype=np.float64), results['turbine_cost'].std(dtype=np.float64)))
+
+
+if __name__ == "__main__":
+
+    example()
@@ -0,0 +1,274 @@
+"""
+tables_2015.py
+
+Precomputed interpolation tables of the 2015 NREL Cost and Scaling Model.
+
+csm_model is tabulated on a structured grid over rotor diameter, machine
+rating and hub height for every combination of turbine class, carbon blades
+and crane.  The grid is uniform in the logarithm of the inputs and positive
+outputs are tabulated as logarithms, so that the power law mass equations
+are nearly linear in the table coordinates and a coarse grid suffices.
+Queries are answered by vectorized multilinear or cubic interpolation.
+
+Accuracy: build_tables compares both interpolation methods with csm_model at
+the centre of every grid cell, where the interpolation error of a smooth
+function peaks, and at `n_test` random points, and stores the largest
+relative error of each output in the `errors` attribute.  With `rtol` the
+grid is refined until these errors of the chosen method are within that
+tolerance.  No accuracy guarantee is provided: the interpolation error
+between the checked points is bounded only by the higher derivatives of
+the log outputs, which are not known in closed form for all outputs,
+options and coefficients, so the stored errors are estimates, not a bound
+over the whole domain.
+
+Copyright (c) NREL. All rights reserved.
+"""
+
+import itertools
+import json
+from collections import OrderedDict
+
+import numpy as np
+
+from turbine_costsse.equations_2015 import csm_model, rotor_torque
+from turbine_costsse.surrogate_2015 import INPUTS, DEFAULT_BOUNDS, _json_default
+
+DISCRETE_INPUTS = ('turbine_class', 'blade_has_carbon', 'crane')
+
+DEFAULT_COMBINATIONS = tuple(itertools.product((1, 2, 3), (False, True), (False, True)))
+
+DEFAULT_OUTPUTS = ('turbine_cost', 'rotor_cost', 'nacelle_cost', 'tower_cost',
+                   'turbine_mass', 'rotor_mass_tcc', 'nacelle_mass', 'tower_mass')
+
+METHODS = ('linear', 'cubic')
+
+
+def _weights(t, method):
+    # interpolation weights of the grid nodes i-1, i, i+1, i+2 for a point at i + t
+    if method == 'linear':
+        return np.stack([np.zeros_like(t), 1. - t, t, np.zeros_like(t)], axis=-1)
+    # Keys cubic convolution, third order accurate
+    t2, t3 = t*t, t*t*t
+    return 0.5*np.stack([-t3 + 2.*t2 - t, 3.*t3 - 5.*t2 + 2., -3.*t3 + 4.*t2 + t, t3 - t2], axis=-1)
+
+
+def _pad(values, axis):
+    # ghost nodes on both ends that keep the cubic interpolation third order accurate
+    v = np.moveaxis(values, axis, 0)
+    first = 3.*v[0] - 3.*v[1] + v[2]
+    last = 3.*v[-1] - 3.*v[-2] + v[-3]
+    return np.moveaxis(np.concatenate([first[None], v, last[None]]), 0, axis)
+
+
+class CostTables(object):
+    """
+    Interpolation tables of csm_model outputs.
+
+    `values` has the shape (combinations, outputs) + grid shape, where the grid
+    is uniform in log space between the `bounds` of each of INPUTS and
+    `combinations` lists the (turbine_class, blade_has_carbon, crane) of the
+    tables.  Outputs flagged in `log_outputs` are stored as logarithms.
+    """
+
+    def __init__(self, outputs, bounds, combinations, values, log_outputs, errors=None, settings=None):
+
+        self.outputs = tuple(outputs)
+        self.bounds = OrderedDict((k, tuple(bounds[k])) for k in INPUTS)
+        self.combinations = tuple((int(c), bool(b), bool(r)) for c, b, r in combinations)
+        self.values = np.asarray(values, dtype=float)
+        self.log_outputs = np.asarray(log_outputs, dtype=bool)
+        self.errors = errors if errors is not None else OrderedDict()
+        self.settings = settings if settings is not None else {}
+
+        self.shape = self.values.shape[2:]
+        if len(self.shape) != len(INPUTS) or min(self.shape) < 3:
+            raise ValueError('tables need at least 3 grid points along each input, got %s' % (self.shape,))
+        self._lo = np.log([self.bounds[k][0] for k in INPUTS])
+        self._hi = np.log([self.bounds[k][1] for k in INPUTS])
+        self._index = dict((c, i) for i, c in enumerate(self.combinations))
+
+        # grid axes last, so that a gather returns (points, outputs)
+        padded = self.values
+        for axis in range(2, 2 + len(INPUTS)):
+            padded = _pad(padded, axis)
+        self._padded = np.moveaxis(padded, 1, -1)
+
+    def grid(self):
+        """Grid points of each input."""
+
+        return OrderedDict((k, np.exp(np.linspace(self._lo[j], self._hi[j], n)))
+                           for j, (k, n) in enumerate(zip(INPUTS, self.shape)))
+
+    def _combination(self, turbine_class, blade_has_carbon, crane, shape):
+
+        for k, v in (('turbine_class', turbine_class), ('blade_has_carbon', blade_has_carbon), ('crane', crane)):
+            v = np.asarray(v)
+            if v.dtype.kind not in 'biuf' or np.any(v != np.round(v)):
+                raise ValueError('%s must be integral' % k)
+            if k != 'turbine_class' and np.any((v != 0) & (v != 1)):
+                raise ValueError('%s must be 0 or 1' % k)
+        keys = np.broadcast_arrays(np.asarray(turbine_class, dtype=int), np.asarray(blade_has_carbon, dtype=bool),
+                                   np.asarray(crane, dtype=bool))
+        keys = np.stack([np.broadcast_to(k, shape).ravel() for k in keys], axis=-1)
+        unique, inverse = np.unique(keys, axis=0, return_inverse=True)
+        idx = np.empty(len(unique), dtype=int)
+        for i, (c, b, r) in enumerate(unique):
+            key = (int(c), bool(b), bool(r))
+            if key not in self._index:
+                raise ValueError('no table for turbine_class=%d, blade_has_carbon=%s, crane=%s' % key)
+            idx[i] = self._index[key]
+        return idx[inverse.ravel()]
+
+    def __call__(self, rotor_diameter, machine_rating, hub_height, turbine_class=1, blade_has_carbon=False,
+                 crane=False, method='cubic'):
+        """
+        Interpolated outputs at the given designs.
+
+        All arguments are scalars or arrays that broadcast, including the
+        discrete options.  Points outside the table bounds raise ValueError.
+        """
+
+        if method not in METHODS:
+            raise ValueError("unknown interpolation method '%s', use 'linear' or 'cubic'" % method)
+
+        x = np.broadcast_arrays(rotor_diameter, machine_rating, hub_height,
+                                turbine_class, blade_has_carbon, crane)
+        shape = x[0].shape
+        combo = self._combination(x[3], x[4], x[5], shape)
+
+        idx, w = [], []
+        for j, k in enumerate(INPUTS):
+            n = self.shape[j]
+            u = (np.log(np.asarray(x[j], dtype=float).ravel()) - self._lo[j]) / (self._hi[j] - self._lo[j]) * (n - 1)
+            if np.any(u < -1e-9) or np.any(u > n - 1 + 1e-9):
+                raise ValueError('%s outside the table bounds %s' % (k, self.bounds[k]))
+            i = np.clip(np.floor(u).astype(int), 0, n - 2)
+            idx.append(i)
+            w.append(_weights(np.clip(u - i, 0., 1.), method))
+
+        # sum over the 4 x 4 x 4 neighbouring nodes in the padded tables
+        offsets = range(4) if method == 'cubic' else (1, 2)
+        y = 0.
+        for a, b, c in itertools.product(offsets, repeat=3):
+            weight = w[0][:, a] * w[1][:, b] * w[2][:, c]
+            y = y + weight[:, None] * self._padded[combo, idx[0] + a, idx[1] + b, idx[2] + c]
+
+        y = np.where(self.log_outputs, np.exp(y), y)
+        return OrderedDict((k, y[:, i].reshape(shape)) for i, k in enumerate(self.outputs))
+
+    def save(self, filename):
+
+        meta = {'outputs': self.outputs, 'bounds': self.bounds, 'errors': self.errors, 'settings': self.settings}
+        np.savez_compressed(filename, meta=json.dumps(meta, default=_json_default), values=self.values, log_outputs=self.log_outputs,
+                            combinations=np.array(self.combinations, dtype=int))
+
+
+def load_tables(filename):
+    """Load tables written by CostTables.save."""
+
+    with np.load(filename) as f:
+        meta = json.loads(str(f['meta']))
+        values, log_outputs, combinations = f['values'], f['log_outputs'], f['combinations']
+    errors = OrderedDict((k, OrderedDict((m, meta['errors'][k][m]) for m in METHODS))
+                         for k in meta['outputs'] if k in meta['errors'])
+    return CostTables(meta['outputs'], meta['bounds'], combinations, values, log_outputs,
+                      errors=errors, settings=meta['settings'])
+
+
+def build_tables(outputs=DEFAULT_OUTPUTS, bounds=None, shape=(9, 9, 5), combinations=DEFAULT_COMBINATIONS,
+                 rtol=None, method='cubic', max_points=100000, n_test=1000, seed=0,
+                 max_tip_speed=80., max_efficiency=0.90, **model_kwargs):
+    """
+    Tabulate csm_model and return CostTables.
+
+    The rotor torque at every grid point follows from the rating and diameter
+    via the maximum tip speed and drivetrain efficiency; the remaining keyword
+    arguments (blade and bearing numbers, external costs, coeffs) are passed to
+    csm_model and stay fixed.  If `rtol` is given, the number of grid
+    intervals along every input is doubled until the largest relative error of
+    `method` at the cell centres and test points, over all outputs and
+    combinations, is below rtol; a RuntimeError is raised if that needs more
+    than `max_points` grid points per table.
+    """
+
+    if method not in METHODS:
+        raise ValueError("unknown interpolation method '%s', use 'linear' or 'cubic'" % method)
+    if bounds is None:
+        bounds = {}
+    bounds = OrderedDict((k, tuple(bounds.get(k, DEFAULT_BOUNDS[k]))) for k in INPUTS)
+    lo = np.log([bounds[k][0] for k in INPUTS])
+    hi = np.log([bounds[k][1] for k in INPUTS])
+
+    def evaluate(points):
+        # points maps INPUTS to arrays; returns (combinations, outputs) + array shape
+        D, P, H = [points[k] for k in INPUTS]
+        Q = rotor_torque(P, D, max_tip_speed, max_efficiency)
+        # all combinations in one batch along a leading axis
+        c, b, r = [np.reshape(x, (-1,) + (1,)*np.ndim(D)) for x in zip(*combinations)]
+        out = csm_model(D, P, H, Q, turbine_class=c, blade_has_carbon=b, crane=r, **model_kwargs)
+        return np.stack([out[k] for k in outputs], axis=1)
+
+    rng = np.random.RandomState(seed)
+    test = OrderedDict((k, np.exp(lo[j] + rng.rand(n_test)*(hi[j] - lo[j]))) for j, k in enumerate(INPUTS))
+
+    shape = tuple(shape)
+    while True:
+        axes = [np.exp(np.linspace(lo[j], hi[j], n)) for j, n in enumerate(shape)]
+        values = evaluate(OrderedDict(zip(INPUTS, np.meshgrid(*axes, indexing='ij'))))
+        log_outputs = (values > 0.).reshape(values.shape[:2] + (-1,)).all(axis=(0, 2))
+        stored = np.where(log_outputs[:, None, None, None], np.log(np.abs(values)), values)
+        tables = CostTables(outputs, bounds, combinations, stored, log_outputs)
+
+        # cell centres plus random points, for every combination
+        centres = [np.exp(0.5*(np.log(a[1:]) + np.log(a[:-1]))) for a in axes]
+        points = OrderedDict((k, np.concatenate([g.ravel(), test[k]]))
+                             for k, g in zip(INPUTS, np.meshgrid(*centres, indexing='ij')))
+        exact = evaluate(points)
+        errors = OrderedDict((k, OrderedDict()) for k in outputs)
+        for m in METHODS:
+            rel = np.zeros((len(combinations), len(outputs)))
+            for ic, (c, b, r) in enumerate(combinations):
+                approx = tables(points['rotor_diameter'], points['machine_rating'], points['hub_height'],
+                                c, b, r, method=m)
+                for i, k in enumerate(outputs):
+                    y = exact[ic, i]
+                    rel[ic, i] = np.max(np.abs(approx[k] - y) / np.maximum(np.abs(y), 1e-300))
+            for i, k in enumerate(outputs):
+                errors[k][m] = float(rel[:, i].max())
+
+        if rtol is None or max(e[method] for e in errors.values()) <= rtol:
+            break
+        shape = tuple(2*n - 1 for n in shape)
+        if np.prod(shape) > max_points:
+            raise RuntimeError('%s interpolation needs more than %d grid points to reach rtol=%g'
+                               % (method, max_points, rtol))
+
+    tables.errors = errors
+    settings = dict((k, v) for k, v in model_kwargs.items() if k != 'coeffs')
+    settings.update({'shape': list(shape), 'n_test': n_test, 'seed': seed,
+                     'max_tip_speed': max_tip_speed, 'max_efficiency': max_efficiency})
+    if model_kwargs.get('coeffs'):
+        settings['coeffs'] = dict(model_kwargs['coeffs'])
+    tables.settings = settings
+
+    return tables
+
+#-------------------------------------------------------------------------------
+def example():
+
+    tables = build_tables()
+    print('Tables of %d x %d x %d points for %d combinations'
+          % (tables.shape + (len(tables.combinations),)))
+    print('Maximum relative error against nrel_csm_2015:')
+    for k, e in tables.errors.items():
+        print('  %-16s linear %.2e  cubic %.2e' % (k, e['linear'], e['cubic']))
+
+    # a batch of designs with mixed options
+    D = np.array([100., 126., 150.])
+    out = tables(D, 5000., 90., turbine_class=[1, 2, 3], crane=[False, True, True])
+    print('turbine_cost %s' % out['turbine_cost'])
+
+
+if __name__ == "__main__":
+
+    example()
@@ -9,6 +9,10 @@ from openmdao.api import Component, Problem, Group, IndepVarComp
 
 import numpy as np
 
+from turbine_costsse import equations_2015 as eq
+from turbine_costsse import escalation_2015 as escalation
+from turbine_costsse import scenarios_2015 as scenarios
+
 ###### Rotor
 #-------------------------------------------------------------------------------
 class BladeCost2015(Component):
@@ -19,7 +23,7 @@ class BladeCost2015(Component):
 
         # Inputs
         self.add_param('blade_mass',            0.0,  units='kg',     desc='component mass')
-        self.add_param('blade_mass_cost_coeff', 14.6, units='USD/kg', desc='blade mass-cost coeff')
+        self.add_param('blade_mass_cost_coeff', eq.COST_COEFFS_2015['blade_mass_cost_coeff'], units='USD/kg', desc='blade mass-cost coeff')
         self.add_param('blade_cost_external',   0.0,  units='USD',    desc='Blade cost computed by RotorSE')
         
         # Outputs
@@ -31,10 +35,7 @@ class BladeCost2015(Component):
         blade_mass_cost_coeff = params['blade_mass_cost_coeff']
 
         # calculate component cost
-        if params['blade_cost_external'] < 1.:
-            unknowns['blade_cost'] = blade_mass_cost_coeff * blade_mass
-        else:
-            unknowns['blade_cost'] = params['blade_cost_external']
+        unknowns['blade_cost'] = eq.blade_cost(blade_mass, blade_mass_cost_coeff, params['blade_cost_external'])
         
 
 # -----------------------------------------------------------------------------------------------
@@ -46,7 +47,7 @@ class HubCost2015(Component):
 
         # variables
         self.add_param('hub_mass', 0.0, desc='component mass', units='kg')
-        self.add_param('hub_mass_cost_coeff', 3.9, desc='hub mass-cost coeff', units='USD/kg')
+        self.add_param('hub_mass_cost_coeff', eq.COST_COEFFS_2015['hub_mass_cost_coeff'], desc='hub mass-cost coeff', units='USD/kg')
     
         # Outputs
         self.add_output('hub_cost', 0.0, units='USD', desc='Overall wind turbine component capial costs excluding transportation costs')
@@ -70,7 +71,7 @@ class PitchSystemCost2015(Component):
 
         # variables
         self.add_param('pitch_system_mass', 0.0, desc='component mass', units='kg')
-        self.add_param('pitch_system_mass_cost_coeff', 22.1, desc='pitch system mass-cost coeff', units='USD/kg')
+        self.add_param('pitch_system_mass_cost_coeff', eq.COST_COEFFS_2015['pitch_system_mass_cost_coeff'], desc='pitch system mass-cost coeff', units='USD/kg')
     
         # Outputs
         self.add_output('pitch_system_cost', 0.0, units='USD', desc='Overall wind turbine component capial costs excluding transportation costs')
@@ -93,7 +94,7 @@ class SpinnerCost2015(Component):
 
         # variables
         self.add_param('spinner_mass', 0.0, desc='component mass', units='kg')
-        self.add_param('spinner_mass_cost_coeff', 11.1, desc='spinner/nose cone mass-cost coeff', units='USD/kg')
+        self.add_param('spinner_mass_cost_coeff', eq.COST_COEFFS_2015['spinner_mass_cost_coeff'], desc='spinner/nose cone mass-cost coeff', units='USD/kg')
     
         # Outputs
         self.add_output('spinner_cost', 0.0, units='USD', desc='Overall wind turbine component capial costs excluding transportation costs')
@@ -121,10 +122,10 @@ class HubSystemCostAdder2015(Component):
         self.add_param('pitch_system_mass', 0.0, units='kg',  desc='Pitch system mass')
         self.add_param('spinner_cost',      0.0, units='USD', desc='Spinner component cost')
         self.add_param('spinner_mass',      0.0, units='kg', desc='Spinner component mass')
-        self.add_param('hub_assemblyCostMultiplier',    0.0, desc='Rotor assembly cost multiplier')
-        self.add_param('hub_overheadCostMultiplier',    0.0, desc='Rotor overhead cost multiplier')
-        self.add_param('hub_profitMultiplier',          0.0, desc='Rotor profit multiplier')
-        self.add_param('hub_transportMultiplier',       0.0, desc='Rotor transport multiplier')
+        self.add_param('hub_assemblyCostMultiplier',    eq.MULTIPLIERS_2015['hub_assemblyCostMultiplier'], desc='Rotor assembly cost multiplier')
+        self.add_param('hub_overheadCostMultiplier',    eq.MULTIPLIERS_2015['hub_overheadCostMultiplier'], desc='Rotor overhead cost multiplier')
+        self.add_param('hub_profitMultiplier',          eq.MULTIPLIERS_2015['hub_profitMultiplier'], desc='Rotor profit multiplier')
+        self.add_param('hub_transportMultiplier',       eq.MULTIPLIERS_2015['hub_transportMultiplier'], desc='Rotor transport multiplier')
     
         # Outputs
         self.add_output('hub_system_mass',  0.0, units='kg',  desc='Mass of the hub system, including hub, spinner, and pitch system for the blades')
@@ -148,7 +149,24 @@ class HubSystemCostAdder2015(Component):
         # Updated calculations below to account for assembly, transport, overhead and profit
         unknowns['hub_system_mass'] = hub_mass + pitch_system_mass + spinner_mass
         partsCost = hub_cost + pitch_system_cost + spinner_cost
-        unknowns['hub_system_cost'] = (1 + hub_transportMultiplier + hub_profitMultiplier) * ((1 + hub_overheadCostMultiplier + hub_assemblyCostMultiplier) * partsCost)
+        unknowns['hub_system_cost'] = eq.system_cost(partsCost, hub_assemblyCostMultiplier, hub_overheadCostMultiplier, hub_profitMultiplier, hub_transportMultiplier)
+
+    def linearize(self, params, unknowns, resids):
+
+        # only the structural nonzeros: the mass does not depend on costs or multipliers
+        partsCost = params['hub_cost'] + params['pitch_system_cost'] + params['spinner_cost']
+        d_parts, d_factory, d_markup = eq.system_cost_partials(partsCost, params['hub_assemblyCostMultiplier'], params['hub_overheadCostMultiplier'],
+                                                               params['hub_profitMultiplier'], params['hub_transportMultiplier'])
+        J = {}
+        for name in ('hub_mass', 'pitch_system_mass', 'spinner_mass'):
+            J['hub_system_mass', name] = 1.
+        for name in ('hub_cost', 'pitch_system_cost', 'spinner_cost'):
+            J['hub_system_cost', name] = d_parts
+        J['hub_system_cost', 'hub_assemblyCostMultiplier'] = d_factory
+        J['hub_system_cost', 'hub_overheadCostMultiplier'] = d_factory
+        J['hub_system_cost', 'hub_profitMultiplier'] = d_markup
+        J['hub_system_cost', 'hub_transportMultiplier'] = d_markup
+        return J
 
 #-------------------------------------------------------------------------------
 class RotorCostAdder2015(Component):
@@ -165,7 +183,7 @@ class RotorCostAdder2015(Component):
         self.add_param('blade_mass',        0.0, units='kg',    desc='Individual blade mass')
         self.add_param('hub_system_cost',   0.0, units='USD',   desc='Cost for hub system')
         self.add_param('hub_system_mass',   0.0, units='kg',    desc='Mass for hub system')
-        self.add_param('blade_number',      3,                  desc='Number of rotor blades', pass_by_obj=True)
+        self.add_param('blade_number',      3.0,                desc='Number of rotor blades')
     
         # Outputs
         self.add_output('rotor_cost',       0.0, units='USD',   desc='Overall wind sub-assembly capial costs including transportation costs')
@@ -182,6 +200,17 @@ class RotorCostAdder2015(Component):
         unknowns['rotor_cost']      = blade_cost * blade_number + hub_system_cost
         unknowns['rotor_mass_tcc']  = blade_mass * blade_number + hub_system_mass
 
+    def linearize(self, params, unknowns, resids):
+
+        J = {}
+        J['rotor_cost', 'blade_cost'] = params['blade_number']
+        J['rotor_cost', 'hub_system_cost'] = 1.
+        J['rotor_mass_tcc', 'blade_mass'] = params['blade_number']
+        J['rotor_mass_tcc', 'hub_system_mass'] = 1.
+        J['rotor_cost', 'blade_number'] = params['blade_cost']
+        J['rotor_mass_tcc', 'blade_number'] = params['blade_mass']
+        return J
+
 #-------------------------------------------------------------------------------
 
 
@@ -195,7 +224,7 @@ class LowSpeedShaftCost2015(Component):
 
         # variables
         self.add_param('lss_mass', 0.0, desc='component mass', units='kg') #mass input
-        self.add_param('lss_mass_cost_coeff', 11.9, desc='low speed shaft mass-cost coeff', units='USD/kg')
+        self.add_param('lss_mass_cost_coeff', eq.COST_COEFFS_2015['lss_mass_cost_coeff'], desc='low speed shaft mass-cost coeff', units='USD/kg')
     
         # Outputs
         self.add_output('lss_cost', 0.0, units='USD', desc='Overall wind turbine component capial costs excluding transportation costs') #initialize cost output
@@ -217,8 +246,8 @@ class BearingsCost2015(Component):
 
         # variables
         self.add_param('main_bearing_mass', 0.0, desc='component mass', units='kg') #mass input
-        self.add_param('main_bearing_number', 2, desc='number of main bearings', pass_by_obj=True) #number of main bearings- defaults to 2
-        self.add_param('bearings_mass_cost_coeff', 4.5, desc='main bearings mass-cost coeff', units='USD/kg')
+        self.add_param('main_bearing_number', 2.0, desc='number of main bearings') #number of main bearings- defaults to 2
+        self.add_param('bearings_mass_cost_coeff', eq.COST_COEFFS_2015['bearings_mass_cost_coeff'], desc='main bearings mass-cost coeff', units='USD/kg')
     
         # Outputs
         self.add_output('main_bearing_cost', 0.0, units='USD', desc='Overall wind turbine component capial costs excluding transportation costs')
@@ -230,7 +259,7 @@ class BearingsCost2015(Component):
         bearings_mass_cost_coeff = params['bearings_mass_cost_coeff']
 
         #calculate component cost 
-        unknowns['main_bearing_cost'] = bearings_mass_cost_coeff * main_bearing_mass * main_bearing_number
+        unknowns['main_bearing_cost'] = eq.main_bearing_cost(main_bearing_mass, main_bearing_number, bearings_mass_cost_coeff)
 
 #-------------------------------------------------------------------------------
 class GearboxCost2015(Component):
@@ -241,7 +270,7 @@ class GearboxCost2015(Component):
 
         # variables
         self.add_param('gearbox_mass', 0.0, units='kg', desc='component mass')
-        self.add_param('gearbox_mass_cost_coeff', 12.9, desc='gearbox mass-cost coeff', units='USD/kg')
+        self.add_param('gearbox_mass_cost_coeff', eq.COST_COEFFS_2015['gearbox_mass_cost_coeff'], desc='gearbox mass-cost coeff', units='USD/kg')
     
         # Outputs
         self.add_output('gearbox_cost', 0.0, units='USD', desc='Overall wind turbine component capial costs excluding transportation costs')
@@ -262,7 +291,7 @@ class HighSpeedSideCost2015(Component):
 
         # variables
         self.add_param('hss_mass', 0.0, desc='component mass', units='kg')
-        self.add_param('hss_mass_cost_coeff', 6.8, desc='high speed side mass-cost coeff', units='USD/kg')
+        self.add_param('hss_mass_cost_coeff', eq.COST_COEFFS_2015['hss_mass_cost_coeff'], desc='high speed side mass-cost coeff', units='USD/kg')
     
         # Outputs
         self.add_output('hss_cost', 0.0, units='USD', desc='Overall wind turbine component capial costs excluding transportation costs')
@@ -283,7 +312,7 @@ class GeneratorCost2015(Component):
 
         # variables
         self.add_param('generator_mass', 0.0, desc='component mass', units='kg')
-        self.add_param('generator_mass_cost_coeff', 12.4, desc='generator mass cost coeff', units='USD/kg')
+        self.add_param('generator_mass_cost_coeff', eq.COST_COEFFS_2015['generator_mass_cost_coeff'], desc='generator mass cost coeff', units='USD/kg')
     
         # Outputs
         self.add_output('generator_cost', 0.0, units='USD', desc='Overall wind turbine component capial costs excluding transportation costs')
@@ -304,7 +333,7 @@ class BedplateCost2015(Component):
         
         # variables
         self.add_param('bedplate_mass', 0.0, desc='component mass', units='kg')
-        self.add_param('bedplate_mass_cost_coeff', 2.9, desc='bedplate mass-cost coeff', units='USD/kg')
+        self.add_param('bedplate_mass_cost_coeff', eq.COST_COEFFS_2015['bedplate_mass_cost_coeff'], desc='bedplate mass-cost coeff', units='USD/kg')
     
         # Outputs
         self.add_output('bedplate_cost', 0.0, units='USD', desc='Overall wind turbine component capial costs excluding transportation costs')
@@ -325,7 +354,7 @@ class YawSystemCost2015(Component):
 
         # variables
         self.add_param('yaw_mass', 0.0, desc='component mass', units='kg')
-        self.add_param('yaw_mass_cost_coeff', 8.3, desc='yaw system mass cost coeff', units='USD/kg')
+        self.add_param('yaw_mass_cost_coeff', eq.COST_COEFFS_2015['yaw_mass_cost_coeff'], desc='yaw system mass cost coeff', units='USD/kg')
     
         # Outputs
         self.add_output('yaw_system_cost', 0.0, units='USD', desc='Overall wind turbine component capial costs excluding transportation costs')
@@ -346,7 +375,7 @@ class VariableSpeedElecCost2015(Component):
 
         # variables
         self.add_param('vs_electronics_mass', 0.0, desc='component mass', units='kg')
-        self.add_param('vs_electronics_mass_cost_coeff', 18.8, desc='variable speed electronics mass cost coeff', units='USD/kg')
+        self.add_param('vs_electronics_mass_cost_coeff', eq.COST_COEFFS_2015['vs_electronics_mass_cost_coeff'], desc='variable speed electronics mass cost coeff', units='USD/kg')
     
         # Outputs
         self.add_output('vs_cost', 0.0, units='USD', desc='Overall wind turbine component capial costs excluding transportation costs')
@@ -367,7 +396,7 @@ class HydraulicCoolingCost2015(Component):
 
         # variables
         self.add_param('hvac_mass', 0.0, desc='component mass', units='kg')
-        self.add_param('hvac_mass_cost_coeff', 124.0, desc='hydraulic and cooling system mass cost coeff', units='USD/kg')
+        self.add_param('hvac_mass_cost_coeff', eq.COST_COEFFS_2015['hvac_mass_cost_coeff'], desc='hydraulic and cooling system mass cost coeff', units='USD/kg')
     
         # Outputs
         self.add_output('hvac_cost', 0.0, units='USD', desc='Overall wind turbine component capial costs excluding transportation costs')
@@ -389,7 +418,7 @@ class NacelleCoverCost2015(Component):
 
         # variables
         self.add_param('cover_mass', 0.0, desc='component mass', units='kg')
-        self.add_param('cover_mass_cost_coeff', 5.7, desc='nacelle cover mass cost coeff', units='USD/kg')
+        self.add_param('cover_mass_cost_coeff', eq.COST_COEFFS_2015['cover_mass_cost_coeff'], desc='nacelle cover mass cost coeff', units='USD/kg')
     
         # Outputs
         self.add_output('cover_cost', 0.0, units='USD', desc='Overall wind turbine component capial costs excluding transportation costs')
@@ -410,7 +439,7 @@ class ElecConnecCost2015(Component):
 
         # variables
         self.add_param('machine_rating', 0.0, desc='machine rating', units='kW')
-        self.add_param('elec_connec_machine_rating_cost_coeff', 41.85, units='USD/kW', desc='electrical connections cost coefficient per kW')
+        self.add_param('elec_connec_machine_rating_cost_coeff', eq.COST_COEFFS_2015['elec_connec_machine_rating_cost_coeff'], units='USD/kW', desc='electrical connections cost coefficient per kW')
     
         # Outputs
         self.add_output('elec_cost', 0.0, units='USD', desc='Overall wind turbine component capial costs excluding transportation costs')
@@ -432,7 +461,7 @@ class ControlsCost2015(Component):
 
         # variables
         self.add_param('machine_rating', 0.0, desc='machine rating', units='kW')
-        self.add_param('controls_machine_rating_cost_coeff', 21.15, units='USD/kW', desc='controls cost coefficient per kW')
+        self.add_param('controls_machine_rating_cost_coeff', eq.COST_COEFFS_2015['controls_machine_rating_cost_coeff'], units='USD/kW', desc='controls cost coefficient per kW')
     
         # Outputs
         self.add_output('controls_cost', 0.0, units='USD', desc='Overall wind turbine component capial costs excluding transportation costs')
@@ -453,11 +482,11 @@ class OtherMainframeCost2015(Component):
 
         # variables
         self.add_param('platforms_mass', 0.0, desc='component mass', units='kg')
-        self.add_param('platforms_mass_cost_coeff', 17.1, desc='nacelle platforms mass cost coeff', units='USD/kg')
-        self.add_param('crane', False, desc='flag for presence of onboard crane', pass_by_obj=True)
-        self.add_param('crane_cost', 12000.0, desc='crane cost if present', units='USD')
+        self.add_param('platforms_mass_cost_coeff', eq.COST_COEFFS_2015['platforms_mass_cost_coeff'], desc='nacelle platforms mass cost coeff', units='USD/kg')
+        self.add_param('crane', 0.0, desc='flag for presence of onboard crane, 1 with and 0 without crane')
+        self.add_param('crane_cost', eq.COST_COEFFS_2015['crane_cost'], desc='crane cost if present', units='USD')
         # self.add_param('bedplate_cost', 0.0, desc='component cost', units='USD')
-        # self.add_param('base_hardware_cost_coeff', 0.7, desc='base hardware cost coeff based on bedplate cost')
+        # self.add_param('base_hardware_cost_coeff', eq.COST_COEFFS_2015['base_hardware_cost_coeff'], desc='base hardware cost coeff based on bedplate cost')
     
         # Outputs
         self.add_output('other_cost', 0.0, units='USD', desc='Overall wind turbine component capial costs excluding transportation costs')
@@ -471,22 +500,12 @@ class OtherMainframeCost2015(Component):
         # bedplate_cost = params['bedplate_cost']
         # base_hardware_cost_coeff = params['base_hardware_cost_coeff']
 
-        # nacelle platform cost
-
-        # crane cost
-        if (crane):
-            craneCost  = crane_cost
-            craneMass  = 3e3
-            NacellePlatformsCost = platforms_mass_cost_coeff * (platforms_mass - craneMass)
-        else:
-            craneCost  = 0.0
-            NacellePlatformsCost = platforms_mass_cost_coeff * platforms_mass
-
+        # nacelle platform and crane cost
         # base hardware cost
         #BaseHardwareCost = bedplate_cost * base_hardware_cost_coeff
     
         #aggregate all three mainframe costs
-        unknowns['other_cost'] = NacellePlatformsCost + craneCost #+ BaseHardwareCost
+        unknowns['other_cost'] = eq.other_cost(platforms_mass, platforms_mass_cost_coeff, crane, crane_cost) #+ BaseHardwareCost
 
 #-------------------------------------------------------------------------------
 class TransformerCost2015(Component):
@@ -497,7 +516,7 @@ class TransformerCost2015(Component):
 
         # variables
         self.add_param('transformer_mass', 0.0, desc='component mass', units='kg')
-        self.add_param('transformer_mass_cost_coeff', 18.8, desc='transformer mass cost coeff', units='USD/kg') #mass-cost coeff with default from ppt
+        self.add_param('transformer_mass_cost_coeff', eq.COST_COEFFS_2015['transformer_mass_cost_coeff'], desc='transformer mass cost coeff', units='USD/kg') #mass-cost coeff with default from ppt
     
         # Outputs
         self.add_output('transformer_cost', 0.0, units='USD', desc='Overall wind turbine component capial costs excluding transportation costs')
@@ -512,6 +531,12 @@ class TransformerCost2015(Component):
 #-------------------------------------------------------------------------------
 class NacelleSystemCostAdder2015(Component):
 
+    # parts summed into nacelle_cost and nacelle_mass
+    _parts_costs = ('lss_cost', 'main_bearing_cost', 'gearbox_cost', 'hss_cost', 'generator_cost', 'bedplate_cost', 'yaw_system_cost',
+                    'vs_cost', 'hvac_cost', 'cover_cost', 'elec_cost', 'controls_cost', 'other_cost', 'transformer_cost')
+    _parts_masses = ('lss_mass', 'main_bearing_mass', 'gearbox_mass', 'hss_mass', 'generator_mass', 'bedplate_mass', 'yaw_mass',
+                     'vs_mass', 'hvac_mass', 'cover_mass', 'transformer_mass')
+
     def __init__(self):
         
         super(NacelleSystemCostAdder2015, self).__init__()
@@ -542,13 +567,13 @@ class NacelleSystemCostAdder2015(Component):
         self.add_param('other_cost',        0.0, units='USD', desc='Component cost')
         self.add_param('transformer_cost',  0.0, units='USD', desc='Component cost')
         self.add_param('transformer_mass',  0.0, units='kg',  desc='Component mass')
-        self.add_param('main_bearing_number', 2, desc ='number of bearings', pass_by_obj=True)
+        self.add_param('main_bearing_number', 2.0, desc ='number of bearings')
         
         #multipliers
-        self.add_param('nacelle_assemblyCostMultiplier', 0.0, desc='nacelle assembly cost multiplier')
-        self.add_param('nacelle_overheadCostMultiplier', 0.0, desc='nacelle overhead cost multiplier')
-        self.add_param('nacelle_profitMultiplier',       0.0, desc='nacelle profit multiplier')
-        self.add_param('nacelle_transportMultiplier',    0.0, desc='nacelle transport multiplier')
+        self.add_param('nacelle_assemblyCostMultiplier', eq.MULTIPLIERS_2015['nacelle_assemblyCostMultiplier'], desc='nacelle assembly cost multiplier')
+        self.add_param('nacelle_overheadCostMultiplier', eq.MULTIPLIERS_2015['nacelle_overheadCostMultiplier'], desc='nacelle overhead cost multiplier')
+        self.add_param('nacelle_profitMultiplier',       eq.MULTIPLIERS_2015['nacelle_profitMultiplier'], desc='nacelle profit multiplier')
+        self.add_param('nacelle_transportMultiplier',    eq.MULTIPLIERS_2015['nacelle_transportMultiplier'], desc='nacelle transport multiplier')
     
         # returns
         self.add_output('nacelle_cost', 0.0, units='USD', desc='component cost')
@@ -593,7 +618,27 @@ class NacelleSystemCostAdder2015(Component):
         #apply multipliers for assembly, transport, overhead, and profits
         unknowns['nacelle_mass'] = lss_mass + main_bearing_number * main_bearing_mass + gearbox_mass + hss_mass + generator_mass + bedplate_mass + yaw_mass + vs_mass + hvac_mass + cover_mass + transformer_mass
         partsCost = lss_cost + main_bearing_number * main_bearing_cost + gearbox_cost + hss_cost + generator_cost + bedplate_cost + yaw_system_cost + vs_cost + hvac_cost + cover_cost + elec_cost + controls_cost + other_cost + transformer_cost
-        unknowns['nacelle_cost'] = (1 + nacelle_transportMultiplier + nacelle_profitMultiplier) * ((1 + nacelle_overheadCostMultiplier + nacelle_assemblyCostMultiplier) * partsCost)
+        unknowns['nacelle_cost'] = eq.system_cost(partsCost, nacelle_assemblyCostMultiplier, nacelle_overheadCostMultiplier, nacelle_profitMultiplier, nacelle_transportMultiplier)
+
+    def linearize(self, params, unknowns, resids):
+
+        # costs do not depend on masses and vice versa; only the bearings are counted main_bearing_number times
+        main_bearing_number = params['main_bearing_number']
+        partsCost = sum(params[name] * (main_bearing_number if name == 'main_bearing_cost' else 1.) for name in self._parts_costs)
+        d_parts, d_factory, d_markup = eq.system_cost_partials(partsCost, params['nacelle_assemblyCostMultiplier'], params['nacelle_overheadCostMultiplier'],
+                                                               params['nacelle_profitMultiplier'], params['nacelle_transportMultiplier'])
+        J = {}
+        for name in self._parts_masses:
+            J['nacelle_mass', name] = main_bearing_number if name == 'main_bearing_mass' else 1.
+        for name in self._parts_costs:
+            J['nacelle_cost', name] = d_parts * (main_bearing_number if name == 'main_bearing_cost' else 1.)
+        J['nacelle_mass', 'main_bearing_number'] = params['main_bearing_mass']
+        J['nacelle_cost', 'main_bearing_number'] = d_parts * params['main_bearing_cost']
+        J['nacelle_cost', 'nacelle_assemblyCostMultiplier'] = d_factory
+        J['nacelle_cost', 'nacelle_overheadCostMultiplier'] = d_factory
+        J['nacelle_cost', 'nacelle_profitMultiplier'] = d_markup
+        J['nacelle_cost', 'nacelle_transportMultiplier'] = d_markup
+        return J
 
 ###### Tower
 #-------------------------------------------------------------------------------
@@ -605,7 +650,7 @@ class TowerCost2015(Component):
 
         # variables
         self.add_param('tower_mass',            0.0, units='kg',     desc='tower mass')
-        self.add_param('tower_mass_cost_coeff', 2.9, units='USD/kg', desc='tower mass-cost coeff') #mass-cost coeff with default from ppt
+        self.add_param('tower_mass_cost_coeff', eq.COST_COEFFS_2015['tower_mass_cost_coeff'], units='USD/kg', desc='tower mass-cost coeff') #mass-cost coeff with default from ppt
         self.add_param('tower_cost_external',   0.0, units='USD',    desc='Tower cost computed by TowerSE')
         
         # Outputs
@@ -617,10 +662,7 @@ class TowerCost2015(Component):
         tower_mass_cost_coeff = params['tower_mass_cost_coeff']
         
         # calculate component cost
-        if params['tower_cost_external'] < 1.:
-            unknowns['tower_parts_cost'] = tower_mass_cost_coeff * tower_mass
-        else:
-            unknowns['tower_parts_cost'] = params['tower_cost_external']
+        unknowns['tower_parts_cost'] = eq.tower_parts_cost(tower_mass, tower_mass_cost_coeff, params['tower_cost_external'])
         
         
 #-------------------------------------------------------------------------------
@@ -634,10 +676,10 @@ class TowerCostAdder2015(Component):
         self.add_param('tower_parts_cost', 0.0, units='USD', desc='component cost')
       
         # multipliers
-        self.add_param('tower_assemblyCostMultiplier', 0.0, desc='tower assembly cost multiplier')
-        self.add_param('tower_overheadCostMultiplier', 0.0, desc='tower overhead cost multiplier')
-        self.add_param('tower_profitMultiplier', 0.0, desc='tower profit cost multiplier')
-        self.add_param('tower_transportMultiplier', 0.0, desc='tower transport cost multiplier')
+        self.add_param('tower_assemblyCostMultiplier', eq.MULTIPLIERS_2015['tower_assemblyCostMultiplier'], desc='tower assembly cost multiplier')
+        self.add_param('tower_overheadCostMultiplier', eq.MULTIPLIERS_2015['tower_overheadCostMultiplier'], desc='tower overhead cost multiplier')
+        self.add_param('tower_profitMultiplier', eq.MULTIPLIERS_2015['tower_profitMultiplier'], desc='tower profit cost multiplier')
+        self.add_param('tower_transportMultiplier', eq.MULTIPLIERS_2015['tower_transportMultiplier'], desc='tower transport cost multiplier')
         
         # returns
         self.add_output('tower_cost', 0.0, units='USD', desc='component cost') 
@@ -652,7 +694,19 @@ class TowerCostAdder2015(Component):
         tower_transportMultiplier = params['tower_transportMultiplier']
 
         partsCost = tower_parts_cost
-        unknowns['tower_cost'] = (1 + tower_transportMultiplier + tower_profitMultiplier) * ((1 + tower_overheadCostMultiplier + tower_assemblyCostMultiplier) * partsCost)
+        unknowns['tower_cost'] = eq.system_cost(partsCost, tower_assemblyCostMultiplier, tower_overheadCostMultiplier, tower_profitMultiplier, tower_transportMultiplier)
+
+    def linearize(self, params, unknowns, resids):
+
+        d_parts, d_factory, d_markup = eq.system_cost_partials(params['tower_parts_cost'], params['tower_assemblyCostMultiplier'], params['tower_overheadCostMultiplier'],
+                                                               params['tower_profitMultiplier'], params['tower_transportMultiplier'])
+        J = {}
+        J['tower_cost', 'tower_parts_cost'] = d_parts
+        J['tower_cost', 'tower_assemblyCostMultiplier'] = d_factory
+        J['tower_cost', 'tower_overheadCostMultiplier'] = d_factory
+        J['tower_cost', 'tower_profitMultiplier'] = d_markup
+        J['tower_cost', 'tower_transportMultiplier'] = d_markup
+        return J
 
 #-------------------------------------------------------------------------------
 class TurbineCostAdder2015(Component):
@@ -671,10 +725,10 @@ class TurbineCostAdder2015(Component):
         self.add_param('machine_rating',    0.0, units='kW',    desc='Machine rating')
     
         # parameters
-        self.add_param('turbine_assemblyCostMultiplier',    0.0, desc='Turbine multiplier for assembly cost in manufacturing')
-        self.add_param('turbine_overheadCostMultiplier',    0.0, desc='Turbine multiplier for overhead')
-        self.add_param('turbine_profitMultiplier',          0.0, desc='Turbine multiplier for profit markup')
-        self.add_param('turbine_transportMultiplier',       0.0, desc='Turbine multiplier for transport costs')
+        self.add_param('turbine_assemblyCostMultiplier',    eq.MULTIPLIERS_2015['turbine_assemblyCostMultiplier'], desc='Turbine multiplier for assembly cost in manufacturing')
+        self.add_param('turbine_overheadCostMultiplier',    eq.MULTIPLIERS_2015['turbine_overheadCostMultiplier'], desc='Turbine multiplier for overhead')
+        self.add_param('turbine_profitMultiplier',          eq.MULTIPLIERS_2015['turbine_profitMultiplier'], desc='Turbine multiplier for profit markup')
+        self.add_param('turbine_transportMultiplier',       eq.MULTIPLIERS_2015['turbine_transportMultiplier'], desc='Turbine multiplier for transport costs')
     
         # Outputs
         self.add_output('turbine_mass',     0.0, units='kg',    desc='Turbine total mass, without foundation')
@@ -700,9 +754,186 @@ class TurbineCostAdder2015(Component):
         
         
         unknowns['turbine_mass']    =  rotor_mass_tcc + nacelle_mass + tower_mass
-        unknowns['turbine_cost']    = (1 + turbine_transportMultiplier + turbine_profitMultiplier) * ((1 + turbine_overheadCostMultiplier + turbine_assemblyCostMultiplier) * partsCost)
+        unknowns['turbine_cost']    = eq.system_cost(partsCost, turbine_assemblyCostMultiplier, turbine_overheadCostMultiplier, turbine_profitMultiplier, turbine_transportMultiplier)
         unknowns['turbine_cost_kW'] = unknowns['turbine_cost'] / params['machine_rating']
 
+    def linearize(self, params, unknowns, resids):
+
+        partsCost = params['rotor_cost'] + params['nacelle_cost'] + params['tower_cost']
+        d_parts, d_factory, d_markup = eq.system_cost_partials(partsCost, params['turbine_assemblyCostMultiplier'], params['turbine_overheadCostMultiplier'],
+                                                               params['turbine_profitMultiplier'], params['turbine_transportMultiplier'])
+        machine_rating = params['machine_rating']
+        J = {}
+        for name in ('rotor_mass_tcc', 'nacelle_mass', 'tower_mass'):
+            J['turbine_mass', name] = 1.
+        for name in ('rotor_cost', 'nacelle_cost', 'tower_cost'):
+            J['turbine_cost', name] = d_parts
+            J['turbine_cost_kW', name] = d_parts / machine_rating
+        for name, d in (('turbine_assemblyCostMultiplier', d_factory), ('turbine_overheadCostMultiplier', d_factory),
+                        ('turbine_profitMultiplier', d_markup), ('turbine_transportMultiplier', d_markup)):
+            J['turbine_cost', name] = d
+            J['turbine_cost_kW', name] = d / machine_rating
+        J['turbine_cost_kW', 'machine_rating'] = -unknowns['turbine_cost'] / machine_rating**2
+        return J
+
+###### Escalation
+#-------------------------------------------------------------------------------
+def _system_cost_partials(params, n, price_index=False):
+
+    # partials of the rotor, nacelle, tower and turbine costs along the year or scenario axis of length n as
+    # vectors: each entry depends on the scalar params and on the same entry of the array params
+    suffixes = ('_assemblyCostMultiplier', '_overheadCostMultiplier', '_profitMultiplier', '_transportMultiplier')
+    multipliers = lambda system: [params[system + k] for k in suffixes]
+    I = dict((s, params[s + '_price_index'] if price_index else 1.) for s in escalation.SUBSYSTEMS)
+    blade_number = params['blade_number']
+    main_bearing_number = params['main_bearing_number']
+
+    hub_parts = params['hub_cost'] + params['pitch_system_cost'] + params['spinner_cost']
+    nacelle_parts = sum(params[k] * (main_bearing_number if k == 'main_bearing_cost' else 1.)
+                        for k, s in escalation.COMPONENT_COSTS.items() if s == 'nacelle')
+    tower_parts = params['tower_parts_cost']
+
+    partials = {'rotor_cost': {}, 'nacelle_cost': {}, 'tower_cost': {}}
+    d_system = {}
+    systems = params['blade_cost'] * blade_number * I['rotor']
+    for system, subsystem, parts in (('hub', 'rotor', hub_parts), ('nacelle', 'nacelle', nacelle_parts),
+                                     ('tower', 'tower', tower_parts)):
+        J = partials[subsystem + '_cost']
+        d_parts, d_factory, d_markup = eq.system_cost_partials(parts * I[subsystem], *multipliers(system))
+        d_system[system] = d_parts
+        systems = systems + eq.system_cost(parts * I[subsystem], *multipliers(system))
+        for k, s in escalation.COMPONENT_COSTS.items():
+            if s == subsystem and k != 'blade_cost':
+                J[k] = d_parts * I[subsystem] * (main_bearing_number if k == 'main_bearing_cost' else 1.)
+        for k, d in zip(suffixes, (d_factory, d_factory, d_markup, d_markup)):
+            J[system + k] = d
+        if price_index:
+            J[subsystem + '_price_index'] = d_parts * parts
+    partials['rotor_cost']['blade_cost'] = blade_number * I['rotor']
+    partials['rotor_cost']['blade_number'] = params['blade_cost'] * I['rotor']
+    partials['nacelle_cost']['main_bearing_number'] = d_system['nacelle'] * params['main_bearing_cost'] * I['nacelle']
+    if price_index:
+        partials['rotor_cost']['rotor_price_index'] = partials['rotor_cost']['rotor_price_index'] + params['blade_cost'] * blade_number
+
+    # turbine cost and cost per kW through the sum of the systems
+    d_parts, d_factory, d_markup = eq.system_cost_partials(systems, *multipliers('turbine'))
+    turbine = {}
+    for subsystem in escalation.SUBSYSTEMS:
+        for k, d in partials[subsystem + '_cost'].items():
+            turbine[k] = d_parts * d
+    for k, d in zip(suffixes, (d_factory, d_factory, d_markup, d_markup)):
+        turbine['turbine' + k] = d
+    machine_rating = params['machine_rating']
+    partials['turbine_cost'] = turbine
+    partials['turbine_cost_kW'] = dict((k, d / machine_rating) for k, d in turbine.items())
+    partials['turbine_cost_kW']['machine_rating'] = -eq.system_cost(systems, *multipliers('turbine')) / machine_rating**2
+
+    return dict((name, dict((k, np.broadcast_to(d, (n,))) for k, d in J.items())) for name, J in partials.items())
+
+#-------------------------------------------------------------------------------
+class CostEscalation2015(Component):
+    """
+    Escalates the 2015 component costs over n_years with per-subsystem price
+    indices (relative to 2015) and reassembles the system costs for each year.
+    """
+
+    def __init__(self, n_years):
+
+        super(CostEscalation2015, self).__init__()
+
+        # component costs in 2015 USD
+        for name in escalation.COMPONENT_COSTS:
+            self.add_param(name, 0.0, units='USD', desc='component cost')
+        self.add_param('machine_rating', 0.0, units='kW', desc='Machine rating')
+        self.add_param('blade_number', 3.0, desc='Number of rotor blades')
+        self.add_param('main_bearing_number', 2.0, desc='number of main bearings')
+
+        # multipliers
+        for name, val in eq.MULTIPLIERS_2015.items():
+            self.add_param(name, val, desc='cost multiplier')
+
+        # price indices
+        for subsystem in escalation.SUBSYSTEMS:
+            self.add_param(subsystem + '_price_index', np.ones(n_years), desc='%s price index relative to 2015' % subsystem)
+
+        # returns
+        self.add_output('rotor_cost_escalated',      np.zeros(n_years), units='USD',    desc='Rotor cost per year')
+        self.add_output('nacelle_cost_escalated',    np.zeros(n_years), units='USD',    desc='Nacelle cost per year')
+        self.add_output('tower_cost_escalated',      np.zeros(n_years), units='USD',    desc='Tower cost per year')
+        self.add_output('turbine_cost_escalated',    np.zeros(n_years), units='USD',    desc='Turbine cost per year')
+        self.add_output('turbine_cost_kW_escalated', np.zeros(n_years), units='USD/kW', desc='Turbine cost per kW per year')
+
+    def solve_nonlinear(self, params, unknowns, resids):
+
+        costs = dict((name, params[name]) for name in escalation.COMPONENT_COSTS)
+        indices = dict((subsystem, params[subsystem + '_price_index']) for subsystem in escalation.SUBSYSTEMS)
+        out = escalation.escalate_costs(costs, indices, params['blade_number'], params['main_bearing_number'],
+                                        params['machine_rating'],
+                                        coeffs=dict((name, params[name]) for name in eq.MULTIPLIERS_2015))
+
+        for name in ('rotor_cost', 'nacelle_cost', 'tower_cost', 'turbine_cost', 'turbine_cost_kW'):
+            unknowns[name + '_escalated'] = out[name]
+
+    def linearize(self, params, unknowns, resids):
+
+        # array params (the price indices) act on their own year only
+        n = len(unknowns['turbine_cost_escalated'])
+        J = {}
+        for name, partials in _system_cost_partials(params, n, price_index=True).items():
+            for k, d in partials.items():
+                J[name + '_escalated', k] = np.diag(d) if np.ndim(params[k]) else d.reshape(n, 1)
+        return J
+
+#-------------------------------------------------------------------------------
+class CostScenarios2015(Component):
+    """
+    Reassembles the system costs from the component costs for n_scenarios
+    sets of assembly, overhead, profit and transport multipliers at once.
+    """
+
+    def __init__(self, n_scenarios):
+
+        super(CostScenarios2015, self).__init__()
+
+        # component costs
+        for name in escalation.COMPONENT_COSTS:
+            self.add_param(name, 0.0, units='USD', desc='component cost')
+        self.add_param('machine_rating', 0.0, units='kW', desc='Machine rating')
+        self.add_param('blade_number', 3.0, desc='Number of rotor blades')
+        self.add_param('main_bearing_number', 2.0, desc='number of main bearings')
+
+        # one multiplier value per scenario
+        for name, val in eq.MULTIPLIERS_2015.items():
+            self.add_param(name, np.full(n_scenarios, val), desc='cost multiplier per scenario')
+
+        # returns
+        self.add_output('rotor_cost_scenarios',      np.zeros(n_scenarios), units='USD',    desc='Rotor cost per scenario')
+        self.add_output('nacelle_cost_scenarios',    np.zeros(n_scenarios), units='USD',    desc='Nacelle cost per scenario')
+        self.add_output('tower_cost_scenarios',      np.zeros(n_scenarios), units='USD',    desc='Tower cost per scenario')
+        self.add_output('turbine_cost_scenarios',    np.zeros(n_scenarios), units='USD',    desc='Turbine cost per scenario')
+        self.add_output('turbine_cost_kW_scenarios', np.zeros(n_scenarios), units='USD/kW', desc='Turbine cost per kW per scenario')
+
+    def solve_nonlinear(self, params, unknowns, resids):
+
+        costs = dict((name, params[name]) for name in escalation.COMPONENT_COSTS)
+        parts = scenarios.parts_costs(costs, params['blade_number'], params['main_bearing_number'])
+        out = scenarios.apply_scenarios(parts, dict((name, params[name]) for name in eq.MULTIPLIERS_2015),
+                                        params['machine_rating'])
+
+        for name in ('rotor_cost', 'nacelle_cost', 'tower_cost', 'turbine_cost', 'turbine_cost_kW'):
+            unknowns[name + '_scenarios'] = out[name]
+
+    def linearize(self, params, unknowns, resids):
+
+        # array params (the multipliers) act on their own scenario only
+        n = len(unknowns['turbine_cost_scenarios'])
+        J = {}
+        for name, partials in _system_cost_partials(params, n).items():
+            for k, d in partials.items():
+                J[name + '_scenarios', k] = np.diag(d) if np.ndim(params[k]) else d.reshape(n, 1)
+        return J
+
+#-------------------------------------------------------------------------------
 class Outputs2Screen(Component):
     def __init__(self, verbosity):
         super(Outputs2Screen, self).__init__()
@@ -788,55 +1019,26 @@ class Outputs2Screen(Component):
             print('Turbine cost            %.3f k USD       mass %.3f kg' % (params['turbine_cost'] * 1.e-003,      params['turbine_mass']))
             print('Turbine cost per kW     %.3f k USD/kW'                 % params['turbine_cost_kW'])
             print('################################################')
+
+    def linearize(self, params, unknowns, resids):
+
+        # no outputs, so no partials
+        return {}
                 
     
 
 #-------------------------------------------------------------------------------
 class Turbine_CostsSE_2015(Group):
 
-    def __init__(self, verbosity = False):
+    def __init__(self, verbosity = False, coeffs = None):
         super(Turbine_CostsSE_2015, self).__init__()
 
-        self.add('blade_mass_cost_coeff',                 IndepVarComp('blade_mass_cost_coeff',         val=14.6),  promotes=['*'])
-        self.add('hub_mass_cost_coeff',                   IndepVarComp('hub_mass_cost_coeff',           val=3.9),   promotes=['*'])
-        self.add('pitch_system_mass_cost_coeff',          IndepVarComp('pitch_system_mass_cost_coeff',  val=22.1),  promotes=['*'])
-        self.add('spinner_mass_cost_coeff',               IndepVarComp('spinner_mass_cost_coeff',       val=11.1),  promotes=['*'])
-        self.add('lss_mass_cost_coeff',                   IndepVarComp('lss_mass_cost_coeff',           val=11.9),  promotes=['*'])
-        self.add('bearings_mass_cost_coeff',              IndepVarComp('bearings_mass_cost_coeff',      val=4.5),   promotes=['*'])
-        self.add('gearbox_mass_cost_coeff',               IndepVarComp('gearbox_mass_cost_coeff',       val=12.9),  promotes=['*'])
-        self.add('hss_mass_cost_coeff',                   IndepVarComp('hss_mass_cost_coeff',           val=6.8),   promotes=['*'])
-        self.add('generator_mass_cost_coeff',             IndepVarComp('generator_mass_cost_coeff',     val=12.4),  promotes=['*'])
-        self.add('bedplate_mass_cost_coeff',              IndepVarComp('bedplate_mass_cost_coeff',      val=2.9),   promotes=['*'])
-        self.add('yaw_mass_cost_coeff',                   IndepVarComp('yaw_mass_cost_coeff',           val=8.3),   promotes=['*'])
-        self.add('vs_electronics_mass_cost_coeff',        IndepVarComp('vs_electronics_mass_cost_coeff',val=18.8),  promotes=['*'])
-        self.add('hvac_mass_cost_coeff',                  IndepVarComp('hvac_mass_cost_coeff',          val=124.0), promotes=['*'])
-        self.add('cover_mass_cost_coeff',                 IndepVarComp('cover_mass_cost_coeff',         val=5.7),   promotes=['*'])
-        self.add('elec_connec_machine_rating_cost_coeff', IndepVarComp('elec_connec_machine_rating_cost_coeff',val=41.85), promotes=['*'])
-        self.add('platforms_mass_cost_coeff',             IndepVarComp('platforms_mass_cost_coeff',     val=17.1),  promotes=['*'])
-        self.add('base_hardware_cost_coeff',              IndepVarComp('base_hardware_cost_coeff',      val=0.7),   promotes=['*'])
-        self.add('transformer_mass_cost_coeff',           IndepVarComp('transformer_mass_cost_coeff',   val=18.8),  promotes=['*'])
-        self.add('tower_mass_cost_coeff',                 IndepVarComp('tower_mass_cost_coeff',         val=2.9),   promotes=['*'])
-        self.add('controls_machine_rating_cost_coeff',    IndepVarComp('controls_machine_rating_cost_coeff', val=21.15), promotes=['*'])
-        self.add('crane_cost',                            IndepVarComp('crane_cost',                    val=12e3),  promotes=['*'])
-        
-        self.add('hub_assemblyCostMultiplier',            IndepVarComp('hub_assemblyCostMultiplier',    val=0.0), promotes=['*'])
-        self.add('hub_overheadCostMultiplier',            IndepVarComp('hub_overheadCostMultiplier',    val=0.0), promotes=['*'])
-        self.add('nacelle_assemblyCostMultiplier',        IndepVarComp('nacelle_assemblyCostMultiplier',val=0.0), promotes=['*'])
-        self.add('nacelle_overheadCostMultiplier',        IndepVarComp('nacelle_overheadCostMultiplier',val=0.0), promotes=['*'])
-        self.add('tower_assemblyCostMultiplier',          IndepVarComp('tower_assemblyCostMultiplier',  val=0.0), promotes=['*'])
-        self.add('tower_overheadCostMultiplier',          IndepVarComp('tower_overheadCostMultiplier',  val=0.0), promotes=['*'])
-        self.add('turbine_assemblyCostMultiplier',        IndepVarComp('turbine_assemblyCostMultiplier',val=0.0), promotes=['*'])
-        self.add('turbine_overheadCostMultiplier',        IndepVarComp('turbine_overheadCostMultiplier',val=0.0), promotes=['*'])
-        self.add('hub_profitMultiplier',                  IndepVarComp('hub_profitMultiplier',          val=0.0), promotes=['*'])
-        self.add('nacelle_profitMultiplier',              IndepVarComp('nacelle_profitMultiplier',      val=0.0), promotes=['*'])
-        self.add('tower_profitMultiplier',                IndepVarComp('tower_profitMultiplier',        val=0.0), promotes=['*'])
-        self.add('turbine_profitMultiplier',              IndepVarComp('turbine_profitMultiplier',      val=0.0), promotes=['*'])
-        self.add('hub_transportMultiplier',               IndepVarComp('hub_transportMultiplier',       val=0.0), promotes=['*'])
-        self.add('nacelle_transportMultiplier',           IndepVarComp('nacelle_transportMultiplier',   val=0.0), promotes=['*'])
-        self.add('tower_transportMultiplier',             IndepVarComp('tower_transportMultiplier',     val=0.0), promotes=['*'])
-        self.add('turbine_transportMultiplier',           IndepVarComp('turbine_transportMultiplier',   val=0.0), promotes=['*'])
+        # independent coefficients and multipliers, defaults from equations_2015 updated with `coeffs`
+        # (a mapping or a coefficients_2015.CoefficientSet)
+        values = eq.default_coeffs(coeffs)
+        for name in list(eq.COST_COEFFS_2015) + list(eq.MULTIPLIERS_2015):
+            self.add(name, IndepVarComp(name, val=values[name]), promotes=['*'])
 
-        
         self.add('blade_c'       , BladeCost2015(),         promotes=['*'])
         self.add('hub_c'         , HubCost2015(),           promotes=['*'])
         self.add('pitch_c'       , PitchSystemCost2015(),   promotes=['*'])
@@ -0,0 +1,173 @@
+"""
+utilities.py
+
+Complex-step verification of component partial derivatives.
+
+The partials of a component with respect to all of its float params are
+computed by complex step to machine precision.  For components with scalar
+variables this is one vectorized pass: every param is given an array of
+values with an imaginary perturbation on its own entry, so a single call of
+solve_nonlinear returns all columns of the Jacobian.  Components with array
+variables are perturbed one param entry at a time.  check_gradient_unit_test takes the place of
+commonse.utilities.check_gradient_unit_test for the 2015 components.
+
+Copyright (c) NREL. All rights reserved.
+"""
+
+from collections import OrderedDict
+
+import numpy as np
+
+
+def _initial_values(meta_dict):
+
+    return OrderedDict((k, np.copy(meta['val']) if isinstance(meta['val'], np.ndarray) else meta['val'])
+                       for k, meta in meta_dict.items())
+
+
+def _params(comp, params):
+
+    values = _initial_values(comp._init_params_dict)
+    if params:
+        unknown = set(params) - set(values)
+        if unknown:
+            raise KeyError('%s has no param(s) %s' % (type(comp).__name__, ', '.join(sorted(unknown))))
+        values.update(params)
+    float_params = [k for k, meta in comp._init_params_dict.items() if not meta.get('pass_by_obj')]
+    return values, float_params
+
+
+def _run(comp, params):
+
+    unknowns = _initial_values(comp._init_unknowns_dict)
+    comp.solve_nonlinear(params, unknowns, OrderedDict())
+    return unknowns
+
+
+def _perturbed(comp, params, float_params, delta):
+    # outputs with param entry j perturbed by delta[j], stacked along a leading axis of length n
+
+    sizes = [np.size(params[k]) for k in float_params]
+    n = sum(sizes)
+    outputs = [k for k, meta in comp._init_unknowns_dict.items() if not meta.get('pass_by_obj')]
+    shapes = dict((k, np.shape(comp._init_unknowns_dict[k]['val'])) for k in outputs)
+    out = OrderedDict((k, np.zeros((n, int(np.prod(shapes[k]))), dtype=np.result_type(float, delta)))
+                      for k in outputs)
+
+    if all(size == 1 and np.ndim(params[k]) == 0 for k, size in zip(float_params, sizes)) and \
+            all(shape == () for shape in shapes.values()):
+        # scalar variables: one evaluation with the perturbations on the diagonal of a batch
+        batch = dict(params)
+        for j, k in enumerate(float_params):
+            v = np.full(n, params[k], dtype=np.result_type(params[k], delta))
+            v[j] += delta[j]
+            batch[k] = v
+        unknowns = _run(comp, batch)
+        for k in outputs:
+            out[k][:, 0] = np.broadcast_to(unknowns[k], (n,))
+        return out, sizes
+
+    # array variables cannot share a batch axis, perturb one entry at a time
+    col = 0
+    for k, size in zip(float_params, sizes):
+        for i in range(size):
+            p = dict(params)
+            p[k] = np.array(params[k], dtype=np.result_type(params[k], delta))
+            p[k].flat[i] += delta[col]
+            unknowns = _run(comp, p)
+            for name in outputs:
+                out[name][col] = np.ravel(unknowns[name])
+            col += 1
+    return out, sizes
+
+
+def complex_step_jacobian(comp, params=None, h=1e-30):
+    """
+    Partial derivatives of `comp` by complex step.
+
+    `params` overrides the default param values of the component.  Returns
+    the unknowns at that point and J[(unknown, param)] as arrays of shape
+    (size of unknown, size of param) for every float param, in the layout
+    of Component.linearize.
+    """
+
+    params, float_params = _params(comp, params)
+    unknowns = _run(comp, params)
+    n = sum(np.size(params[k]) for k in float_params)
+    out, sizes = _perturbed(comp, params, float_params, np.full(n, 1j*h))
+
+    J = OrderedDict()
+    for name, v in out.items():
+        col = 0
+        for k, size in zip(float_params, sizes):
+            J[name, k] = np.imag(v[col:col + size]).T / h
+            col += size
+
+        # the real parts must not be changed by the perturbation
+        ref = np.reshape(np.real(unknowns[name]), (1, -1))
+        if not np.allclose(np.real(v), ref, rtol=1e-12, atol=0., equal_nan=True):
+            raise ValueError('complex step changes the value of %s in %s' % (name, type(comp).__name__))
+    return unknowns, J
+
+
+def _finite_difference_jacobian(comp, params, float_params, step):
+
+    x = np.concatenate([np.ravel(params[k]) for k in float_params]) if float_params else np.zeros(0)
+    delta = step * np.maximum(np.abs(x), 1.)
+    plus, sizes = _perturbed(comp, params, float_params, delta)
+    minus, sizes = _perturbed(comp, params, float_params, -delta)
+
+    J = OrderedDict()
+    for name in plus:
+        col = 0
+        for k, size in zip(float_params, sizes):
+            d = delta[col:col + size]
+            J[name, k] = ((plus[name][col:col + size] - minus[name][col:col + size]) / (2*d[:, None])).T
+            col += size
+    return J
+
+
+def check_partials(comp, params=None, tol=1e-12, fd_step=1e-6, fd_tol=1e-5):
+    """
+    Check the partial derivatives of `comp` against complex step.
+
+    If the component implements linearize, every entry of its Jacobian
+    (missing entries count as zero) must match the complex-step partials to
+    `tol`, relative to max(1, |partial|).  Otherwise the complex-step partials
+    are compared with central differences to `fd_tol` as a check that the
+    component is complex-step safe.  Returns an OrderedDict mapping
+    (unknown, param) to (reference, complex step, relative error, passed).
+    """
+
+    from openmdao.api import Component
+
+    unknowns, J_cs = complex_step_jacobian(comp, params)
+    values, float_params = _params(comp, params)
+
+    if type(comp).linearize is not Component.linearize:
+        J_ref = comp.linearize(values, unknowns, OrderedDict()) or {}
+        unknown_keys = set(J_ref) - set(J_cs)
+        if unknown_keys:
+            raise KeyError('%s returns partials of unknown variables %s'
+                           % (type(comp).__name__, ', '.join(str(k) for k in sorted(unknown_keys))))
+        limit = tol
+    else:
+        J_ref = _finite_difference_jacobian(comp, values, float_params, fd_step)
+        limit = fd_tol
+
+    result = OrderedDict()
+    for key, cs in J_cs.items():
+        ref = np.reshape(J_ref.get(key, np.zeros_like(cs)), cs.shape)
+        err = np.max(np.abs(ref - cs) / np.maximum(np.abs(cs), 1.)) if cs.size else 0.
+        result[key] = (ref, cs, err, err <= limit)
+    return result
+
+
+def check_gradient_unit_test(unittest, comp, params=None, tol=1e-12, display=False):
+    """Assert in a unittest.TestCase that all partials of `comp` pass check_partials."""
+
+    for (name, param), (ref, cs, err, ok) in check_partials(comp, params, tol=tol).items():
+        if display:
+            print('%s wrt %s: reference %s, complex step %s, error %.2e' % (name, param, ref, cs, err))
+        unittest.assertTrue(ok, msg='%s: d%s/d%s reference %s, complex step %s, error %.2e'
+                                    % (type(comp).__name__, name, param, ref, cs, err))